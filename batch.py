@@ -0,0 +1,356 @@
+#!/usr/bin/python3
+"""
+Headless batch tools for SMBX NPC sprites and configs
+
+Usage:
+    python batch.py convert <folder> [--jobs N] [--force] [--move-originals] [--dry-run]
+    python batch.py export-legacy <folder> [--out DIR] [--jobs N] [--force] [--colors N] [--dry-run]
+    python batch.py detect-frames <folder> [--all]
+    python batch.py fit-hitbox <folder> [--all]
+    python batch.py check-frames <folder> [--all]
+    python batch.py find-duplicates <folder> [--jobs N] [--distance N] [--rescan]
+    python batch.py render-preview <folder> [--format gif|apng|strip] [--out DIR] [--zoom N] [--jobs N]
+    python batch.py load-project <folder> [--jobs N] [--chunk-size N]
+    python batch.py export-table <folder> <csv> [--jobs N]
+    python batch.py import-table <folder> <csv> [--jobs N] [--dry-run]
+"""
+import sys
+import argparse
+import multiprocessing
+
+
+def cmd_convert(args) -> int:
+    from program.tools.legacy_converter import convert_tree, find_legacy_pairs
+
+    if args.dry_run:
+        pairs = find_legacy_pairs(args.folder)
+        todo = [p for p in pairs if args.force or not (p.is_up_to_date() or p.png_is_foreign())]
+        for pair in todo:
+            print(f"{pair.front_path} + {pair.mask_path} -> {pair.png_path}")
+        print(f"{len(todo)} of {len(pairs)} pairs would be converted")
+        return 0
+
+    def progress(done, total, pair):
+        print(f"[{done}/{total}] {pair.png_path}")
+
+    report = convert_tree(args.folder, jobs=args.jobs, force=args.force,
+                          move_originals=args.move_originals,
+                          progress=None if args.quiet else progress)
+    for path in report.kept:
+        print(f"KEPT {path}: not written by the converter, --force overwrites it")
+    for path, error in report.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def cmd_export_legacy(args) -> int:
+    from program.tools.legacy_exporter import export_tree, find_png_sprites
+
+    if args.dry_run:
+        exports = find_png_sprites(args.folder, args.out)
+        todo = [e for e in exports if args.force or not e.is_up_to_date()]
+        for export in todo:
+            print(f"{export.png_path} -> {export.front_path} + {export.mask_path}")
+        print(f"{len(todo)} of {len(exports)} sprites would be exported")
+        return 0
+
+    def progress(done, total, export):
+        print(f"[{done}/{total}] {export.front_path}")
+
+    report = export_tree(args.folder, out_root=args.out, jobs=args.jobs, force=args.force,
+                         max_colors=args.colors, alpha_threshold=args.alpha_threshold,
+                         progress=None if args.quiet else progress)
+    for path, error in report.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def cmd_detect_frames(args) -> int:
+    from program.analysis.sheet_profile import np
+    from program.tools.frame_report import check_folder
+
+    if np is None:
+        print("Frame detection needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    results = check_folder(args.folder)
+    mismatches = 0
+    for result in results:
+        if result.error:
+            print(f"{result.config_path}: {result.error}", file=sys.stderr)
+            continue
+        if result.differs:
+            mismatches += 1
+        elif not args.all:
+            continue
+        mark = "DIFFERS" if result.differs else "ok"
+        print(f"[{mark}] {result.config_path}\n"
+              f"    config:   {result.current_text()}\n"
+              f"    detected: {result.detected} (confidence {result.detected.confidence:.2f})")
+    print(f"{mismatches} of {len(results)} configs differ from their sprite sheet")
+    return 0
+
+
+def cmd_fit_hitbox(args) -> int:
+    from program.analysis.sheet_profile import np
+    from program.tools.hitbox_report import check_folder
+
+    if np is None:
+        print("Hitbox fitting needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    results = check_folder(args.folder)
+    mismatches = 0
+    for result in results:
+        if result.error:
+            print(f"{result.config_path}: {result.error}", file=sys.stderr)
+            continue
+        diff = result.differences
+        if diff:
+            mismatches += 1
+        elif not args.all:
+            continue
+        print(f"[{'DIFFERS' if diff else 'ok'}] {result.config_path}")
+        for key, proposed in result.fit.as_params().items():
+            current = result.current.get(key)
+            mark = "  <-" if key in diff else ""
+            print(f"    {key:<11} current {'-' if current is None else current:>5}  proposed {proposed:>5}{mark}")
+    print(f"{mismatches} of {len(results)} configs differ from the fitted hitbox")
+    return 0
+
+
+def cmd_check_frames(args) -> int:
+    from program.analysis.frame_hash import np
+    from program.tools.frame_hash_report import check_folder
+
+    if np is None:
+        print("Frame hashing needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    results = check_folder(args.folder)
+    flagged = 0
+    for result in results:
+        if result.error:
+            print(f"{result.config_path}: {result.error}", file=sys.stderr)
+            continue
+        if result.has_findings:
+            flagged += 1
+        elif not args.all:
+            continue
+        h = result.hashes
+        print(f"[{'FOUND' if result.has_findings else 'ok'}] {result.config_path} "
+              f"({h.count} frames of {h.frame_width}x{h.frame_height})")
+        for row in h.empty_frames:
+            print(f"    frame {row} is empty")
+        for rows in h.duplicate_groups():
+            print(f"    frames {', '.join(map(str, rows))} are identical")
+        for a, b, distance in h.near_duplicates():
+            print(f"    frames {a} and {b} look alike (distance {distance}/64)")
+        if h.leftover_rows:
+            print(f"    {h.leftover_rows} rows below the last full frame")
+    print(f"{flagged} of {len(results)} sheets have empty or duplicate frames")
+    return 0
+
+
+def cmd_find_duplicates(args) -> int:
+    from program.analysis.frame_hash import np
+    from program.tools.sprite_index import build_index
+
+    if np is None:
+        print("Sprite hashing needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    def progress(done, total, entry):
+        print(f"[{done}/{total}] {entry.image_path}")
+
+    def describe(entry):
+        config = entry.config_path
+        return f"{entry.image_path} (used by {config})" if config else f"{entry.image_path} (no config)"
+
+    index = build_index(args.folder, jobs=args.jobs, rescan=args.rescan,
+                        progress=None if args.quiet else progress)
+    for path, error in index.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+
+    groups = index.duplicate_groups()
+    for group in groups:
+        print(f"[IDENTICAL] {group[0].width}x{group[0].height}, {len(group)} copies")
+        for entry in group:
+            print(f"    {describe(entry)}")
+    near = index.near_duplicates(args.distance)
+    for a, b, distance in near:
+        print(f"[SIMILAR] distance {distance}/64")
+        print(f"    {describe(a)}")
+        print(f"    {describe(b)}")
+    print(index.summary())
+    print(f"{len(groups)} identical group(s), {len(near)} similar pair(s), "
+          f"{index.wasted_bytes() / 1024:.1f} KiB in identical copies")
+    return 1 if index.failed else 0
+
+
+def cmd_render_preview(args) -> int:
+    from program.rendering.frame_atlas import DIR_LEFT, DIR_RIGHT
+    from program.tools.preview_export import export_tree
+
+    directions = {'left': (DIR_LEFT,), 'right': (DIR_RIGHT,), 'both': (DIR_LEFT, DIR_RIGHT)}[args.direction]
+
+    def progress(done, total, export):
+        print(f"[{done}/{total}] {export.out_path}")
+
+    report = export_tree(args.folder, fmt=args.format, out_root=args.out, zoom=args.zoom,
+                         directions=directions, background=args.background, boxes=args.boxes,
+                         light=args.light, jobs=args.jobs, progress=None if args.quiet else progress)
+    for path, error in report.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def cmd_load_project(args) -> int:
+    from program.tools.project_loader import load_project
+
+    def progress(done, total):
+        print(f"[{done}/{total}]")
+
+    project = load_project(args.folder, jobs=args.jobs, chunk_size=args.chunk_size,
+                           progress=None if args.quiet else progress)
+    for path, error in project.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    print(project.summary())
+    return 1 if project.failed else 0
+
+
+def cmd_export_table(args) -> int:
+    from program.tools.project_loader import load_project
+    from program.tools.project_table import ProjectTable, table_available
+
+    if not table_available():
+        print("The project table needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    project = load_project(args.folder, jobs=args.jobs)
+    for path, error in project.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    ProjectTable.from_project(project).write_csv(args.csv)
+    print(f"Wrote {len(project)} configs to {args.csv}")
+    return 1 if project.failed else 0
+
+
+def cmd_import_table(args) -> int:
+    from program.tools.project_loader import load_project
+    from program.tools.project_table import ProjectTable, apply_table, table_available
+
+    if not table_available():
+        print("The project table needs NumPy (pip install numpy)", file=sys.stderr)
+        return 1
+
+    try:
+        table, errors = ProjectTable.read_csv(args.csv, args.folder)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    report = apply_table(load_project(args.folder, jobs=args.jobs), table, dry_run=args.dry_run)
+    report.failed[:0] = errors
+    for path in report.written:
+        print(f"{'Would write' if args.dry_run else 'Wrote'} {path}")
+    for path, error in report.failed:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="SMBX NPC Editor batch tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="Convert legacy GIF/BMP + mask pairs to PNG")
+    convert.add_argument("folder", help="Folder to scan recursively")
+    convert.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    convert.add_argument("--force", action="store_true", help="Re-convert pairs whose PNG is up to date or was not written by the converter")
+    convert.add_argument("--move-originals", action="store_true",
+                         help="Move converted GIF/BMP pairs into a legacy-originals subfolder")
+    convert.add_argument("--dry-run", action="store_true", help="Only list the pairs that would be converted")
+    convert.add_argument("--quiet", "-q", action="store_true", help="Only print the summary")
+    convert.set_defaults(func=cmd_convert)
+
+    export = sub.add_parser("export-legacy", help="Export PNG sprites to legacy GIF + mask pairs")
+    export.add_argument("folder", help="Folder to scan recursively")
+    export.add_argument("--out", default=None, help="Write into this folder instead of beside the PNGs")
+    export.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    export.add_argument("--force", action="store_true", help="Re-export sprites whose GIFs are up to date")
+    export.add_argument("--colors", type=int, default=256, choices=range(2, 257), metavar="2..256",
+                        help="Palette size of the front GIF (default: 256)")
+    export.add_argument("--alpha-threshold", type=int, default=128, choices=range(1, 256), metavar="1..255",
+                        help="Minimum alpha of an opaque pixel (default: 128)")
+    export.add_argument("--dry-run", action="store_true", help="Only list the sprites that would be exported")
+    export.add_argument("--quiet", "-q", action="store_true", help="Only print the summary")
+    export.set_defaults(func=cmd_export_legacy)
+
+    detect = sub.add_parser("detect-frames", help="Compare configured frame geometry with the sprite sheets")
+    detect.add_argument("folder", help="Folder to scan recursively")
+    detect.add_argument("--all", action="store_true", help="Also list configs that match their sheet")
+    detect.set_defaults(func=cmd_detect_frames)
+
+    fit = sub.add_parser("fit-hitbox", help="Compare hitbox and GFX offsets with the sprites' opaque pixels")
+    fit.add_argument("folder", help="Folder to scan recursively")
+    fit.add_argument("--all", action="store_true", help="Also list configs whose hitbox already fits")
+    fit.set_defaults(func=cmd_fit_hitbox)
+
+    frames = sub.add_parser("check-frames", help="List empty, identical and near-duplicate frames")
+    frames.add_argument("folder", help="Folder to scan recursively")
+    frames.add_argument("--all", action="store_true", help="Also list sheets without findings")
+    frames.set_defaults(func=cmd_check_frames)
+
+    dupes = sub.add_parser("find-duplicates", help="Find identical and near-identical sprite sheets")
+    dupes.add_argument("folder", help="Folder to scan recursively")
+    dupes.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    dupes.add_argument("--distance", type=int, default=4, choices=range(0, 65), metavar="0..64",
+                       help="Largest hash distance of near-identical sheets (default: 4)")
+    dupes.add_argument("--rescan", action="store_true", help="Ignore stored hashes and hash every sheet again")
+    dupes.add_argument("--quiet", "-q", action="store_true", help="Only print the report")
+    dupes.set_defaults(func=cmd_find_duplicates)
+
+    render = sub.add_parser("render-preview", help="Render animated previews of NPC configs")
+    render.add_argument("folder", help="Folder to scan recursively")
+    render.add_argument("--format", "-f", default="gif", choices=("gif", "apng", "strip"),
+                        help="Animated GIF, animated PNG or a PNG strip of all frames (default: gif)")
+    render.add_argument("--out", default=None, help="Write into this folder instead of beside the configs")
+    render.add_argument("--zoom", "-z", type=int, default=2, choices=range(1, 17), metavar="1..16",
+                        help="Scale factor (default: 2)")
+    render.add_argument("--direction", default="both", choices=("left", "right", "both"),
+                        help="Directions to play (default: both)")
+    render.add_argument("--background", default=None, help="Background colour such as #1e1e1e (default: transparent)")
+    render.add_argument("--boxes", action="store_true", help="Draw the hitbox and graphics box")
+    render.add_argument("--light", action="store_true", help="Draw the light radius")
+    render.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    render.add_argument("--quiet", "-q", action="store_true", help="Only print the summary")
+    render.set_defaults(func=cmd_render_preview)
+
+    load = sub.add_parser("load-project", help="Load every config of an episode folder and report failures")
+    load.add_argument("folder", help="Folder to scan recursively")
+    load.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    load.add_argument("--chunk-size", type=int, default=64, help="Configs parsed per worker task (default: 64)")
+    load.add_argument("--quiet", "-q", action="store_true", help="Only print the summary")
+    load.set_defaults(func=cmd_load_project)
+
+    table_out = sub.add_parser("export-table", help="Write the parameters of every config to one CSV table")
+    table_out.add_argument("folder", help="Folder to scan recursively")
+    table_out.add_argument("csv", help="CSV file to write")
+    table_out.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    table_out.set_defaults(func=cmd_export_table)
+
+    table_in = sub.add_parser("import-table", help="Write the rows of an edited CSV table back to their configs")
+    table_in.add_argument("folder", help="Folder the table was exported from")
+    table_in.add_argument("csv", help="CSV file to read")
+    table_in.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: one per core)")
+    table_in.add_argument("--dry-run", action="store_true", help="Only list the configs that would be written")
+    table_in.set_defaults(func=cmd_import_table)
+    return parser
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    args = build_parser().parse_args()
+    sys.exit(args.func(args))
@@ -1,11 +1,13 @@
 #!/usr/bin/python3
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 
 # Clean import from the package
 from program.editor_window import MainWindow
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
@@ -0,0 +1,181 @@
+"""
+Frame geometry detection for SMBX sprite sheets
+
+Infers gfxwidth, gfxheight, frames and framestyle from a SheetProfile.
+Frames are stacked vertically and are as wide as the sheet, so every divisor
+of the sheet height is a candidate frame height. A candidate is scored by how
+much consecutive frames look alike (row projections and row extents) and how
+often its frame boundaries fall on empty rows; the smallest divisor of the
+best frame height that still scores well wins. The framestyle then follows
+from whether the second half (or quarters) of the frames mirror the first.
+"""
+
+from typing import Dict, Optional
+
+from .sheet_profile import SheetProfile, np
+
+MIN_FRAME_HEIGHT = 8
+# Lowest score for which a sheet is split into several frames at all
+MIN_SCORE = 0.6
+# Candidates within this distance of the best score count as equally good
+SCORE_TOLERANCE = 0.05
+# Any divisor of the best frame height scoring this well is preferred over it,
+# so sheets whose animation repeats are not read as a few very tall frames
+GOOD_SCORE = 0.7
+# Similarity needed to call one half of the frames the mirror of the other
+MIRROR_SCORE = 0.9
+
+
+class FrameGeometry:
+    """
+    Detected frame layout
+
+    Attributes:
+        gfxwidth, gfxheight: Frame size
+        frames: Frames per direction
+        framestyle: 0, 1 or 2 (see FRAME_STYLES)
+        confidence: 0..1 score of the chosen frame height
+    """
+
+    def __init__(self, gfxwidth: int, gfxheight: int, frames: int, framestyle: int, confidence: float):
+        self.gfxwidth = gfxwidth
+        self.gfxheight = gfxheight
+        self.frames = frames
+        self.framestyle = framestyle
+        self.confidence = confidence
+
+    def as_params(self) -> Dict[str, int]:
+        return {'gfxwidth': self.gfxwidth, 'gfxheight': self.gfxheight,
+                'frames': self.frames, 'framestyle': self.framestyle}
+
+    def differs_from(self, params) -> bool:
+        """True if the NPC parameters (with SMBX defaults) describe another layout"""
+        current = {'gfxwidth': params.get('gfxwidth') or self.gfxwidth,
+                   'gfxheight': params.get('gfxheight') or self.gfxheight,
+                   'frames': params.get('frames') or 1,
+                   'framestyle': params.get('framestyle') or 0}
+        return any(int(current[k]) != v for k, v in self.as_params().items())
+
+    def __str__(self) -> str:
+        return f"{self.gfxwidth}x{self.gfxheight}, {self.frames} frame(s), style {self.framestyle}"
+
+    def __repr__(self) -> str:
+        return f"FrameGeometry({self}, confidence={self.confidence:.2f})"
+
+
+def _frames(profile: SheetProfile, height: int):
+    """(N, h) views of rows/left/right for frames of the given height"""
+    n = profile.height // height
+    return (profile.rows[:n * height].reshape(n, height),
+            profile.left[:n * height].reshape(n, height),
+            profile.right[:n * height].reshape(n, height))
+
+
+def _mirrored(frames, width: int):
+    rows, left, right = frames
+    empty = rows == 0
+    return (rows,
+            np.where(empty, -1, width - 1 - right),
+            np.where(empty, -1, width - 1 - left))
+
+
+def _similarity(a, b, width: int) -> float:
+    """0..1 likeness of two equally shaped frame groups"""
+    rows_a, left_a, right_a = a
+    rows_b, left_b, right_b = b
+    total = int(rows_a.sum()) + int(rows_b.sum())
+    if total == 0:
+        return 1.0
+    rows_score = 1.0 - np.abs(rows_a - rows_b).sum() / total
+
+    filled_a, filled_b = rows_a > 0, rows_b > 0
+    either = filled_a | filled_b
+    both = filled_a & filled_b
+    # Rows filled in only one frame count as completely different
+    span_diff = np.where(both, (np.abs(left_a - left_b) + np.abs(right_a - right_b)) / (2.0 * max(1, width)), 1.0)
+    extent_score = 1.0 - span_diff[either].mean()
+    return float(rows_score * extent_score)
+
+
+def _score(profile: SheetProfile, height: int) -> float:
+    frames = _frames(profile, height)
+    n = frames[0].shape[0]
+    head = tuple(f[:-1] for f in frames)
+    tail = tuple(f[1:] for f in frames)
+    likeness = _similarity(head, tail, profile.width)
+
+    boundaries = np.arange(1, n) * height
+    empty_edge = (profile.rows[boundaries - 1] == 0) | (profile.rows[boundaries] == 0)
+    return likeness * (0.8 + 0.2 * float(empty_edge.mean()))
+
+
+def _detect_style(profile: SheetProfile, height: int, hint: Optional[int]) -> int:
+    frames = _frames(profile, height)
+    n = frames[0].shape[0]
+    width = profile.width
+
+    def group(start, count):
+        return tuple(f[start:start + count] for f in frames)
+
+    def mirrors(a, b):
+        mirror = _similarity(a, _mirrored(b, width), width)
+        same = _similarity(a, b, width)
+        return mirror >= MIRROR_SCORE and mirror > same + 0.02, mirror >= MIRROR_SCORE
+
+    style1 = style2 = False
+    ambiguous = False
+    if n % 2 == 0:
+        style1, mirror_like = mirrors(group(0, n // 2), group(n // 2, n // 2))
+        ambiguous = mirror_like and not style1
+    if not style1 and n % 4 == 0:
+        q = n // 4
+        walk, walk_like = mirrors(group(0, q), group(q, q))
+        held, held_like = mirrors(group(2 * q, q), group(3 * q, q))
+        style2 = (walk or held) and walk_like and held_like
+
+    if style2:
+        return 2
+    if style1:
+        return 1
+    # Symmetric sprites look the same either way: keep what the config says
+    if ambiguous and hint in (1, 2) and n % (2 * hint) == 0:
+        return hint
+    return 0
+
+
+def detect_frame_geometry(profile: SheetProfile, hint=None) -> Optional[FrameGeometry]:
+    """
+    Infer the frame layout of a sheet
+
+    Args:
+        profile: Projections of the sheet
+        hint: Current NPC parameters, used only to break ties for symmetric sprites
+
+    Returns:
+        The detected geometry, or None for an empty sheet
+    """
+    if profile is None or profile.is_empty:
+        return None
+
+    height = profile.height
+    candidates = [h for h in range(max(1, MIN_FRAME_HEIGHT), height // 2 + 1) if height % h == 0]
+    # A profile without variation carries no evidence for any split
+    flat = (profile.rows.min() == profile.rows.max() and profile.left.min() == profile.left.max()
+            and profile.right.min() == profile.right.max())
+    scores = {} if flat else {h: _score(profile, h) for h in candidates}
+
+    best = max(scores.values(), default=0.0)
+    if best < MIN_SCORE:
+        return FrameGeometry(profile.width, height, 1, 0, 1.0 - best)
+
+    best_height = max(scores, key=lambda h: (scores[h], -h))
+    threshold = min(best - SCORE_TOLERANCE, GOOD_SCORE)
+    frame_height = min(h for h, s in scores.items() if best_height % h == 0 and s >= threshold)
+    style = _detect_style(profile, frame_height, int(hint.get('framestyle') or 0) if hint else None)
+    count = height // frame_height // (1, 2, 4)[style]
+    return FrameGeometry(profile.width, frame_height, count, style, scores[frame_height])
+
+
+def detect_sheet_geometry(sheet, hint=None) -> Optional[FrameGeometry]:
+    """detect_frame_geometry for a QPixmap or LazySheet; None without NumPy"""
+    return detect_frame_geometry(SheetProfile.from_sheet(sheet), hint)
@@ -0,0 +1,219 @@
+"""
+Per-frame content hashing of sprite sheets
+
+Every frame slice of a sheet gets an exact hash (BLAKE2b of its pixels, with
+fully transparent pixels normalised) and a 64-bit perceptual difference hash
+(alpha-weighted luminance reduced to 8x9 blocks). From those the index flags
+empty frames, exact duplicates and near duplicates.
+
+Hashes are cached per image version (cacheKey) and frame size, so the
+editor panel, the frame atlas and batch tools all share one computation.
+The cache is thread safe; the editor computes hashes on its thread pool.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PyQt6.QtGui import QImage, QPixmap
+
+from ..utils.image_utils import argb32_view
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, frame hashing is unavailable without it
+    np = None
+
+# Hamming distance (of 64 bits) up to which two frames count as near duplicates
+NEAR_DUPLICATE_DISTANCE = 6
+_HASH_ROWS, _HASH_COLS = 8, 9
+
+_indexes: "OrderedDict[Tuple[int, int, int], FrameHashes]" = OrderedDict()
+_MAX_INDEXES = 16
+_indexes_lock = threading.Lock()
+
+
+class FrameHashes:
+    """
+    Hashes of the frames (sheet rows of frame_height) of one sheet
+
+    Attributes:
+        frame_width, frame_height: Slice size
+        exact: Hex digest per frame
+        perceptual: (N,) uint64 difference hash per frame
+        empty: (N,) bool, True for fully transparent frames
+        leftover_rows: Sheet rows below the last full frame
+    """
+
+    def __init__(self, frame_width: int, frame_height: int, exact: List[str], perceptual, empty,
+                 leftover_rows: int = 0):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.exact = exact
+        self.perceptual = perceptual
+        self.empty = empty
+        self.leftover_rows = leftover_rows
+        self._canonical: Dict[str, int] = {}
+        for row, digest in enumerate(exact):
+            self._canonical.setdefault(digest, row)
+
+    @property
+    def count(self) -> int:
+        return len(self.exact)
+
+    @property
+    def empty_frames(self) -> List[int]:
+        return [int(i) for i in np.flatnonzero(self.empty)]
+
+    def canonical_row(self, row: int) -> int:
+        """First sheet row with exactly the same pixels as ``row``"""
+        if 0 <= row < self.count:
+            return self._canonical[self.exact[row]]
+        return row
+
+    def duplicate_groups(self) -> List[List[int]]:
+        """Groups of non-empty frames with identical pixels"""
+        groups: Dict[str, List[int]] = {}
+        for row, digest in enumerate(self.exact):
+            if not self.empty[row]:
+                groups.setdefault(digest, []).append(row)
+        return [rows for rows in groups.values() if len(rows) > 1]
+
+    def distances(self):
+        """(N, N) Hamming distances between the perceptual hashes"""
+        return hamming_distances(self.perceptual, self.perceptual)
+
+    def near_duplicates(self, max_distance: int = NEAR_DUPLICATE_DISTANCE) -> List[Tuple[int, int, int]]:
+        """(row, row, distance) for non-empty frames that look alike but differ in pixels"""
+        if self.count < 2:
+            return []
+        dist = self.distances()
+        rows, cols = np.nonzero(np.triu(dist <= max_distance, k=1))
+        return [(int(a), int(b), int(dist[a, b])) for a, b in zip(rows, cols)
+                if not self.empty[a] and not self.empty[b] and self.exact[a] != self.exact[b]]
+
+
+def hamming_distances(a, b):
+    """(len(a), len(b)) bit distances between two uint64 hash arrays"""
+    xor = a[:, None] ^ b[None, :]
+    bitwise_count = getattr(np, 'bitwise_count', None)
+    if bitwise_count is not None:
+        return bitwise_count(xor).astype(np.int32)
+    bits = np.unpackbits(xor.view(np.uint8).reshape(len(a), len(b), 8), axis=2)
+    return bits.sum(axis=2, dtype=np.int32)
+
+
+def _frame_rows(sheet, fw: int, fh: int) -> Iterator:
+    """(fh, fw) uint32 ARGB arrays of every full frame, top to bottom"""
+    count = sheet.height() // fh
+    if isinstance(sheet, (QImage, QPixmap)):
+        view, _image = argb32_view(sheet.toImage() if isinstance(sheet, QPixmap) else sheet)
+        for row in range(count):
+            yield view[row * fh:(row + 1) * fh, :fw]
+        return
+
+    # LazySheet: stitch each frame together from its band tiles
+    band_height = sheet.band_height
+    for row in range(count):
+        top, bottom = row * fh, (row + 1) * fh
+        parts = []
+        for index in range(top // band_height, (bottom - 1) // band_height + 1):
+            band = sheet.band(index)
+            band_top = index * band_height
+            if band is None:
+                parts.append(np.zeros((min(bottom, band_top + band_height) - max(top, band_top), fw), np.uint32))
+                continue
+            view, _image = argb32_view(band)
+            parts.append(view[max(top, band_top) - band_top:min(bottom, band_top + band.height()) - band_top, :fw].copy())
+        yield np.concatenate(parts)
+
+
+def _perceptual_hash(frame) -> int:
+    """64-bit difference hash of alpha-weighted luminance"""
+    alpha = (frame >> 24).astype(np.float32)
+    lum = (0.299 * ((frame >> 16) & 0xFF) + 0.587 * ((frame >> 8) & 0xFF) + 0.114 * (frame & 0xFF))
+    signal = alpha * (0.25 + 0.75 * lum.astype(np.float32) / 255.0)
+
+    # Tiny frames are repeated up so every block covers at least one pixel
+    ry = -(-_HASH_ROWS // signal.shape[0])
+    rx = -(-_HASH_COLS // signal.shape[1])
+    if ry > 1 or rx > 1:
+        signal = np.repeat(np.repeat(signal, ry, axis=0), rx, axis=1)
+    h, w = signal.shape
+    row_edges = (np.arange(_HASH_ROWS) * h) // _HASH_ROWS
+    col_edges = (np.arange(_HASH_COLS) * w) // _HASH_COLS
+    blocks = np.add.reduceat(np.add.reduceat(signal, row_edges, axis=0), col_edges, axis=1)
+    blocks /= np.outer(np.diff(np.append(row_edges, h)), np.diff(np.append(col_edges, w)))
+
+    bits = (blocks[:, 1:] > blocks[:, :-1]).reshape(-1)
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def _exact_hash(pixels) -> str:
+    """BLAKE2b of ARGB pixels; colour under fully transparent pixels is invisible, so it is zeroed"""
+    normalised = np.where((pixels >> 24) == 0, 0, pixels).astype('<u4')
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array(pixels.shape, dtype='<u4').tobytes())
+    digest.update(normalised.tobytes())
+    return digest.hexdigest()
+
+
+def image_hashes(image: QImage) -> Tuple[str, int]:
+    """
+    (exact, perceptual) hash of a whole image, comparable across files
+
+    Returns:
+        Hex digest and 64-bit difference hash; requires NumPy
+    """
+    view, _image = argb32_view(image)
+    return _exact_hash(view), _perceptual_hash(view)
+
+
+def compute_frame_hashes(sheet, frame_width: int, frame_height: int) -> FrameHashes:
+    """Hash every full frame of a QImage, QPixmap or LazySheet"""
+    fw = max(1, min(frame_width, sheet.width()))
+    fh = max(1, frame_height)
+    exact, perceptual, empty = [], [], []
+    for frame in _frame_rows(sheet, fw, fh):
+        exact.append(_exact_hash(frame))
+        perceptual.append(_perceptual_hash(frame))
+        empty.append(not (frame >> 24).any())
+    return FrameHashes(fw, fh, exact, np.array(perceptual, dtype=np.uint64),
+                       np.array(empty, dtype=bool), sheet.height() % fh)
+
+
+def frame_hashes(sheet, frame_width: int, frame_height: int,
+                 cache_key: Optional[int] = None) -> Optional[FrameHashes]:
+    """
+    Cached frame hashes of a sheet version
+
+    Args:
+        cache_key: Version the hashes are cached under (default: sheet.cacheKey()),
+            so a QImage copy of a pixmap hashed on a worker fills the pixmap's entry
+
+    Returns None without NumPy or for a null sheet.
+    """
+    if np is None or sheet is None or sheet.isNull() or frame_height <= 0:
+        return None
+    key = (sheet.cacheKey() if cache_key is None else cache_key, frame_width, frame_height)
+    with _indexes_lock:
+        hashes = _indexes.get(key)
+        if hashes is not None:
+            _indexes.move_to_end(key)
+            return hashes
+    # Computed outside the lock; two threads racing on one key just agree
+    hashes = compute_frame_hashes(sheet, frame_width, frame_height)
+    with _indexes_lock:
+        _indexes[key] = hashes
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return hashes
+
+
+def cached_frame_hashes(sheet, frame_width: int, frame_height: int) -> Optional[FrameHashes]:
+    """Frame hashes if they were already computed, without computing them"""
+    if sheet is None:
+        return None
+    with _indexes_lock:
+        return _indexes.get((sheet.cacheKey(), frame_width, frame_height))
@@ -0,0 +1,140 @@
+"""
+Hitbox and GFX offset fitting from sprite alpha
+
+Computes tight alpha bounding boxes of every frame of every direction from a
+SheetProfile and proposes width/height/gfxoffsetx/gfxoffsety so that the
+sprite content sits on the hitbox the way SMBX draws it: frames are centred
+horizontally on the hitbox (plus gfxoffsetx) and their bottom edge lines up
+with the hitbox bottom (plus gfxoffsety), see AnimationPreview.get_active_rect.
+Right-facing frames of framestyle 1/2 use a mirrored gfxoffsetx, so their
+boxes are mirrored into left-facing coordinates before taking the union.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from ..rendering.frame_atlas import (DIR_LEFT, DIR_RIGHT, DIR_LEFT_HELD, DIR_RIGHT_HELD,
+                                     frame_geometry, frame_source_row)
+from .sheet_profile import SheetProfile, np
+
+FIT_KEYS = ('width', 'height', 'gfxoffsetx', 'gfxoffsety')
+
+# Box = (left, top, right, bottom), inclusive, in frame-local pixels
+Box = Tuple[int, int, int, int]
+
+
+def frame_boxes(profile: SheetProfile, params) -> Dict[int, "np.ndarray"]:
+    """
+    Tight alpha boxes of every frame, per direction
+
+    Returns:
+        {direction: (frames, 4) int array of (left, top, right, bottom)},
+        rows of -1 for empty frames. Boxes are in the frame's own pixels
+        (not mirrored).
+    """
+    fw, fh, frames, style = frame_geometry(params)
+    rows_total = profile.height // fh
+    if rows_total == 0:
+        return {}
+    n = rows_total * fh
+    rows = profile.rows[:n].reshape(rows_total, fh)
+    left = profile.left[:n].reshape(rows_total, fh)
+    right = profile.right[:n].reshape(rows_total, fh)
+
+    filled = rows > 0
+    has_pixels = filled.any(axis=1)
+    top = np.where(has_pixels, filled.argmax(axis=1), -1)
+    bottom = np.where(has_pixels, fh - 1 - filled[:, ::-1].argmax(axis=1), -1)
+    # Columns beyond gfxwidth are never drawn
+    lo = np.where(filled, np.minimum(left, fw - 1), fw).min(axis=1)
+    hi = np.where(filled, np.minimum(right, fw - 1), -1).max(axis=1)
+    boxes = np.stack((np.where(has_pixels, lo, -1), top, np.where(has_pixels, hi, -1), bottom), axis=1)
+
+    directions = (DIR_LEFT, DIR_RIGHT) if style < 2 else (DIR_LEFT, DIR_RIGHT, DIR_LEFT_HELD, DIR_RIGHT_HELD)
+    result = {}
+    for direction in directions:
+        sheet_rows = [frame_source_row(style, frames, direction, i)[0] for i in range(frames)]
+        picked = np.full((frames, 4), -1, dtype=np.int64)
+        valid = [i for i, r in enumerate(sheet_rows) if r < rows_total]
+        picked[valid] = boxes[[sheet_rows[i] for i in valid]]
+        result[direction] = picked
+    return result
+
+
+class HitboxFit:
+    """
+    Proposed hitbox and GFX offsets
+
+    Attributes:
+        width, height, gfxoffsetx, gfxoffsety: Proposed parameter values
+        union: Union of all frame boxes in left-facing frame pixels
+        boxes: Per-direction frame boxes as returned by frame_boxes
+    """
+
+    def __init__(self, width: int, height: int, gfxoffsetx: int, gfxoffsety: int,
+                 union: Box, boxes: Dict[int, "np.ndarray"]):
+        self.width = width
+        self.height = height
+        self.gfxoffsetx = gfxoffsetx
+        self.gfxoffsety = gfxoffsety
+        self.union = union
+        self.boxes = boxes
+
+    def as_params(self) -> Dict[str, int]:
+        return {'width': self.width, 'height': self.height,
+                'gfxoffsetx': self.gfxoffsetx, 'gfxoffsety': self.gfxoffsety}
+
+    def differences(self, params) -> Dict[str, Tuple[Optional[int], int]]:
+        """{key: (current, proposed)} for every value the fit would change"""
+        defaults = {'width': 32, 'height': 32, 'gfxoffsetx': 0, 'gfxoffsety': 0}
+        diff = {}
+        for key, proposed in self.as_params().items():
+            current = params.get(key)
+            if int(current if current is not None else defaults[key]) != proposed:
+                diff[key] = (current, proposed)
+        return diff
+
+    def __str__(self) -> str:
+        return (f"hitbox {self.width}x{self.height}, "
+                f"offset ({self.gfxoffsetx}, {self.gfxoffsety})")
+
+
+def fit_hitbox(profile: SheetProfile, params) -> Optional[HitboxFit]:
+    """
+    Fit the hitbox to the union of all frames
+
+    Returns:
+        The proposal, or None if the frames contain no opaque pixels
+    """
+    if profile is None:
+        return None
+    fw, fh, frames, style = frame_geometry(params)
+    boxes = frame_boxes(profile, params)
+    if not boxes:
+        return None
+
+    stacked = []
+    for direction, dir_boxes in boxes.items():
+        dir_boxes = dir_boxes[dir_boxes[:, 0] >= 0]
+        if style >= 1 and direction in (DIR_RIGHT, DIR_RIGHT_HELD) and len(dir_boxes):
+            # Mirrored gfxoffsetx: compare in left-facing coordinates
+            dir_boxes = np.stack((fw - 1 - dir_boxes[:, 2], dir_boxes[:, 1],
+                                  fw - 1 - dir_boxes[:, 0], dir_boxes[:, 3]), axis=1)
+        stacked.append(dir_boxes)
+    stacked = np.concatenate(stacked) if stacked else np.empty((0, 4))
+    if len(stacked) == 0:
+        return None
+
+    x0, y0 = int(stacked[:, 0].min()), int(stacked[:, 1].min())
+    x1, y1 = int(stacked[:, 2].max()), int(stacked[:, 3].max())
+    width, height = x1 - x0 + 1, y1 - y0 + 1
+
+    # Content centre on the hitbox centre: -fw/2 + ox + (x0 + x1 + 1)/2 == 0
+    gfxoffsetx = int(round((fw - (x0 + x1 + 1)) / 2))
+    # Content bottom on the hitbox bottom: height/2 - fh + oy + y1 + 1 == height/2
+    gfxoffsety = fh - (y1 + 1)
+    return HitboxFit(width, height, gfxoffsetx, gfxoffsety, (x0, y0, x1, y1), boxes)
+
+
+def fit_sheet_hitbox(sheet, params) -> Optional[HitboxFit]:
+    """fit_hitbox for a QPixmap or LazySheet; None without NumPy"""
+    return fit_hitbox(SheetProfile.from_sheet(sheet), params)
@@ -0,0 +1,135 @@
+"""
+Alpha projections of sprite sheets
+
+A SheetProfile condenses a decoded sheet into per-row and per-column
+statistics of its opaque pixels: how many there are per row, where each row's
+opaque span starts and ends, and how many there are per column. Frame
+detection and hitbox fitting work on these few vectors instead of the pixels,
+so they run in milliseconds once the profile exists.
+
+Profiles of lazily loaded sheets are built band by band while the sprite
+worker writes the band tiles (see sheet_reader.write_tiles) and stored next
+to them, so the GUI thread only ever loads a few small vectors.
+"""
+
+import os
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from PyQt6.QtGui import QImage
+
+from ..utils.image_utils import argb32_view
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, sheet analysis is unavailable without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Pixels with at least this alpha count as part of the sprite
+OPAQUE_ALPHA = 1
+PROFILE_FILE = "profile.npz"
+
+_profiles: "OrderedDict[int, SheetProfile]" = OrderedDict()
+_MAX_PROFILES = 16
+
+
+class SheetProfile:
+    """
+    Opaque-pixel projections of a sheet
+
+    Attributes:
+        width, height: Sheet size in pixels
+        rows: (H,) opaque pixel count of every row
+        left, right: (H,) first/last opaque column of every row, -1 for empty rows
+        cols: (W,) opaque pixel count of every column
+    """
+
+    def __init__(self, width: int, height: int, rows, left, right, cols):
+        self.width = width
+        self.height = height
+        self.rows = rows
+        self.left = left
+        self.right = right
+        self.cols = cols
+
+    @classmethod
+    def from_image(cls, image: QImage) -> "SheetProfile":
+        profile = cls.empty(image.width(), image.height())
+        profile.scan(image, 0)
+        return profile
+
+    @classmethod
+    def from_sheet(cls, sheet) -> Optional["SheetProfile"]:
+        """
+        Profile of a QPixmap or LazySheet, cached per sheet (cacheKey)
+
+        Returns None without NumPy or for a null sheet.
+        """
+        if np is None or sheet is None or sheet.isNull():
+            return None
+        key = sheet.cacheKey()
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+            return profile
+
+        tile_dir = getattr(sheet, 'tile_dir', None)
+        if tile_dir:
+            profile = cls.load(tile_dir, sheet.width(), sheet.height())
+            if profile is None:
+                # Scanning every band here would stall the GUI thread
+                logger.debug(f"No stored sheet profile in {tile_dir}")
+                return None
+        else:
+            profile = cls.from_image(sheet.toImage())
+
+        _profiles[key] = profile
+        while len(_profiles) > _MAX_PROFILES:
+            _profiles.popitem(last=False)
+        return profile
+
+    @classmethod
+    def load(cls, tile_dir: str, width: int, height: int) -> Optional["SheetProfile"]:
+        """Profile stored by save, None when there is none"""
+        try:
+            with np.load(os.path.join(tile_dir, PROFILE_FILE)) as data:
+                return cls(width, height, data['rows'], data['left'], data['right'], data['cols'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, tile_dir: str) -> None:
+        """Store the profile next to a sheet's band tiles"""
+        try:
+            np.savez(os.path.join(tile_dir, PROFILE_FILE),
+                     rows=self.rows, left=self.left, right=self.right, cols=self.cols)
+        except OSError as e:
+            logger.debug(f"Could not store sheet profile in {tile_dir}: {e}")
+
+    @classmethod
+    def empty(cls, width: int, height: int) -> "SheetProfile":
+        """Profile of a fully transparent sheet, to be filled band by band with scan"""
+        return cls(width, height,
+                   np.zeros(height, dtype=np.int32),
+                   np.full(height, -1, dtype=np.int32),
+                   np.full(height, -1, dtype=np.int32),
+                   np.zeros(width, dtype=np.int32))
+
+    def scan(self, image: QImage, top: int) -> None:
+        """Accumulate the projections of image, whose first row is sheet row ``top``"""
+        argb, image = argb32_view(image)
+        opaque = (argb[:, :self.width] >> 24) >= OPAQUE_ALPHA
+
+        h = opaque.shape[0]
+        counts = opaque.sum(axis=1, dtype=np.int32)
+        filled = counts > 0
+        self.rows[top:top + h] = counts
+        self.left[top:top + h] = np.where(filled, opaque.argmax(axis=1), -1)
+        self.right[top:top + h] = np.where(filled, self.width - 1 - opaque[:, ::-1].argmax(axis=1), -1)
+        self.cols += opaque.sum(axis=0, dtype=np.int32)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.rows.any()
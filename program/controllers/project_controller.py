@@ -0,0 +1,90 @@
+"""
+Background loading of episode folders for the editor
+
+Runs load_project on a QThreadPool worker so the window keeps repainting
+while the process pool parses configs. Progress and the finished Project
+reach the GUI thread through queued signals; only the latest request is
+delivered, like SpriteLoader does for sprites.
+"""
+
+import logging
+import multiprocessing
+from typing import Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from ..tools.project_loader import load_project
+
+logger = logging.getLogger(__name__)
+
+
+class _LoadSignals(QObject):
+    progress = pyqtSignal(int, int, int)  # request id, done, total
+    finished = pyqtSignal(object)         # The finished ProjectLoadTask
+
+
+class ProjectLoadTask(QRunnable):
+    """Worker that loads one project folder off the GUI thread"""
+
+    def __init__(self, request_id: int, root: str, jobs: Optional[int] = None):
+        super().__init__()
+        self.request_id = request_id
+        self.root = root
+        self.jobs = jobs
+        self.project = None
+        self.error = ""
+        self.signals = _LoadSignals()
+
+    def run(self):
+        try:
+            # Forking a process that runs Qt threads is unsafe, start clean workers instead
+            self.project = load_project(
+                self.root, self.jobs, mp_context=multiprocessing.get_context('spawn'),
+                progress=lambda done, total: self.signals.progress.emit(self.request_id, done, total))
+        except Exception as e:
+            logger.error(f"Failed to load project: {self.root}", exc_info=e)
+            self.error = str(e)
+        self.signals.finished.emit(self)
+
+
+class ProjectController(QObject):
+    """Loads episode folders in the background"""
+    progressChanged = pyqtSignal(int, int)  # done, total
+    projectLoaded = pyqtSignal(object)      # Project
+    loadFailed = pyqtSignal(str)            # Error message
+
+    def __init__(self, parent=None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.project = None
+        self._request_id = 0
+        # PyQt must keep the Python side of queued tasks alive until they finish
+        self._tasks: Set[ProjectLoadTask] = set()
+
+    @property
+    def is_loading(self) -> bool:
+        return any(t.request_id == self._request_id for t in self._tasks)
+
+    def load(self, root: str, jobs: Optional[int] = None) -> None:
+        """Start loading root; a load still in flight is superseded"""
+        self._request_id += 1
+        task = ProjectLoadTask(self._request_id, root, jobs)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.finished.connect(self._on_task_finished)
+        self._tasks.add(task)
+        self.pool.start(task)
+
+    def _on_progress(self, request_id, done, total):
+        if request_id == self._request_id:
+            self.progressChanged.emit(done, total)
+
+    def _on_task_finished(self, task):
+        self._tasks.discard(task)
+        if task.request_id != self._request_id:
+            logger.debug("Discarding stale project load (request %d)", task.request_id)
+            return
+        if task.project is None:
+            self.loadFailed.emit(task.error)
+            return
+        self.project = task.project
+        self.projectLoaded.emit(task.project)
@@ -4,11 +4,11 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QRadioButton, QFileDialog, QFrame, QPushButton, 
                              QFormLayout, QSizePolicy, QToolButton, QScrollArea,
                              QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView,
-                             QButtonGroup, QSplitter, QStatusBar)
+                             QButtonGroup, QSplitter, QStatusBar, QDockWidget)
 from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer, QFileSystemWatcher
 from PyQt6.QtGui import QUndoStack, QAction, QKeySequence
 from .npc_data import NPCData
-from .npc_definitions import NPC_DEFS
+from .npc_schema import SCHEMA
 from .preview_widget import AnimationPreview
 from .undo_commands import (ChangeParameterCommand, ChangeMultipleParametersCommand,
                             ToggleParameterCommand, AddCustomParameterCommand,
@@ -18,6 +18,15 @@ from .ui.widgets import TriStateBoolWidget, CollapsibleBox, NoResizeSplitter, ge
 from .ui.form_builder import FormBuilder
 from .ui.styles import AppStyles
 from .controllers.file_controller import FileController
+from .controllers.project_controller import ProjectController
+from .error_handler import ErrorHandler
+from .analysis.frame_detect import detect_sheet_geometry
+from .analysis.hitbox_fit import fit_sheet_hitbox
+from .rendering.frame_atlas import frame_geometry
+from .rendering.sandbox import sandbox_available
+from .ui.frame_panel import FrameAnalysisPanel
+from .ui.project_panel import ProjectPanel
+from .utils.image_utils import load_sprite_image, save_legacy_sprite
 
 
 
@@ -48,12 +57,25 @@ class MainWindow(QMainWindow):
         self.file_controller.fileLoaded.connect(self.on_file_loaded)
         self.file_controller.fileSaved.connect(self.on_file_saved)
         self.file_controller.fileExternalChange.connect(self.on_external_file_changed)
+        self.project_controller = ProjectController(self)
+        self.project_controller.progressChanged.connect(self.on_project_progress)
+        self.project_controller.projectLoaded.connect(self.on_project_loaded)
+        self.project_controller.loadFailed.connect(self.on_project_failed)
         
         self.setup_menu_bar()
         
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
+
+        # Project panel, shown once a folder is opened
+        self.project_panel = ProjectPanel()
+        self.project_panel.configActivated.connect(self.file_controller.process_load_path)
+        self.project_dock = QDockWidget("Project", self)
+        self.project_dock.setObjectName("projectDock")
+        self.project_dock.setWidget(self.project_panel)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.project_dock)
+        self.project_dock.hide()
         
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -93,7 +115,7 @@ class MainWindow(QMainWindow):
         # Build Standard UI
         self.form_builder = FormBuilder(self)
         self.ui_sections, self.category_keys, self.all_widgets, self.param_checkboxes = \
-            self.form_builder.build_standard_ui(NPC_DEFS, self.form_layout)
+            self.form_builder.build_standard_ui(SCHEMA, self.form_layout)
         
         # Connect signals for standard widgets
         for key, widget in self.all_widgets.items():
@@ -156,14 +178,51 @@ class MainWindow(QMainWindow):
         view_ctrl.addWidget(self.rb_left)
         view_ctrl.addWidget(self.rb_right)
         view_ctrl.addStretch()
+        self.btn_detected_frames = QPushButton("Use Detected Frames")
+        self.btn_detected_frames.setVisible(False)
+        self.btn_detected_frames.clicked.connect(self.apply_detected_geometry)
+        view_ctrl.addWidget(self.btn_detected_frames)
+        self.btn_fit_hitbox = QPushButton("Fit Hitbox")
+        self.btn_fit_hitbox.setToolTip("Fit width/height and GFX offsets to the opaque pixels of all frames")
+        self.btn_fit_hitbox.setEnabled(False)
+        self.btn_fit_hitbox.clicked.connect(self.apply_hitbox_fit)
+        view_ctrl.addWidget(self.btn_fit_hitbox)
+        self.chk_minimap = QCheckBox("Minimap")
+        self.chk_minimap.setChecked(True)
+        self.chk_minimap.setToolTip("Show the sprite sheet overview")
+        view_ctrl.addWidget(self.chk_minimap)
+        self.chk_sandbox = QCheckBox("Sandbox")
+        self.spin_sandbox = QSpinBox()
+        self.spin_sandbox.setRange(1, 5000)
+        self.spin_sandbox.setValue(200)
+        self.spin_sandbox.setSuffix(" NPCs")
+        if not sandbox_available():
+            self.chk_sandbox.setEnabled(False)
+            self.chk_sandbox.setToolTip("The physics sandbox needs NumPy")
+        else:
+            self.chk_sandbox.setToolTip("Simulate many instances of this NPC on a tile floor")
+        self.spin_sandbox.setEnabled(False)
+        view_ctrl.addWidget(self.chk_sandbox)
+        view_ctrl.addWidget(self.spin_sandbox)
         r_layout.addLayout(view_ctrl)
 
         self.preview = AnimationPreview(self.npc_data)
         self.preview.dataChanged.connect(self.sync_ui_from_visual)
         self.preview.dragStarted.connect(self.on_visual_drag_start)
         self.preview.dragFinished.connect(self.on_visual_drag_complete)
+        self.chk_minimap.toggled.connect(self.preview.set_minimap_visible)
+        self.chk_sandbox.toggled.connect(self.on_sandbox_changed)
+        self.spin_sandbox.valueChanged.connect(self.on_sandbox_changed)
+        self.preview.spriteChanged.connect(self.update_sheet_analysis)
+        self._detected_geometry = None
         
         r_layout.addWidget(self.preview)
+
+        self.frame_box = CollapsibleBox("Frame Analysis")
+        self.frame_panel = FrameAnalysisPanel()
+        self.frame_box.content_layout.addRow(self.frame_panel)
+        self.frame_box.arrow_btn.toggled.connect(lambda *_: self.update_frame_panel())
+        r_layout.addWidget(self.frame_box)
         splitter.addWidget(right_panel)
         splitter.setStretchFactor(0, 1)
         splitter.setStretchFactor(1, 1)
@@ -204,33 +263,13 @@ class MainWindow(QMainWindow):
 
     def update_description(self, param_key):
         """Update the description label with info about the selected parameter"""
-        if param_key not in NPC_DEFS:
+        if param_key not in SCHEMA:
             return
         
-        definition = NPC_DEFS[param_key]
-        
-        # Get parameter label
-        label = definition.get('label', param_key)
-        
-        # Get description/tips
-        tips = definition.get('tips', '')
-        
-        # Get type info
-        param_type = definition.get('type')
-        if param_type == bool:
-            type_str = "Boolean"
-        elif param_type == int:
-            type_str = "Integer"
-            min_val = definition.get('min')
-            max_val = definition.get('max')
-            if min_val is not None or max_val is not None:
-                type_str += f" ({min_val} to {max_val})" if min_val is not None and max_val is not None else ""
-        elif param_type == float:
-            type_str = "Float"
-        elif param_type == "enum":
-            type_str = "Choice"
-        else:
-            type_str = "Text"
+        spec = SCHEMA[param_key]
+        label = spec.label
+        tips = spec.tips
+        type_str = spec.type_name
         
         # Build description text
         desc_text = f"<b>{label}</b> ({type_str})"
@@ -296,6 +335,13 @@ class MainWindow(QMainWindow):
             self.btn_play_pause.setText("⏸")  # Pause symbol
             self.btn_play_pause.setToolTip("Pause animation")
     
+    def on_sandbox_changed(self, *_):
+        """Start, resize or stop the physics sandbox - preview only, not saved"""
+        enabled = self.chk_sandbox.isChecked()
+        self.spin_sandbox.setEnabled(enabled)
+        self.btn_hitbox_mode.setEnabled(not enabled)
+        self.preview.set_sandbox(self.spin_sandbox.value() if enabled else 0)
+
     def on_step_frame(self):
         """Manually advance to next frame - preview only, not saved"""
         self.preview.manual_step_frame()
@@ -308,11 +354,19 @@ class MainWindow(QMainWindow):
         action_load.setShortcut(QKeySequence.StandardKey.Open)
         action_load.triggered.connect(self.load_file)
         file_menu.addAction(action_load)
+
+        action_open_project = QAction("Open Project &Folder...", self)
+        action_open_project.triggered.connect(self.open_project)
+        file_menu.addAction(action_open_project)
         
         action_save = QAction("&Save", self)
         action_save.setShortcut(QKeySequence.StandardKey.Save)
         action_save.triggered.connect(self.save_file)
         file_menu.addAction(action_save)
+
+        action_export_legacy = QAction("Export Legacy &GIF + Mask...", self)
+        action_export_legacy.triggered.connect(self.export_legacy_sprite)
+        file_menu.addAction(action_export_legacy)
         
         file_menu.addSeparator()
         action_exit = QAction("E&xit", self)
@@ -333,6 +387,69 @@ class MainWindow(QMainWindow):
     def on_undo_stack_changed(self, idx):
         if self.undo_stack.canUndo():
             self.status_bar.showMessage(f"Action: {self.undo_stack.undoText()}", 3000)
+        self.update_sheet_analysis()
+
+    def update_sheet_analysis(self):
+        """Refresh everything derived from the sheet and the frame parameters"""
+        self.update_detected_geometry()
+        self.update_frame_panel()
+
+    def update_frame_panel(self):
+        # Hashing touches every frame, so only do it while the panel is open
+        if not self.frame_box.arrow_btn.isChecked():
+            return
+        fw, fh, _, _ = frame_geometry(self.npc_data.standard_params)
+        self.frame_panel.request(self.preview.pixmap, fw, fh)
+
+    def update_detected_geometry(self):
+        """Offer the frame layout detected from the sheet when it differs from the config"""
+        geometry = None
+        if self.preview.pixmap is not None:
+            geometry = detect_sheet_geometry(self.preview.pixmap, self.npc_data.standard_params)
+        self._detected_geometry = geometry
+        self.btn_fit_hitbox.setEnabled(self.preview.pixmap is not None)
+        differs = geometry is not None and geometry.differs_from(self.npc_data.standard_params)
+        self.btn_detected_frames.setVisible(differs)
+        if differs:
+            self.btn_detected_frames.setToolTip(
+                f"Sheet looks like {geometry} (confidence {geometry.confidence:.0%})")
+
+    def apply_detected_geometry(self):
+        if self._detected_geometry is None:
+            return
+        self.apply_parameter_changes(self._detected_geometry.as_params(), "Detected Frame Geometry")
+        self.status_bar.showMessage(f"Applied detected frames: {self._detected_geometry}", 3000)
+
+    def apply_hitbox_fit(self):
+        if self.preview.pixmap is None:
+            return
+        fit = fit_sheet_hitbox(self.preview.pixmap, self.npc_data.standard_params)
+        if fit is None:
+            self.status_bar.showMessage("No opaque pixels to fit the hitbox to", 3000)
+            return
+        if not fit.differences(self.npc_data.standard_params):
+            self.status_bar.showMessage("Hitbox already fits the sprite", 3000)
+            return
+        self.apply_parameter_changes(fit.as_params(), "Auto-Fit Hitbox")
+        self.status_bar.showMessage(f"Fitted {fit}", 3000)
+
+    def apply_parameter_changes(self, values, description):
+        """Set several standard parameters as one undo step, enabling them where needed"""
+        changes = {}
+        for key, new_val in values.items():
+            old_val = self.npc_data.standard_params.get(key)
+            if old_val != new_val:
+                changes[key] = (old_val, new_val)
+        if changes:
+            self.undo_stack.push(ChangeMultipleParametersCommand(
+                self.npc_data, changes, ui_callback=self.update_parameter_ui, description=description))
+
+    def update_parameter_ui(self, key, value):
+        """Undo callback for commands that may also enable or disable a parameter"""
+        self.update_single_checkbox(key, value is not None)
+        self.update_single_widget(key, value)
+        if key == 'frames':
+            self._update_animation_button_states()
 
     def load_file(self):
         self.file_controller.load_dialog()
@@ -340,6 +457,47 @@ class MainWindow(QMainWindow):
     def save_file(self):
         self.file_controller.save_dialog()
 
+    def open_project(self):
+        """Load every config of an episode folder in the background"""
+        folder = QFileDialog.getExistingDirectory(self, "Open Project Folder")
+        if not folder:
+            return
+        self.project_controller.load(folder)
+        self.project_panel.show_progress(0, 0)
+        self.project_dock.show()
+        self.status_bar.showMessage(f"Scanning {folder}...")
+
+    def on_project_progress(self, done, total):
+        self.project_panel.show_progress(done, total)
+        self.status_bar.showMessage(f"Loading configs: {done}/{total}")
+
+    def on_project_loaded(self, project):
+        self.project_panel.show_project(project)
+        self.status_bar.showMessage(project.summary(), 5000)
+
+    def on_project_failed(self, message):
+        self.project_panel.show_project(None)
+        self.status_bar.showMessage(f"Could not load project: {message}", 5000)
+
+    def export_legacy_sprite(self):
+        """Write the current sprite as a legacy GIF + mask pair"""
+        if not self.preview.image_path:
+            self.status_bar.showMessage("No sprite loaded to export", 3000)
+            return
+        base = os.path.splitext(self.preview.image_path)[0]
+        fname, _ = QFileDialog.getSaveFileName(self, "Export Legacy GIF + Mask", base + ".gif", "GIF Images (*.gif)")
+        if not fname:
+            return
+        mask_fname = os.path.splitext(fname)[0] + "m.gif"
+
+        image = load_sprite_image(self.preview.image_path, self.preview.mask_path)
+        try:
+            save_legacy_sprite(image, fname, mask_fname)
+        except OSError as e:
+            ErrorHandler(self).handle_generic_error(e, "Export Failed", f"Could not export {fname}")
+            return
+        self.status_bar.showMessage(f"Exported: {os.path.basename(fname)} + {os.path.basename(mask_fname)}", 3000)
+
     def on_file_loaded(self, fname):
         self.scroll_area.verticalScrollBar().setValue(0)
         self.update_ui_from_data()
@@ -372,7 +530,7 @@ class MainWindow(QMainWindow):
     def update_ui_from_data(self):
         for key, widget in self.all_widgets.items():
             val = self.npc_data.standard_params.get(key)
-            default = NPC_DEFS[key]['default']
+            default = SCHEMA.defaults[key]
             chk = self.param_checkboxes.get(key)
             widget.blockSignals(True)
             if chk:
@@ -414,7 +572,7 @@ class MainWindow(QMainWindow):
         self._update_animation_button_states()
         
         self.preview.update_timer()
-        self.preview.update()
+        self.preview.request_repaint()
 
     def on_standard_change(self, key):
         if self.is_loading: return
@@ -429,7 +587,7 @@ class MainWindow(QMainWindow):
             self._update_animation_button_states()
         
         self.preview.update_timer()
-        self.preview.update()
+        self.preview.request_repaint()
     
     def _update_animation_button_states(self):
         """Enable/disable animation control buttons based on frame count"""
@@ -476,13 +634,13 @@ class MainWindow(QMainWindow):
         
         self.undo_stack.push(ToggleParameterCommand(self.npc_data, key, old_enabled, checked, value, ui_callback=self.update_single_checkbox))
         self.preview.update_timer()
-        self.preview.update()
+        self.preview.request_repaint()
 
     def update_single_widget(self, key, value):
         widget = self.all_widgets.get(key)
         if not widget: return
         widget.blockSignals(True)
-        display = value if value is not None else NPC_DEFS[key]['default']
+        display = value if value is not None else SCHEMA.defaults[key]
         if isinstance(widget, TriStateBoolWidget): widget.set_state(display)
         elif isinstance(widget, (QSpinBox, QDoubleSpinBox, ValidatedSpinBox, ValidatedDoubleSpinBox)): widget.setValue(display)
         elif isinstance(widget, QLineEdit): widget.setText(str(display))
@@ -492,7 +650,7 @@ class MainWindow(QMainWindow):
         elif isinstance(widget, ColorPickerWidget): widget.setValue(display)
         widget.blockSignals(False)
         self.preview.update_timer()
-        self.preview.update()
+        self.preview.request_repaint()
 
     def update_single_checkbox(self, key, enabled):
         chk, widget = self.param_checkboxes.get(key), self.all_widgets.get(key)
@@ -567,7 +725,7 @@ class MainWindow(QMainWindow):
     
     def on_direction_change(self):
         self.preview.show_direction = 1 if self.rb_right.isChecked() else 0
-        self.preview.update()
+        self.preview.request_repaint()
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
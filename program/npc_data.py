@@ -7,7 +7,9 @@ import logging
 from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
 
-from .npc_definitions import NPC_DEFS
+from .npc_record import NPCRecord, ParamsView
+from .npc_schema import SCHEMA
+from .utils.config_parser import read_config
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +20,11 @@ class NPCData:
     
     This class handles loading, parsing, and saving SMBX NPC configuration
     files (.txt format). It maintains both standard parameters (defined in
-    NPC_DEFS) and custom/extra parameters.
+    NPC_DEFS, read through SCHEMA) and custom/extra parameters.
     
     Attributes:
-        standard_params: Dict mapping parameter names to values (or None if unset)
+        record: Compact storage of the standard parameters (NPCRecord)
+        standard_params: Dict-like view mapping parameter names to values (or None if unset)
         custom_params: Dict of custom parameter key-value pairs
         key_map: Case-insensitive lookup map for standard parameter names
         comments: Inline comments for each parameter
@@ -36,16 +39,17 @@ class NPCData:
         ...     data.save()
     """
     
+    # Slots keep thousands of loaded configs cheap in project tooling
+    __slots__ = ('record', 'custom_params', 'comments', 'header_comments', 'filepath')
+    
+    # Mapping lowercase -> canonical key for case-insensitive lookup, shared
+    key_map = SCHEMA.key_map
+    
     def __init__(self):
         """Initialize NPC data with empty state"""
-        self.standard_params: Dict[str, Optional[Any]] = {
-            k: None for k in NPC_DEFS
-        }
+        self.record = NPCRecord()
         self.custom_params: Dict[str, str] = {}
         
-        # Mapping lowercase -> canonical key for case-insensitive lookup
-        self.key_map: Dict[str, str] = {k.lower(): k for k in NPC_DEFS}
-        
         # Store inline comments: key -> comment_str
         self.comments: Dict[str, str] = {}
         
@@ -55,6 +59,10 @@ class NPCData:
         self._apply_defaults()
         self.filepath: str = ""
     
+    @property
+    def standard_params(self) -> ParamsView:
+        return self.record.params
+    
     def _apply_defaults(self) -> None:
         """Apply default values for essential parameters"""
         # These defaults ensure the preview works even with empty files
@@ -71,7 +79,7 @@ class NPCData:
         for key, value in defaults.items():
             self.standard_params[key] = value
         
-        logger.debug(f"Applied default values: {defaults}")
+        logger.debug("Applied default values: %s", defaults)
     
     def set_standard(self, key: str, value: Optional[Any]) -> None:
         """
@@ -84,7 +92,7 @@ class NPCData:
         Raises:
             ValueError: If key is not a valid parameter name
         """
-        if key not in NPC_DEFS:
+        if key not in SCHEMA:
             raise ValueError(f"Unknown parameter: {key}")
         
         self.standard_params[key] = value
@@ -111,7 +119,7 @@ class NPCData:
         Returns:
             True if successful, False otherwise
         """
-        logger.info(f"Loading NPC config from: {filepath}")
+        logger.info("Loading NPC config from: %s", filepath)
         
         # Convert to Path for better path handling
         path = Path(filepath)
@@ -126,7 +134,7 @@ class NPCData:
         
         # Reset state
         self.filepath = filepath
-        self.standard_params = {k: None for k in NPC_DEFS}
+        self.record = NPCRecord()
         self.custom_params = {}
         self.comments = {}
         self.header_comments = []
@@ -135,80 +143,44 @@ class NPCData:
         self._apply_defaults()
         
         try:
-            # Try UTF-8 first, then fall back to Latin-1
-            encodings = ['utf-8', 'latin-1', 'cp1252']
-            lines = None
-            
-            for encoding in encodings:
-                try:
-                    with open(filepath, 'r', encoding=encoding) as f:
-                        lines = f.readlines()
-                    logger.debug(f"Successfully read file with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    logger.debug(f"Failed to read with {encoding} encoding")
-                    continue
-            
-            if lines is None:
-                logger.error(f"Could not read file with any supported encoding")
-                return False
+            config = read_config(filepath)
+            logger.debug("Read %s as %s", filepath, config.encoding)
+            self.header_comments = config.header_comments()
             
-            # Parse lines
-            header_done = False
+            # Per-parameter logging is only formatted when debug output is on
+            debug = logger.isEnabledFor(logging.DEBUG)
             param_count = 0
             
-            for line_num, line in enumerate(lines, 1):
-                stripped = line.strip()
-                
-                # Skip empty lines
-                if not stripped:
+            for entry in config.entries:
+                if entry.key is None:
                     continue
-                
-                # Parse comment
-                comment_part = ""
-                content = line
-                if '#' in line:
-                    parts = line.split('#', 1)
-                    content = parts[0]
-                    comment_part = '#' + parts[1].rstrip('\n')
-                
-                clean = content.strip()
-                
-                # Parse Key=Value pairs
-                if '=' in clean:
-                    header_done = True
-                    try:
-                        parts = clean.split('=', 1)
-                        raw_key = parts[0].strip()
-                        key_lower = raw_key.lower()
-                        val_str = parts[1].strip()
-                        
-                        # Store comment
-                        if comment_part:
-                            k = self.key_map.get(key_lower, raw_key)
-                            self.comments[k] = comment_part
-                        
-                        # Determine if standard or custom parameter
-                        if key_lower in self.key_map:
-                            real_key = self.key_map[key_lower]
-                            self._parse_value(real_key, val_str, line_num)
-                            param_count += 1
-                        else:
-                            self.custom_params[raw_key] = val_str
-                            logger.debug(f"Line {line_num}: Custom param {raw_key} = {val_str}")
+                try:
+                    raw_key = entry.key
+                    key_lower = raw_key.lower()
+                    real_key = self.key_map.get(key_lower)
+                    
+                    # Store comment
+                    if entry.comment:
+                        self.comments[real_key or raw_key] = entry.comment
                     
-                    except Exception as e:
-                        logger.warning(
-                            f"Line {line_num}: Failed to parse '{clean}': {e}"
-                        )
+                    # Determine if standard or custom parameter
+                    if real_key is not None:
+                        self._parse_value(real_key, entry.value, entry.line)
+                        param_count += 1
+                        if debug:
+                            logger.debug("Line %d: Parsed %s = %s", entry.line, real_key,
+                                         self.standard_params[real_key])
+                    else:
+                        self.custom_params[raw_key] = entry.value
+                        if debug:
+                            logger.debug("Line %d: Custom param %s = %s", entry.line, raw_key, entry.value)
                 
-                # Header comments (before any keys)
-                elif not header_done and stripped.startswith('#'):
-                    self.header_comments.append(line)
+                except Exception as e:
+                    logger.warning("Line %d: Failed to parse '%s = %s': %s", entry.line, entry.key, entry.value, e)
             
             logger.info(
-                f"Successfully loaded {param_count} standard parameters "
-                f"and {len(self.custom_params)} custom parameters"
+                "Successfully loaded %d standard parameters and %d custom parameters",
+                param_count, len(self.custom_params)
             )
             return True
         
@@ -229,27 +201,16 @@ class NPCData:
             val_str: Value as string
             line_num: Line number in file (for error reporting)
         """
-        def_type = NPC_DEFS[key]['type']
+        spec = SCHEMA.specs[key]
+        slot = SCHEMA.index[key]
         
         try:
-            if def_type == bool:
-                parsed_value = (val_str.lower() == 'true')
-            elif def_type == int:
-                parsed_value = int(float(val_str))
-            elif def_type == float:
-                parsed_value = float(val_str)
-            elif def_type == "enum":
-                parsed_value = int(float(val_str))
-            else:  # str
-                parsed_value = val_str
-            
-            self.standard_params[key] = parsed_value
-            logger.debug(f"Line {line_num}: Parsed {key} = {parsed_value}")
+            self.record.set_slot(slot, spec.parse(val_str))
         
         except (ValueError, TypeError) as e:
             # Fall back to default
-            default_value = NPC_DEFS[key]['default']
-            self.standard_params[key] = default_value
+            default_value = spec.default
+            self.record.set_slot(slot, default_value)
             logger.warning(
                 f"Line {line_num}: Invalid value for {key}: '{val_str}', "
                 f"using default: {default_value}"
@@ -270,10 +231,7 @@ class NPCData:
         
         try:
             # Collect active parameters
-            active_standard = {
-                k: v for k, v in self.standard_params.items() 
-                if v is not None
-            }
+            active_standard = dict(self.record.items())
             active_custom = self.custom_params.copy()
             
             lines = []
@@ -283,43 +241,15 @@ class NPCData:
             if self.header_comments and not lines[-1].endswith('\n'):
                 lines.append('\n')
             
-            # 2. Group by Category
-            priority_order = [
-                "Animation", "Collision", "Interaction", "Behaviour", 
-                "AI / Identity", "Line Guide", "Lighting", "Editor"
-            ]
-            
-            all_categories = sorted(
-                list(set(d['category'] for d in NPC_DEFS.values()))
-            )
-            all_categories.sort(
-                key=lambda x: priority_order.index(x) 
-                if x in priority_order else 99
-            )
-            
+            # 2. Group by Category, in the schema's order
             written_keys = set()
             
-            for cat in all_categories:
-                # Get keys for this category
-                cat_keys = [
-                    k for k, d in NPC_DEFS.items() 
-                    if d['category'] == cat
-                ]
-                
-                # Filter for active keys
-                keys_to_write = [k for k in cat_keys if k in active_standard]
+            for cat in SCHEMA.categories:
+                keys_to_write = [k for k in SCHEMA.category_keys[cat] if k in active_standard]
                 
                 if keys_to_write:
                     for k in keys_to_write:
-                        val = active_standard[k]
-                        
-                        # Format value
-                        if val is True:
-                            s_val = "true"
-                        elif val is False:
-                            s_val = "false"
-                        else:
-                            s_val = str(val)
+                        s_val = SCHEMA.specs[k].format(active_standard[k])
                         
                         # Attach comment if exists
                         comment = " " + self.comments[k] if k in self.comments else ""
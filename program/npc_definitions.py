@@ -9,6 +9,12 @@ GRID_ALIGN_MODES = {
     1: "1: Edge"
 }
 
+# Order of the categories in saved files and in the property editor
+CATEGORY_ORDER = (
+    "Animation", "Collision", "Interaction", "Behaviour",
+    "AI / Identity", "Line Guide", "Lighting", "Editor"
+)
+
 # The Master Schema
 NPC_DEFS = {
     # ==========================================
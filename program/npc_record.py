@@ -0,0 +1,117 @@
+"""
+Compact storage of standard NPC parameters
+
+A config sets a handful of the ~100 standard parameters. Instead of a dict
+with an entry (mostly None) for every parameter, NPCRecord keeps a presence
+bitmask over the compiled schema positions plus a list holding only the set
+values, in schema order. The value of schema slot i lives at index
+popcount(mask & ((1 << i) - 1)). Records with __slots__ cost a few hundred
+bytes, so project tooling can keep thousands of configs in memory.
+
+ParamsView wraps a record in the mapping interface the editor has always
+used for NPCData.standard_params: every schema key is present, unset ones
+read as None, assigning None unsets a parameter.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Iterator, List, Optional
+
+from .npc_schema import SCHEMA
+
+_INDEX = SCHEMA.index
+_KEYS = tuple(SCHEMA.specs)
+
+
+class NPCRecord:
+    """Standard parameter values of one config, addressed by schema position"""
+
+    __slots__ = ('_mask', '_values', '_view')
+
+    def __init__(self):
+        self._mask = 0
+        self._values: List[Any] = []
+        self._view: Optional[ParamsView] = None
+
+    def __getstate__(self):
+        return self._mask, self._values
+
+    def __setstate__(self, state):
+        self._mask, self._values = state
+        self._view = None
+
+    @property
+    def params(self) -> "ParamsView":
+        """Dict-like view of all standard parameters"""
+        if self._view is None:
+            self._view = ParamsView(self)
+        return self._view
+
+    def __len__(self) -> int:
+        """Number of parameters that are set"""
+        return len(self._values)
+
+    def get_slot(self, slot: int) -> Optional[Any]:
+        bit = 1 << slot
+        if not self._mask & bit:
+            return None
+        # bin().count() rather than int.bit_count(), which needs Python 3.10
+        return self._values[bin(self._mask & (bit - 1)).count("1")]
+
+    def set_slot(self, slot: int, value: Optional[Any]) -> None:
+        """Store a value at a schema position; None unsets it"""
+        bit = 1 << slot
+        rank = bin(self._mask & (bit - 1)).count("1")
+        if self._mask & bit:
+            if value is None:
+                del self._values[rank]
+                self._mask &= ~bit
+            else:
+                self._values[rank] = value
+        elif value is not None:
+            self._values.insert(rank, value)
+            self._mask |= bit
+
+    def items(self) -> Iterator:
+        """(key, value) of the parameters that are set, in schema order"""
+        mask, values = self._mask, iter(self._values)
+        while mask:
+            low = mask & -mask
+            yield _KEYS[low.bit_length() - 1], next(values)
+            mask ^= low
+
+
+class ParamsView(MutableMapping):
+    """Mapping of every schema key to its value in a record (None when unset)"""
+
+    __slots__ = ('_record',)
+
+    def __init__(self, record: NPCRecord):
+        self._record = record
+
+    def __getitem__(self, key: str) -> Optional[Any]:
+        return self._record.get_slot(_INDEX[key])
+
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
+        # Hot path of the preview and renderer, so no KeyError round trip
+        slot = _INDEX.get(key)
+        return default if slot is None else self._record.get_slot(slot)
+
+    def __setitem__(self, key: str, value: Optional[Any]) -> None:
+        if key not in _INDEX:
+            raise KeyError(f"Unknown parameter: {key}")
+        self._record.set_slot(_INDEX[key], value)
+
+    def __delitem__(self, key: str) -> None:
+        self._record.set_slot(_INDEX[key], None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return f"ParamsView({dict(self._record.items())})"
@@ -0,0 +1,127 @@
+"""
+Compiled NPC parameter schema
+
+NPC_DEFS is the editable source of truth. SCHEMA is built from it once at
+import: the category order, the keys of every category, and per parameter
+its parser, formatter, default and range. Loading, saving, the form builder
+and the validators all read SCHEMA, so nothing re-sorts or re-filters
+NPC_DEFS per call and saving and the UI share one parameter order.
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .npc_definitions import CATEGORY_ORDER, NPC_DEFS
+
+# Spin box range of numeric parameters without an explicit min/max
+WIDGET_MIN = -9999
+WIDGET_MAX = 9999
+
+_TYPE_NAMES = {bool: "Boolean", int: "Integer", float: "Float", "enum": "Choice"}
+
+
+def _parse_bool(text: str) -> bool:
+    # Anything but true/false is an error, not a silent False
+    value = text.strip().lower()
+    if value not in ('true', 'false'):
+        raise ValueError(f"Not a boolean: '{text}'")
+    return value == 'true'
+
+
+def _parse_int(text: str) -> int:
+    # Accepts "3.0" like SMBX does
+    return int(float(text))
+
+
+def _format_value(value: Any) -> str:
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+
+_PARSERS: Dict[Any, Callable[[str], Any]] = {bool: _parse_bool, int: _parse_int, float: float, "enum": _parse_int}
+
+
+class ParamSpec(NamedTuple):
+    """Everything known about one standard parameter"""
+    key: str
+    type: Any
+    category: str
+    default: Any
+    label: str
+    tips: str
+    minimum: Optional[float]
+    maximum: Optional[float]
+    step: Optional[float]
+    choices: Mapping[int, str]
+    parse: Callable[[str], Any]
+    format: Callable[[Any], str]
+
+    @property
+    def type_name(self) -> str:
+        """Type as shown in the description panel"""
+        name = _TYPE_NAMES.get(self.type, "Text")
+        if self.type == int and self.minimum is not None and self.maximum is not None:
+            name += f" ({self.minimum} to {self.maximum})"
+        return name
+
+    def widget_range(self) -> Tuple[float, float]:
+        """(min, max) for spin boxes, falling back to WIDGET_MIN/WIDGET_MAX"""
+        low = self.minimum if self.minimum is not None else WIDGET_MIN
+        high = self.maximum if self.maximum is not None else WIDGET_MAX
+        return (float(low), float(high)) if self.type == float else (int(low), int(high))
+
+
+class CompiledSchema:
+    """
+    Frozen view of NPC_DEFS, built once
+
+    Attributes:
+        specs: Key -> ParamSpec, in NPC_DEFS order
+        categories: Category names in save/UI order
+        category_keys: Category -> its keys in NPC_DEFS order
+        keys: All keys in save/UI order
+        index: Key -> position in specs, the slot number used by NPCRecord
+        key_map: Lowercase key -> canonical key
+        defaults: Key -> schema default
+    """
+
+    def __init__(self, defs: Dict[str, dict], category_order: Tuple[str, ...]):
+        self.specs: Mapping[str, ParamSpec] = MappingProxyType({
+            key: ParamSpec(
+                key=key,
+                type=d['type'],
+                category=d['category'],
+                default=d['default'],
+                label=d.get('label', key),
+                tips=d.get('tips', ''),
+                minimum=d.get('min'),
+                maximum=d.get('max'),
+                step=d.get('step'),
+                choices=MappingProxyType(dict(d.get('choices', {}))),
+                parse=_PARSERS.get(d['type'], str),
+                format=_format_value,
+            ) for key, d in defs.items()})
+
+        known = set(category_order)
+        # Categories missing from the order come last, alphabetically
+        extra = sorted({s.category for s in self.specs.values()} - known)
+        used = {s.category for s in self.specs.values()}
+        self.categories: Tuple[str, ...] = tuple(c for c in category_order if c in used) + tuple(extra)
+        self.category_keys: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+            cat: tuple(k for k, s in self.specs.items() if s.category == cat) for cat in self.categories})
+        self.keys: Tuple[str, ...] = tuple(k for cat in self.categories for k in self.category_keys[cat])
+        self.index: Mapping[str, int] = MappingProxyType({k: i for i, k in enumerate(self.specs)})
+        self.key_map: Mapping[str, str] = MappingProxyType({k.lower(): k for k in self.specs})
+        self.defaults: Mapping[str, Any] = MappingProxyType({k: s.default for k, s in self.specs.items()})
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.specs
+
+    def __getitem__(self, key: str) -> ParamSpec:
+        return self.specs[key]
+
+
+SCHEMA = CompiledSchema(NPC_DEFS, CATEGORY_ORDER)
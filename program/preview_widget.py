@@ -1,25 +1,54 @@
-import os
+import time
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import Qt, QTimer, QRect, QRectF, pyqtSignal
-from PyQt6.QtGui import QPixmap, QPainter, QColor, QPen, QCursor, QImage
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QRegion
 from .ui.styles import AppColors
-from .utils.image_utils import load_legacy_sprite
+from .utils.sprite_cache import shared_cache
+from .utils.sprite_loader import SpriteLoader
+from .utils.image_utils import find_sprite_files
+from .rendering.frame_atlas import FrameAtlas, frame_source_rect
+from .rendering.npc_renderer import hitbox_rect, light_center, sprite_placement
+from .rendering.tick_clock import shared_clock
+from .rendering.light import LightLayer, light_brightness, light_colors
+from .rendering.minimap import Minimap
+from .rendering.grid import GridLayer
+from .rendering.sandbox import NPCSandbox
+
+# Wheel zoom steps; fractional steps keep zooming smooth at the low end
+ZOOM_LEVELS = (1, 1.25, 1.5, 1.75, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16)
+
 
 class AnimationPreview(QWidget):
-    zoomChanged = pyqtSignal(int)
+    zoomChanged = pyqtSignal(float)
     dataChanged = pyqtSignal()      # For real-time UI syncing
     dragStarted = pyqtSignal()      # Fired when user clicks to start a drag
     dragFinished = pyqtSignal()     # Fired when user releases mouse
+    spriteChanged = pyqtSignal()    # A new sheet (or none) is shown
 
     def __init__(self, data):
         super().__init__()
         self.data = data
         self.pixmap = None
         self.image_path = ""
+        self.sprite_cache = shared_cache()
+        self.sprite_loader = SpriteLoader(self.sprite_cache, parent=self)
+        self.sprite_loader.spriteLoaded.connect(self.on_sprite_loaded)
+        self.is_loading_sprite = False
+        self.frame_atlas = FrameAtlas()
+        self.minimap = Minimap()
+        self.grid = GridLayer()
+        self.light = LightLayer()
+        self.light_tick = 0  # Animation step of the shared clock, drives lightflicker
         
         self.current_frame = 0
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.next_frame)
+        # Frames follow the shared 65 Hz clock: (tick // framespeed + offset) % frames
+        self.clock = shared_clock()
+        self._frame_offset = 0
+        self._frame_speed = 8
+        # Physics sandbox with many instances of the NPC, None when off
+        self.sandbox = None
+        self._zoom_before_sandbox = None
+        self.paint_ms = 0.0
         self.show_direction = 0 # 0=Left, 1=Right
         self.zoom = 6  # CHANGE: Start at 6x
 
@@ -38,64 +67,116 @@ class AnimationPreview(QWidget):
         self.bg_color = AppColors.BACKGROUND
         self.grid_color = AppColors.GRID
         
+        # Layer rects/keys at the last paint, for dirty-rect repaints
+        self._painted_scene = None
+        
         self.setMouseTracking(True)
         self.setMinimumSize(400, 400)
         self.update_timer()
 
     def set_hitbox_mode(self, enabled):
         self.is_hitbox_mode = enabled
+        self.request_repaint()
+
+    def set_minimap_visible(self, visible):
+        self.minimap.visible = visible
+        self.request_repaint()
+
+    def set_sandbox(self, count):
+        """Show count simulated instances of the NPC on a tile floor instead of the editor view (0 = off)"""
+        if count <= 0:
+            if self.sandbox is None:
+                return
+            self.sandbox = None
+            self.zoom = self._zoom_before_sandbox or self.zoom
+            self.pan_x = self.pan_y = 0
+        else:
+            if self.sandbox is None:
+                self._zoom_before_sandbox = self.zoom
+                self.sandbox = NPCSandbox(count)
+                # Fit the whole floor into the view
+                world = self.sandbox.bounds()
+                fitting = [z for z in ZOOM_LEVELS if world.width() * z <= self.width() * 0.95]
+                self.zoom = fitting[-1] if fitting else ZOOM_LEVELS[0]
+                self.pan_x = -world.center().x() * self.zoom
+                self.pan_y = -world.center().y() * self.zoom
+            else:
+                self.sandbox.reset(count)
+        self.hover_state = None
+        self.zoomChanged.emit(self.zoom)
+        self.update_timer()
         self.update()
 
     def load_image(self):
+        """Resolve the sprite for the current file and decode it in the background"""
+        previous_path = self.image_path
         self.image_path = ""
         self.mask_path = "" # Track mask for the file watcher
-        self.pixmap = None
         
         if not self.data.filepath: 
-            self.update()
+            self.sprite_loader.cancel()
+            self.pixmap = None
+            self.is_loading_sprite = False
+            self.spriteChanged.emit()
+            self.request_repaint()
             return
         
-        base = os.path.splitext(self.data.filepath)[0]
-        png_path = base + ".png"
-        
-        # 1. Try modern PNG first
-        if os.path.exists(png_path):
-            self.image_path = png_path
-            self.pixmap = QPixmap(self.image_path)
+        # PNG first, otherwise legacy GIF/BMP (+ mask, e.g. npc-6.gif -> npc-6m.gif)
+        self.image_path, self.mask_path = find_sprite_files(self.data.filepath)
+
+        if not self.image_path:
+            self.sprite_loader.cancel()
+            self.pixmap = None
+            self.is_loading_sprite = False
+            self.spriteChanged.emit()
+            self.request_repaint()
+            return
+
+        pixmap = self.sprite_loader.request(self.image_path, self.mask_path)
+        if pixmap is not None:
+            self.pixmap = pixmap
+            self.is_loading_sprite = False
+            self.spriteChanged.emit()
         else:
-            # 2. Look for legacy GIF/BMP + Mask
-            for ext in ['.gif', '.bmp']:
-                img_path = base + ext
-                if os.path.exists(img_path):
-                    self.image_path = img_path
-                    # Check for mask (e.g., npc-6.gif -> npc-6m.gif)
-                    mask_path = base + "m" + ext
-                    if os.path.exists(mask_path):
-                        self.mask_path = mask_path
-                        self.pixmap = load_legacy_sprite(img_path, mask_path)
-                    else:
-                        # Fallback: No mask found, just load as is
-                        self.pixmap = QPixmap(img_path)
-                    break
-                    
-        self.update()
+            # Hot reloads keep showing the old sheet until the new one is ready
+            if self.image_path != previous_path:
+                self.pixmap = None
+                self.spriteChanged.emit()
+            self.is_loading_sprite = True
+        self.request_repaint()
+
+    def on_sprite_loaded(self, pixmap):
+        """Receives the decoded sprite from the worker thread"""
+        self.pixmap = pixmap if not pixmap.isNull() else None
+        self.is_loading_sprite = False
+        self.spriteChanged.emit()
+        self.request_repaint()
 
     def update_timer(self):
-        """Starts/Stops the timer based on frame count and pause state"""
+        """Subscribes to/leaves the shared tick clock based on frame count and pause state"""
         p = self.data.standard_params
         frames = int(p.get('frames') or 1)
+        # A flickering light keeps animating even for single-frame NPCs
+        flickers = bool(p.get('lightflicker')) and int(p.get('lightradius') or 0) > 0
         
-        # Logic: Stop timer if only 1 frame OR if manually paused
-        if frames <= 1 or self.is_paused:
-            self.timer.stop()
+        # Logic: Stop animating if nothing animates OR if manually paused
+        if (frames <= 1 and not flickers and self.sandbox is None) or self.is_paused:
+            self.clock.unsubscribe(self)
             if frames <= 1: self.current_frame = 0
-            self.update()
+            if self.sandbox is not None:
+                # Resume without simulating the paused time
+                self.sandbox.clock_tick = None
+            self.request_repaint()
             return
 
-        speed = p.get('framespeed') or 8
-        if speed < 1: speed = 1
-        ms = int(speed * (1000 / 65))
-        self.timer.start(ms)
+        speed = max(1, int(p.get('framespeed') or 8))
+        # The sandbox simulates every tick, frames still change every framespeed ticks
+        period = 1 if self.sandbox is not None else speed
+        if self.clock.period(self) != period or self._frame_speed != speed:
+            # Continue from the frame on screen, switching on the clock's step boundaries
+            self._frame_offset = self.current_frame - self.clock.tick() // speed
+            self._frame_speed = speed
+            self.clock.subscribe(self, period, self.on_tick)
 
     def toggle_pause(self, paused):
         """External hook to pause/play animation"""
@@ -104,20 +185,28 @@ class AnimationPreview(QWidget):
     
     def manual_step_frame(self):
         """Manually advance to the next frame (for step-through button)"""
-        self.advance_frame(auto=False)
-
-    def next_frame(self):
-        """Automatically advance frame (called by timer)"""
-        self.advance_frame(auto=True)
-        
-    def advance_frame(self, auto=False):
+        if self.sandbox is not None:
+            # One frame's worth of physics
+            self.sandbox.step(self.data.standard_params, self._frame_speed)
+            self.update()
+            return
         total_frames = int(self.data.standard_params.get('frames') or 1)
         if total_frames <= 1:
             self.current_frame = 0
-            if auto: self.timer.stop()
         else:
             self.current_frame = (self.current_frame + 1) % total_frames
-        self.update()
+            self._frame_offset += 1
+        self.request_repaint()
+
+    def on_tick(self, tick):
+        """Shared clock callback, called whenever tick // framespeed changes (every tick in the sandbox)"""
+        step = tick // self._frame_speed
+        self.light_tick = step
+        total_frames = int(self.data.standard_params.get('frames') or 1)
+        self.current_frame = (step + self._frame_offset) % total_frames if total_frames > 1 else 0
+        if self.sandbox is not None:
+            self.sandbox.advance_to(tick, self.data.standard_params)
+        self.request_repaint()
 
     def get_logical_pos(self, screen_pos):
         cx, cy = self.width() // 2, self.height() // 2
@@ -133,27 +222,18 @@ class AnimationPreview(QWidget):
     def get_active_rect(self):
         p = self.data.standard_params
         if self.is_hitbox_mode:
-            w = int(p.get('width') or 32)
-            h = int(p.get('height') or 32)
-            return QRectF(-w/2, -h/2, w, h)
-        else:
-            fw = int(p.get('gfxwidth') or 32)
-            fh = int(p.get('gfxheight') or 32)
-            ox = int(p.get('gfxoffsetx') or 0)
-            oy = int(p.get('gfxoffsety') or 0)
-            
-            style = int(p.get('framestyle') or 0)
-            if style >= 1 and self.show_direction == 1:
-                ox = -ox
-            
-            ph = int(p.get('height') or 32)
-            x = -fw / 2 + ox
-            y = (ph / 2) - fh + oy 
-            return QRectF(x, y, fw, fh)
+            return hitbox_rect(p)
+        # Drag handling mirrors the mouse for style 0, so the box stays unmirrored
+        style = int(p.get('framestyle') or 0)
+        rect, _ = sprite_placement(p, 0 if style == 0 else self.show_direction)
+        return rect
 
     def get_view_limits(self):
-        rect = self.get_active_rect()
         margin = 100
+        if self.sandbox is not None:
+            world = self.sandbox.bounds()
+            return (world.left() - margin, world.right() + margin, world.top() - margin, world.bottom() + margin)
+        rect = self.get_active_rect()
         
         # Expand limits to include lighting if active
         p = self.data.standard_params
@@ -176,8 +256,11 @@ class AnimationPreview(QWidget):
 
     def wheelEvent(self, event):
         delta = event.angleDelta().y()
-        new_zoom = self.zoom + (1 if delta > 0 else -1)
-        self.zoom = max(1, min(16, new_zoom))
+        if delta > 0:
+            new_zoom = next((z for z in ZOOM_LEVELS if z > self.zoom), ZOOM_LEVELS[-1])
+        else:
+            new_zoom = next((z for z in reversed(ZOOM_LEVELS) if z < self.zoom), ZOOM_LEVELS[0])
+        self.zoom = new_zoom
         self.zoomChanged.emit(self.zoom)
         self.update()
 
@@ -186,7 +269,7 @@ class AnimationPreview(QWidget):
         if event.button() == Qt.MouseButton.RightButton:
             self.is_panning = True
             self.setCursor(Qt.CursorShape.ClosedHandCursor)
-        elif event.button() == Qt.MouseButton.LeftButton:
+        elif event.button() == Qt.MouseButton.LeftButton and self.sandbox is None:
             lx, ly = self.get_logical_pos(event.pos())
             state = self.check_hover_edge(lx, ly)
             if state:
@@ -280,9 +363,11 @@ class AnimationPreview(QWidget):
             self.last_mouse_pos = event.pos()
             # This triggers the UI sync in editor_window, but NOT the undo command
             self.dataChanged.emit() 
-            self.update()
+            self.request_repaint()
             return
 
+        if self.sandbox is not None:
+            return
         lx, ly = self.get_logical_pos(event.pos())
         state = self.check_hover_edge(lx, ly)
         self.hover_state = state
@@ -297,22 +382,8 @@ class AnimationPreview(QWidget):
             self.setCursor(Qt.CursorShape.ArrowCursor)
 
     def get_light_center(self):
-        p = self.data.standard_params
-        
-        # Offsets
-        lox = int(p.get('lightoffsetx') or 0)
-        loy = int(p.get('lightoffsety') or 0)
-        
-        # Start at Hitbox Center (0, 0)
-        cx = -lox
-        cy = loy
-        
-        # Handle Direction (Mirroring)
-        # If facing right (1), everything mirrors around X=0
-        if self.show_direction == 1:
-            cx = -cx
-            
-        return cx, cy
+        # Relative to the hitbox centre, mirrored around X=0 when facing right
+        return light_center(self.data.standard_params, self.show_direction)
 
     def check_hover_edge(self, lx, ly):
         p = self.data.standard_params
@@ -350,17 +421,108 @@ class AnimationPreview(QWidget):
             return 'MOVE'
         return None
 
+    def get_sprite_rect(self):
+        """Logical rect the current frame is drawn into (after mirroring)"""
+        rect, _ = sprite_placement(self.data.standard_params, self.show_direction)
+        return rect
+
+    def _to_widget_rect(self, logical_rect, pad=2):
+        """Map a logical rect to the widget pixels it touches, padded for pens"""
+        ox = self.width() // 2 + self.pan_x
+        oy = self.height() // 2 + self.pan_y
+        rect = QRectF(ox + logical_rect.x() * self.zoom, oy + logical_rect.y() * self.zoom,
+                      logical_rect.width() * self.zoom, logical_rect.height() * self.zoom)
+        return rect.toAlignedRect().adjusted(-pad, -pad, pad, pad)
+
+    def _hud_text(self):
+        if self.sandbox is not None:
+            return (f"[SANDBOX] {self.sandbox.count} NPCs | Physics: {self.sandbox.step_ms:.2f} ms"
+                    f" | Paint: {self.paint_ms:.1f} ms | Zoom: {self.zoom:g}x")
+        frames = int(self.data.standard_params.get('frames') or 1)
+        mode_text = "[HITBOX MODE]" if self.is_hitbox_mode else "[GRAPHIC MODE]"
+        info = f"{mode_text} | Frame: {self.current_frame + 1}/{frames} | Zoom: {self.zoom:g}x"
+        if self.is_loading_sprite:
+            info += " | Loading sprite..."
+        return info
+
+    def _scene_snapshot(self):
+        """
+        Widget rect and content key of every layer, used for dirty-rect tracking.
+        A layer needs repainting when its key changes.
+        """
+        p = self.data.standard_params
+        scene = {}
+
+        l, r, t, b = self.get_view_limits()
+        scene['grid'] = (self._to_widget_rect(QRectF(l, t, r - l, b - t), 1),
+                         (self.grid.spacing(p), self.zoom, self.pan_x, self.pan_y))
+
+        scene['hitbox'] = (self._to_widget_rect(hitbox_rect(p)), self.is_hitbox_mode)
+
+        light_radius = int(p.get('lightradius') or 0)
+        if light_radius > 0:
+            lcx, lcy = self.get_light_center()
+            light_rect = QRectF(lcx - light_radius, lcy - light_radius, light_radius * 2, light_radius * 2)
+            scene['light'] = (self._to_widget_rect(light_rect, 3),
+                              (p.get('lightcolor'), light_brightness(p, self.light_tick), self.hover_state == 'LIGHT'))
+
+        if self.pixmap:
+            frame_key = (self.pixmap.cacheKey(), self.current_frame, self.show_direction,
+                         int(p.get('frames') or 1), int(p.get('framestyle') or 0), self.is_hitbox_mode)
+            # Blits snap to whole logical pixels, so allow one pixel of slack
+            sprite_rect = self.get_sprite_rect().adjusted(-1, -1, 1, 1)
+            scene['sprite'] = (self._to_widget_rect(sprite_rect), frame_key)
+
+            if self.minimap.visible:
+                highlight = frame_source_rect(p, self.show_direction, self.current_frame)
+                geo = self.minimap.geometry(self.pixmap, self.width(), self.devicePixelRatioF())
+                scene['minimap'] = (geo.adjusted(-2, -2, 2, 2), (self.pixmap.cacheKey(), highlight))
+
+        fm = self.fontMetrics()
+        hud_rect = QRect(0, self.height() - 10 - fm.ascent() - 2, self.width(), fm.height() + 4)
+        scene['hud'] = (hud_rect, self._hud_text())
+        return scene
+
+    def request_repaint(self):
+        """
+        Schedule a repaint of only the layers that changed since the last paint.
+        Falls back to a full update before the first paint.
+        """
+        painted = self._painted_scene
+        if painted is None or self.sandbox is not None:
+            self.update()
+            return
+
+        current = self._scene_snapshot()
+        region = QRegion()
+        for name in set(painted) | set(current):
+            old, new = painted.get(name), current.get(name)
+            if old == new:
+                continue
+            if name == 'grid' and old and new:
+                # Only the strips where the clipped grid area grew or shrank
+                region = region.united(QRegion(old[0]).xored(QRegion(new[0])))
+                if old[1] != new[1]:
+                    region = region.united(QRegion(new[0]))
+                continue
+            if old: region = region.united(QRegion(old[0]))
+            if new: region = region.united(QRegion(new[0]))
+
+        if not region.isEmpty():
+            self.update(region)
+
     def paintEvent(self, event):
+        if self.sandbox is not None:
+            self._paint_sandbox()
+            return
+        self._painted_scene = self._scene_snapshot()
         painter = QPainter(self)
         painter.fillRect(self.rect(), self.bg_color)
         
         cx, cy = self.width() // 2, self.height() // 2
-        painter.save()
-        painter.translate(cx, cy)
-        painter.translate(self.pan_x, self.pan_y)
-        painter.scale(self.zoom, self.zoom)
-        
-        # Grid
+        p = self.data.standard_params
+
+        # Grid (one textured fill, clipped to the view limits)
         inv_zoom = 1.0 / self.zoom
         view_l = (-cx - self.pan_x) * inv_zoom
         view_r = (self.width() - cx - self.pan_x) * inv_zoom
@@ -374,128 +536,95 @@ class AnimationPreview(QWidget):
         draw_t = max(view_t, limit_t)
         draw_b = min(view_b, limit_b)
 
-        grid_size = 16
-        start_x = int(draw_l // grid_size) * grid_size
-        end_x = int(draw_r // grid_size + 1) * grid_size
-        start_y = int(draw_t // grid_size) * grid_size
-        end_y = int(draw_b // grid_size + 1) * grid_size
+        origin = QPointF(cx + self.pan_x, cy + self.pan_y)
+        # +1 keeps lines that sit exactly on the right/bottom limit
+        grid_area = QRectF(origin.x() + draw_l * self.zoom, origin.y() + draw_t * self.zoom,
+                           (draw_r - draw_l) * self.zoom + 1, (draw_b - draw_t) * self.zoom + 1)
+        self.grid.paint(painter, grid_area, origin, self.zoom, self.grid_color, p, self.devicePixelRatioF())
 
-        painter.setPen(QPen(self.grid_color, 0))
-        for x in range(start_x, end_x + 1, grid_size):
-            if x >= draw_l and x <= draw_r:
-                painter.drawLine(x, int(draw_t), x, int(draw_b))
-        for y in range(start_y, end_y + 1, grid_size):
-            if y >= draw_t and y <= draw_b:
-                painter.drawLine(int(draw_l), y, int(draw_r), y)
+        painter.save()
+        painter.translate(cx, cy)
+        painter.translate(self.pan_x, self.pan_y)
+        painter.scale(self.zoom, self.zoom)
 
         # Origin Crosshair (Subtle Grey)
         painter.setPen(QPen(AppColors.GRID_CENTER, 0))
         painter.drawLine(-8, 0, 8, 0)
         painter.drawLine(0, -8, 0, 8)
 
-        p = self.data.standard_params
-        fw = int(p.get('gfxwidth') or 32)
-        fh = int(p.get('gfxheight') or 32)
-        pw = int(p.get('width') or 32)
-        ph = int(p.get('height') or 32)
-        ox = int(p.get('gfxoffsetx') or 0)
-        oy = int(p.get('gfxoffsety') or 0)
-        frames = int(p.get('frames') or 1)
-        style = int(p.get('framestyle') or 0)
-
         # Hitbox (Green)
-        hitbox_rect = QRectF(-pw / 2, -ph / 2, pw, ph)
+        hitbox = hitbox_rect(p)
         if self.is_hitbox_mode:
-            painter.fillRect(hitbox_rect, AppColors.HITBOX_FILL)
+            painter.fillRect(hitbox, AppColors.HITBOX_FILL)
         pen = QPen(AppColors.HITBOX_BORDER, 1) if self.is_hitbox_mode else QPen(AppColors.HITBOX_BORDER_DIM, 1)
         pen.setCosmetic(True)
         painter.setPen(pen)
-        painter.drawRect(hitbox_rect)
+        painter.drawRect(hitbox)
 
         # Lighting Circle
         light_radius = int(p.get('lightradius') or 0)
         if light_radius > 0:
             cx, cy = self.get_light_center()
-            
-            # Determine color
-            c_str = p.get('lightcolor')
-            fill_color = AppColors.LIGHT_FILL
-            border_color = AppColors.LIGHT_BORDER
-            
-            if c_str:
-                c_str = str(c_str).strip()
-                # Parse customized color
-                try:
-                    if c_str.startswith("0x") and len(c_str) == 8:
-                        r = int(c_str[2:4], 16)
-                        g = int(c_str[4:6], 16)
-                        b = int(c_str[6:8], 16)
-                        # Create colors (Fill is semi-transparent)
-                        fill_color = QColor(r, g, b, 100) 
-                        border_color = QColor(r, g, b, 255)
-                    elif c_str.startswith("#") or QColor.isValidColor(c_str):
-                        c = QColor(c_str)
-                        if c.isValid():
-                            fill_color = QColor(c.red(), c.green(), c.blue(), 100)
-                            border_color = c
-                except:
-                    # Fallback on error
-                    pass
-
-            painter.setBrush(fill_color)
+
+            # Cached falloff texture, blitted unscaled in widget coordinates
+            painter.save()
+            painter.resetTransform()
+            light_center_pos = QPointF(origin.x() + cx * self.zoom, origin.y() + cy * self.zoom)
+            self.light.paint(painter, light_center_pos, p, self.zoom, self.devicePixelRatioF(), self.light_tick)
+            painter.restore()
+
+            # Radius handle in the customised colour, theme colour otherwise
+            _, border_color = light_colors(p.get('lightcolor'))
             painter.setPen(QPen(border_color, 2 if self.hover_state == 'LIGHT' else 1))
-            # Draw ellipse centered at cx, cy
             painter.drawEllipse(QRectF(cx - light_radius, cy - light_radius, light_radius*2, light_radius*2))
-            painter.setBrush(Qt.BrushStyle.NoBrush) # Reset brush
 
         # Sprite
-        if self.pixmap:
-            painter.save()
-            is_facing_right = (self.show_direction == 1)
-            row_offset = 0
-            if style == 0:
-                # Style 0: Base is Left. Flip for Right.
-                if is_facing_right: painter.scale(-1, 1)
-            elif style >= 1:
-                # Style >= 1: Top = Left, Bottom = Right (Standard SMBX)
-                if is_facing_right:
-                    row_offset = frames
-                
-                # Invert offset for Right facing
-                if is_facing_right:
-                    ox = -ox
-
-            src_y = (row_offset + self.current_frame) * fh
-            src_rect = QRect(0, src_y, fw, fh)
-            
-            dest_x = -fw / 2 + ox
-            dest_y = (ph / 2) - fh + oy
-            dest_rect = QRectF(dest_x, dest_y, fw, fh)
-
-            painter.drawPixmap(dest_rect.toRect(), self.pixmap, src_rect)
+        frame_pm = self.frame_atlas.frame(self.pixmap, p, self.show_direction, self.current_frame)
+        if frame_pm:
+            # Style 0 right-facing frames come pre-mirrored from the atlas
+            dest_rect, blit_pos = sprite_placement(p, self.show_direction)
+            dpr = self.devicePixelRatioF()
+            scaled_pm = self.frame_atlas.scaled_frame(self.pixmap, p, self.show_direction,
+                                                      self.current_frame, self.zoom, dpr)
+            if scaled_pm is not None:
+                # Pre-scaled frame: unscaled blit, snapped to whole device pixels
+                x = round((origin.x() + blit_pos.x() * self.zoom) * dpr) / dpr
+                y = round((origin.y() + blit_pos.y() * self.zoom) * dpr) / dpr
+                painter.save()
+                painter.resetTransform()
+                painter.drawPixmap(QPointF(x, y), scaled_pm)
+                painter.restore()
+            else:
+                painter.drawPixmap(blit_pos, frame_pm)
             
             # GFX Box (Red)
             pen = QPen(AppColors.GFX_BORDER, 1) if not self.is_hitbox_mode else QPen(AppColors.GFX_BORDER_DIM, 1, Qt.PenStyle.DashLine)
             pen.setCosmetic(True)
             painter.setPen(pen)
             painter.drawRect(dest_rect)
-            
-            painter.restore()
 
         painter.restore()
         
-        if self.pixmap:
-            painter.save()
-            painter.setOpacity(0.5)
-            mw, mh = 300, 300
-            scaled = self.pixmap.scaled(mw, mh, Qt.AspectRatioMode.KeepAspectRatio)
-            x = self.width() - scaled.width() - 10
-            y = 10
-            painter.drawPixmap(x, y, scaled)
-            painter.restore()
+        # Minimap (cached thumbnail + current frame overlay)
+        highlight = frame_source_rect(p, self.show_direction, self.current_frame)
+        self.minimap.paint(painter, self.pixmap, self.width(), self.devicePixelRatioF(), highlight)
 
         # Info HUD
         painter.setPen(AppColors.TEXT_PRIMARY)
-        mode_text = "[HITBOX MODE]" if self.is_hitbox_mode else "[GRAPHIC MODE]"
-        info = f"{mode_text} | Frame: {self.current_frame + 1}/{frames} | Zoom: {self.zoom}x"
-        painter.drawText(10, self.height() - 10, info)
\ No newline at end of file
+        painter.drawText(10, self.height() - 10, self._hud_text())
+
+    def _paint_sandbox(self):
+        """Full repaint of the physics sandbox, timed for the HUD"""
+        start = time.perf_counter()
+        self._painted_scene = None
+        p = self.data.standard_params
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.bg_color)
+        origin = QPointF(self.width() // 2 + self.pan_x, self.height() // 2 + self.pan_y)
+        self.sandbox.paint(painter, origin, self.zoom, self.devicePixelRatioF(), self.frame_atlas,
+                           self.pixmap, p)
+        self.minimap.paint(painter, self.pixmap, self.width(), self.devicePixelRatioF())
+        painter.setPen(AppColors.TEXT_PRIMARY)
+        painter.drawText(10, self.height() - 10, self._hud_text())
+        painter.end()
+        self.paint_ms = (time.perf_counter() - start) * 1000
@@ -0,0 +1,201 @@
+"""
+Pre-sliced frame atlas for SMBX sprite sheets
+
+Slices a sheet into per-direction frame pixmaps once per
+(image, gfxwidth, gfxheight, frames, framestyle), so animation ticks only blit
+a cached frame instead of computing source rects and flipping the painter.
+Frames can also be pre-scaled with nearest neighbour for the current zoom and
+device pixel ratio, so painting them is an unscaled blit.
+
+Sheet layouts (rows of gfxheight, one frame per row):
+    framestyle 0: [left frames]                      right = mirrored left
+    framestyle 1: [left frames][right frames]
+    framestyle 2: [left][right][left held][right held]
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QPixmap, QPainter, QTransform
+
+from ..analysis.frame_hash import cached_frame_hashes
+
+# Directions stored in the atlas
+DIR_LEFT = 0
+DIR_RIGHT = 1
+DIR_LEFT_HELD = 2
+DIR_RIGHT_HELD = 3
+
+# Memory budget of pre-scaled frames; they grow with (zoom * DPR)²
+SCALED_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def frame_geometry(params) -> Tuple[int, int, int, int]:
+    """(gfxwidth, gfxheight, frames, framestyle) with the preview's fallbacks"""
+    return (int(params.get('gfxwidth') or 32),
+            int(params.get('gfxheight') or 32),
+            max(1, int(params.get('frames') or 1)),
+            int(params.get('framestyle') or 0))
+
+
+def frame_source_row(framestyle: int, frames: int, direction: int, index: int) -> Tuple[int, bool]:
+    """
+    Sheet row of a frame and whether it has to be mirrored
+
+    Returns:
+        (row, mirrored)
+    """
+    if framestyle == 0:
+        return index, direction in (DIR_RIGHT, DIR_RIGHT_HELD)
+    if framestyle == 1 or direction in (DIR_LEFT, DIR_RIGHT):
+        # Style 1 has no held rows, fall back to the walking rows
+        return (direction % 2) * frames + index, False
+    return direction * frames + index, False
+
+
+def frame_source_rect(params, direction: int, index: int) -> QRect:
+    """Rect of a frame inside the sheet (before any mirroring)"""
+    fw, fh, frames, style = frame_geometry(params)
+    row, _ = frame_source_row(style, frames, direction, index % frames)
+    return QRect(0, row * fh, fw, fh)
+
+
+class FrameAtlas:
+    """
+    Lazily sliced frame pixmaps, invalidated only when the geometry or image changes
+    """
+
+    def __init__(self):
+        self._key = None
+        self._frames: "OrderedDict[Tuple[int, int], QPixmap]" = OrderedDict()
+        self._max_frames: Optional[int] = None
+        # Canonical sheet row -> atlas key that sliced it, for sharing duplicate frames
+        self._row_keys: Dict[int, Tuple[int, int]] = {}
+        # Nearest-neighbour scaled frames for the one live scale (zoom * DPR)
+        self._scaled: "OrderedDict[Tuple[int, int], QPixmap]" = OrderedDict()
+        self._scaled_bytes = 0
+        self._scale: Optional[float] = None
+
+    def invalidate(self) -> None:
+        self._key = None
+        self._frames.clear()
+        self._row_keys.clear()
+        self._clear_scaled()
+
+    def _clear_scaled(self) -> None:
+        self._scaled.clear()
+        self._scaled_bytes = 0
+
+    def _sync(self, sheet: QPixmap, params) -> Tuple[int, int, int, int]:
+        geometry = frame_geometry(params)
+        key = (sheet.cacheKey(),) + geometry
+        if key != self._key:
+            self._key = key
+            self._frames.clear()
+            self._row_keys.clear()
+            self._clear_scaled()
+            # Lazily decoded sheets carry a memory cap the atlas must respect too
+            cap = getattr(sheet, 'memory_cap', None)
+            fw, fh = geometry[0], geometry[1]
+            self._max_frames = max(4, cap // max(1, fw * fh * 4)) if cap else None
+        return geometry
+
+    def frame(self, sheet, params, direction: int, index: int) -> Optional[QPixmap]:
+        """
+        Frame pixmap for a direction, with mirroring already baked in
+
+        Args:
+            sheet: Full sprite sheet (QPixmap or LazySheet)
+            params: NPC standard parameters
+            direction: One of DIR_LEFT, DIR_RIGHT, DIR_LEFT_HELD, DIR_RIGHT_HELD
+            index: Frame index within the direction
+        """
+        if sheet is None or sheet.isNull():
+            return None
+        fw, fh, frames, style = self._sync(sheet, params)
+        if fw <= 0 or fh <= 0:
+            return None
+        index = index % frames
+
+        cached = self._frames.get((direction, index))
+        if cached is not None:
+            self._frames.move_to_end((direction, index))
+            return cached
+
+        row, mirrored = frame_source_row(style, frames, direction, index)
+        if mirrored:
+            # Mirror the already sliced source frame instead of slicing twice
+            unmirrored_dir = DIR_LEFT if direction == DIR_RIGHT else DIR_LEFT_HELD
+            base = self.frame(sheet, params, unmirrored_dir, index)
+            pixmap = base.transformed(QTransform().scale(-1, 1))
+        else:
+            # Identical frames (per an already computed hash index) share one slice
+            hashes = cached_frame_hashes(sheet, fw, fh)
+            canonical = hashes.canonical_row(row) if hashes is not None else row
+            twin_key = self._row_keys.get(canonical)
+            pixmap = self._frames.get(twin_key) if twin_key is not None else None
+            if pixmap is None:
+                pixmap = self._slice(sheet, QRect(0, row * fh, fw, fh))
+                self._row_keys[canonical] = (direction, index)
+
+        self._frames[(direction, index)] = pixmap
+        if self._max_frames is not None:
+            while len(self._frames) > self._max_frames:
+                self._frames.popitem(last=False)
+        return pixmap
+
+    def scaled_frame(self, sheet, params, direction: int, index: int, zoom: float,
+                     dpr: float = 1.0) -> Optional[QPixmap]:
+        """
+        Frame pre-scaled with nearest neighbour to zoom * dpr device pixels per sheet pixel
+
+        The pixmap carries dpr as its device pixel ratio, so it is blitted
+        unscaled at zoom times its logical frame size. Scaled frames are kept
+        for a single zoom/DPR and dropped as soon as either changes.
+
+        Returns:
+            None if there is no frame or it alone would exceed SCALED_CACHE_BYTES
+        """
+        pixmap = self.frame(sheet, params, direction, index)
+        if pixmap is None:
+            return None
+        scale = zoom * dpr
+        if scale != self._scale:
+            self._clear_scaled()
+            self._scale = scale
+
+        key = (direction, index % frame_geometry(params)[2])
+        cached = self._scaled.get(key)
+        if cached is not None:
+            self._scaled.move_to_end(key)
+            return cached
+
+        width = max(1, int(round(pixmap.width() * scale)))
+        height = max(1, int(round(pixmap.height() * scale)))
+        size = width * height * 4
+        if size > SCALED_CACHE_BYTES:
+            return None
+        scaled = pixmap.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                               Qt.TransformationMode.FastTransformation)
+        scaled.setDevicePixelRatio(dpr)
+
+        self._scaled[key] = scaled
+        self._scaled_bytes += size
+        while self._scaled_bytes > SCALED_CACHE_BYTES:
+            _, old = self._scaled.popitem(last=False)
+            self._scaled_bytes -= old.width() * old.height() * 4
+        return scaled
+
+    @staticmethod
+    def _slice(sheet, src_rect: QRect) -> QPixmap:
+        if not isinstance(sheet, QPixmap):
+            # LazySheet decodes just the bands under src_rect
+            return sheet.copy(src_rect)
+        # Paint instead of copy() so rows past the sheet end stay full size and transparent
+        pixmap = QPixmap(src_rect.size())
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.drawPixmap(0, 0, sheet, src_rect.x(), src_rect.y(), src_rect.width(), src_rect.height())
+        painter.end()
+        return pixmap
@@ -0,0 +1,153 @@
+"""
+Light rendering for the animation preview and the headless renderer
+
+Light colours are parsed once per lightcolor value. The light itself is a
+radial falloff texture (bright centre fading to nothing at lightradius)
+scaled by lightbrightness and rendered once per (radius, colour,
+brightness, device size), so painting it is a single blit. The falloff is
+smooth, so textures are capped at MAX_TEXTURE_SIDE and stretched beyond
+that: a huge radius at high zoom costs one small texture instead of
+hundreds of megabytes, and the cache is bounded in bytes.
+lightflicker is simulated by stepping through a small precomputed table of
+brightness factors, quantized so flickering reuses a handful of textures.
+"""
+
+import random
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple
+
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter, QRadialGradient
+
+from ..ui.styles import AppColors
+
+FLICKER_STEPS = 24
+
+
+def _flicker_table(steps: int) -> Tuple[float, ...]:
+    """Brightness factors of one flicker cycle; mostly bright with occasional dips, same on every run"""
+    rng = random.Random(65)
+    return tuple(round(0.7 + 0.3 * rng.random() ** 0.5, 2) for _ in range(steps))
+
+
+# Brightness factors of the flicker cycle, one per animation tick
+FLICKER_TABLE = _flicker_table(FLICKER_STEPS)
+# Brightness is rounded to this many steps per 1.0 before it becomes part of a cache key
+BRIGHTNESS_STEPS = 16
+# Alpha of the light centre at lightbrightness 1.0
+CENTER_ALPHA = 110
+# Largest texture side in device pixels; bigger lights draw it stretched
+MAX_TEXTURE_SIDE = 512
+# Total size of the cached textures
+_MAX_TEXTURE_BYTES = 32 * 1024 * 1024
+
+
+@lru_cache(maxsize=64)
+def _parse_light_color(text: str) -> Tuple[QColor, QColor]:
+    if text.startswith("0x") and len(text) == 8:
+        try:
+            r, g, b = int(text[2:4], 16), int(text[4:6], 16), int(text[6:8], 16)
+        except ValueError:
+            return AppColors.LIGHT_FILL, AppColors.LIGHT_BORDER
+        return QColor(r, g, b, 100), QColor(r, g, b, 255)
+    if text.startswith("#") or QColor.isValidColor(text):
+        color = QColor(text)
+        if color.isValid():
+            return QColor(color.red(), color.green(), color.blue(), 100), color
+    return AppColors.LIGHT_FILL, AppColors.LIGHT_BORDER
+
+
+def light_colors(value) -> Tuple[QColor, QColor]:
+    """
+    (fill, border) colours for a lightcolor value, parsed once per value
+
+    Accepts SMBX 0xRRGGBB values and anything QColor understands; falls
+    back to the theme colours otherwise. The colours are shared, do not
+    modify them.
+    """
+    if not value:
+        return AppColors.LIGHT_FILL, AppColors.LIGHT_BORDER
+    return _parse_light_color(str(value).strip())
+
+
+def light_brightness(params, tick: int = 0) -> float:
+    """lightbrightness with flicker applied for an animation tick, quantized for caching"""
+    try:
+        brightness = float(params.get('lightbrightness') if params.get('lightbrightness') is not None else 1.0)
+    except (TypeError, ValueError):
+        brightness = 1.0
+    if params.get('lightflicker'):
+        brightness *= FLICKER_TABLE[tick % len(FLICKER_TABLE)]
+    return round(max(0.0, brightness) * BRIGHTNESS_STEPS) / BRIGHTNESS_STEPS
+
+
+class LightLayer:
+    """Cached light falloff textures"""
+
+    def __init__(self):
+        self._textures: "OrderedDict[Tuple[int, float, int], QImage]" = OrderedDict()
+        self._bytes = 0
+
+    def texture(self, radius: int, color: QColor, brightness: float, zoom: float, dpr: float = 1.0) -> QImage:
+        """
+        Radial falloff of one light, 2 * radius * zoom * dpr device pixels wide
+
+        At most MAX_TEXTURE_SIDE pixels wide; paint stretches it to the full size.
+        """
+        side = max(1, min(MAX_TEXTURE_SIDE, int(round(radius * 2 * zoom * dpr))))
+        key = (color.rgb(), brightness, side)
+        texture = self._textures.get(key)
+        if texture is not None:
+            self._textures.move_to_end(key)
+        else:
+            texture = QImage(side, side, QImage.Format.Format_ARGB32_Premultiplied)
+            texture.fill(Qt.GlobalColor.transparent)
+
+            alpha = min(255, int(CENTER_ALPHA * brightness))
+            gradient = QRadialGradient(QPointF(side / 2, side / 2), side / 2)
+            for stop, share in ((0.0, 1.0), (0.35, 0.6), (0.7, 0.2), (1.0, 0.0)):
+                gradient.setColorAt(stop, QColor(color.red(), color.green(), color.blue(), int(alpha * share)))
+            painter = QPainter(texture)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(gradient)
+            painter.drawEllipse(0, 0, side, side)
+            painter.end()
+            self._textures[key] = texture
+            self._bytes += texture.sizeInBytes()
+            # Least recently used first; the newest texture always stays
+            while self._bytes > _MAX_TEXTURE_BYTES and len(self._textures) > 1:
+                _, old = self._textures.popitem(last=False)
+                self._bytes -= old.sizeInBytes()
+        return texture
+
+    def paint(self, painter: QPainter, center: QPointF, params, zoom: float, dpr: float = 1.0,
+              tick: int = 0) -> None:
+        """
+        Draw the light of an NPC
+
+        Args:
+            painter: Painter in widget coordinates (no zoom applied)
+            center: Widget position of the light centre
+            params: NPC standard parameters
+            zoom: Logical to widget scale
+            dpr: Device pixel ratio of the target
+            tick: Animation tick, selects the flicker step
+        """
+        radius = int(params.get('lightradius') or 0)
+        brightness = light_brightness(params, tick)
+        if radius <= 0 or brightness <= 0:
+            return
+        _, color = light_colors(params.get('lightcolor'))
+        texture = self.texture(radius, color, brightness, zoom, dpr)
+        half = radius * zoom
+        target = QRectF(center.x() - half, center.y() - half, 2 * half, 2 * half)
+        if texture.width() < round(2 * half * dpr):
+            # Capped texture: stretch it smoothly over the light
+            painter.save()
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(target, texture, QRectF(texture.rect()))
+            painter.restore()
+        else:
+            painter.drawImage(target, texture, QRectF(texture.rect()))
@@ -0,0 +1,80 @@
+"""
+Sprite sheet minimap for the animation preview
+
+The scaled overview is built once per sheet and device pixel ratio; the
+current-frame highlight is drawn on top as a cheap overlay every paint.
+"""
+
+from typing import Optional
+
+from PyQt6.QtCore import Qt, QRect, QRectF
+from PyQt6.QtGui import QPixmap, QPainter, QPen
+
+from ..ui.styles import AppColors
+
+
+class Minimap:
+    """Cached thumbnail of the whole sheet, anchored to the top-right corner"""
+
+    def __init__(self, max_size: int = 300, margin: int = 10, opacity: float = 0.5):
+        self.max_size = max_size
+        self.margin = margin
+        self.opacity = opacity
+        self.visible = True
+        self._key = None
+        self._thumbnail: Optional[QPixmap] = None
+
+    def invalidate(self) -> None:
+        self._key = None
+        self._thumbnail = None
+
+    def thumbnail(self, sheet: QPixmap, dpr: float = 1.0) -> QPixmap:
+        """Scaled overview of the sheet, rebuilt only when the sheet or DPR changes"""
+        key = (sheet.cacheKey(), dpr)
+        if key != self._key:
+            side = int(round(self.max_size * dpr))
+            thumb = sheet.scaled(side, side, Qt.AspectRatioMode.KeepAspectRatio)
+            thumb.setDevicePixelRatio(dpr)
+            self._key = key
+            self._thumbnail = thumb
+        return self._thumbnail
+
+    def geometry(self, sheet: QPixmap, widget_width: int, dpr: float = 1.0) -> QRect:
+        """Widget rect covered by the minimap"""
+        size = self.thumbnail(sheet, dpr).deviceIndependentSize().toSize()
+        return QRect(widget_width - size.width() - self.margin, self.margin, size.width(), size.height())
+
+    def paint(self, painter: QPainter, sheet: Optional[QPixmap], widget_width: int,
+              dpr: float = 1.0, highlight: Optional[QRect] = None) -> None:
+        """
+        Draw the minimap
+
+        Args:
+            painter: Painter in widget coordinates
+            sheet: Full sprite sheet
+            widget_width: Width of the target widget
+            dpr: Device pixel ratio of the target widget
+            highlight: Current frame rect in sheet pixels, outlined on top
+        """
+        if not self.visible or sheet is None or sheet.isNull():
+            return
+
+        thumb = self.thumbnail(sheet, dpr)
+        target = self.geometry(sheet, widget_width, dpr)
+
+        painter.save()
+        painter.setOpacity(self.opacity)
+        painter.drawPixmap(target.topLeft(), thumb)
+        painter.restore()
+
+        if highlight is not None and sheet.width() > 0 and sheet.height() > 0:
+            sx = target.width() / sheet.width()
+            sy = target.height() / sheet.height()
+            rect = QRectF(target.x() + highlight.x() * sx, target.y() + highlight.y() * sy,
+                          highlight.width() * sx, highlight.height() * sy)
+            painter.save()
+            pen = QPen(AppColors.MINIMAP_HIGHLIGHT, 1)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawRect(rect.intersected(QRectF(target)))
+            painter.restore()
@@ -0,0 +1,175 @@
+"""
+Headless NPC renderer
+
+Draws one frame of an NPC (config parameters plus sprite sheet) into a
+QImage with the same geometry rules AnimationPreview uses on screen: the
+hitbox is centred on the origin, the frame is centred horizontally on it and
+its bottom sits on the hitbox bottom (both shifted by gfxoffsetx/y), right
+facing framestyle 1/2 frames mirror gfxoffsetx and framestyle 0 mirrors the
+whole frame. Rendering needs no widget, so previews can be generated in
+batch jobs and CI.
+"""
+
+from typing import Iterable, Optional, Tuple
+
+from PyQt6.QtCore import QPoint, QPointF, QRect, QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+
+from ..ui.styles import AppColors
+from .frame_atlas import DIR_RIGHT, frame_geometry, frame_source_row
+from .light import LightLayer, light_colors
+from .tick_clock import TICKS_PER_SECOND
+
+_light = LightLayer()
+
+def frame_time_ms(params, step: int) -> int:
+    """
+    Milliseconds from the start of the animation to frame step ``step``
+
+    Frames last framespeed (default 8) ticks of the 65 Hz clock; differences
+    of consecutive values give whole-millisecond delays without drift.
+    """
+    speed = max(1, int(params.get('framespeed') or 8))
+    return step * speed * 1000 // TICKS_PER_SECOND
+
+
+def hitbox_rect(params) -> QRectF:
+    """Hitbox in logical pixels, centred on the origin"""
+    w = int(params.get('width') or 32)
+    h = int(params.get('height') or 32)
+    return QRectF(-w / 2, -h / 2, w, h)
+
+
+def sprite_placement(params, direction: int) -> Tuple[QRectF, QPoint]:
+    """
+    Where a frame is drawn
+
+    Returns:
+        (rect, blit_pos): logical rect of the frame after mirroring and the
+        whole-pixel top-left corner the frame image is blitted to
+    """
+    fw, fh, _, style = frame_geometry(params)
+    ph = int(params.get('height') or 32)
+    ox = int(params.get('gfxoffsetx') or 0)
+    oy = int(params.get('gfxoffsety') or 0)
+    facing_right = direction % 2 == DIR_RIGHT
+    if style >= 1 and facing_right:
+        ox = -ox
+
+    x = -fw / 2 + ox
+    y = (ph / 2) - fh + oy
+    blit_pos = QRectF(x, y, fw, fh).toRect().topLeft()
+    if style == 0 and facing_right:
+        # Style 0 frames are mirrored around the origin
+        x = -x - fw
+        blit_pos.setX(-blit_pos.x() - fw)
+    return QRectF(x, y, fw, fh), blit_pos
+
+
+def light_center(params, direction: int) -> Tuple[int, int]:
+    """Light centre relative to the hitbox centre, mirrored when facing right"""
+    cx = -int(params.get('lightoffsetx') or 0)
+    cy = int(params.get('lightoffsety') or 0)
+    if direction % 2 == DIR_RIGHT:
+        cx = -cx
+    return cx, cy
+
+
+def scene_bounds(params, directions: Iterable[int] = (0,), boxes: bool = False,
+                 light: bool = False, margin: int = 0) -> QRect:
+    """
+    Logical pixel rect that holds the NPC in all given directions
+
+    Args:
+        boxes: Include the hitbox
+        light: Include the light circle
+        margin: Extra pixels on every side
+    """
+    bounds = QRectF()
+    for direction in directions:
+        rect, blit_pos = sprite_placement(params, direction)
+        bounds = bounds.united(QRectF(blit_pos.x(), blit_pos.y(), rect.width(), rect.height()))
+        if boxes:
+            bounds = bounds.united(rect)
+        radius = int(params.get('lightradius') or 0)
+        if light and radius > 0:
+            cx, cy = light_center(params, direction)
+            bounds = bounds.united(QRectF(cx - radius, cy - radius, radius * 2, radius * 2))
+    if boxes:
+        bounds = bounds.united(hitbox_rect(params))
+    # Pens are drawn on the right/bottom edge, keep one more pixel
+    aligned = bounds.toAlignedRect().adjusted(0, 0, 1 if boxes or light else 0, 1 if boxes or light else 0)
+    return aligned.adjusted(-margin, -margin, margin, margin)
+
+
+def render_frame(sheet, params, frame: int = 0, direction: int = 0, zoom: int = 1,
+                 bounds: Optional[QRect] = None, background: Optional[QColor] = None,
+                 boxes: bool = False, light: bool = False, tick: int = 0) -> QImage:
+    """
+    Render one frame of an NPC into a new image
+
+    Args:
+        sheet: Sprite sheet as QImage (QPixmap also works with a GUI application)
+        params: NPC standard parameters
+        frame: Frame index within the direction
+        direction: DIR_LEFT, DIR_RIGHT, DIR_LEFT_HELD or DIR_RIGHT_HELD
+        zoom: Integer scale factor, pixels stay sharp
+        bounds: Logical area to render, see scene_bounds (default: just this frame)
+        background: Fill colour, transparent when None
+        boxes: Draw the hitbox (green) and graphics box (red) like the preview
+        light: Draw the light (falloff and radius circle)
+        tick: Animation tick, selects the lightflicker step
+
+    Returns:
+        ARGB32 premultiplied image of bounds scaled by zoom
+    """
+    if bounds is None:
+        bounds = scene_bounds(params, (direction,), boxes, light)
+    zoom = max(1, int(zoom))
+    image = QImage(max(1, bounds.width() * zoom), max(1, bounds.height() * zoom),
+                   QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(background if background is not None else QColor(0, 0, 0, 0))
+
+    painter = QPainter(image)
+    painter.scale(zoom, zoom)
+    painter.translate(-bounds.x(), -bounds.y())
+
+    radius = int(params.get('lightradius') or 0)
+    if light and radius > 0:
+        cx, cy = light_center(params, direction)
+        painter.save()
+        painter.resetTransform()
+        _light.paint(painter, QPointF((cx - bounds.x()) * zoom, (cy - bounds.y()) * zoom), params, zoom, tick=tick)
+        painter.restore()
+        _, border = light_colors(params.get('lightcolor'))
+        painter.setPen(QPen(border, 0))
+        painter.drawEllipse(QRectF(cx - radius, cy - radius, radius * 2, radius * 2))
+
+    fw, fh, frames, style = frame_geometry(params)
+    rect, blit_pos = sprite_placement(params, direction)
+    if sheet is not None and not sheet.isNull():
+        row, mirrored = frame_source_row(style, frames, direction, frame % frames)
+        source = QRect(0, row * fh, fw, fh)
+        painter.save()
+        if mirrored:
+            # Flip around the frame's own centre, like the atlas' pre-mirrored frames
+            painter.translate(blit_pos.x() * 2 + fw, 0)
+            painter.scale(-1, 1)
+        if isinstance(sheet, QPixmap):
+            painter.drawPixmap(blit_pos, sheet, source)
+        else:
+            painter.drawImage(blit_pos, sheet, source)
+        painter.restore()
+
+    if boxes:
+        pen = QPen(AppColors.HITBOX_BORDER, 1)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawRect(hitbox_rect(params))
+        pen = QPen(AppColors.GFX_BORDER, 1)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawRect(rect)
+
+    painter.end()
+    return image
@@ -0,0 +1,124 @@
+"""
+Shared SMBX tick clock for animated previews
+
+SMBX advances animations on a 65 Hz tick and shows frame
+tick // framespeed. Instead of one QTimer per preview with a rounded
+millisecond interval (which drifts from 65 Hz and runs every preview in its
+own phase), the clock derives an integer tick counter from a monotonic clock
+and wakes up with a single timer exactly when the next subscriber's step
+changes. Subscribers on the same framespeed therefore always switch frames
+on the same tick, and the timer is stopped while nobody animates.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+
+TICKS_PER_SECOND = 65
+_NS_PER_SECOND = 1_000_000_000
+
+
+class _Subscription:
+    def __init__(self, period: int, callback: Callable[[int], None], step: int):
+        self.period = period
+        self.callback = callback
+        self.step = step
+
+
+class TickClock(QObject):
+    """
+    Monotonic 65 Hz tick counter with one coalesced wake-up timer
+
+    Subscribers register a period in ticks (their framespeed) and are called
+    with the current tick whenever tick // period changes.
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._origin_ns = time.monotonic_ns()
+        self._subscriptions: Dict[int, _Subscription] = {}
+        # Owners whose destroyed signal is connected; once per owner, not per subscribe
+        self._watched: Set[int] = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def tick(self) -> int:
+        """Whole SMBX ticks since the clock started"""
+        return (time.monotonic_ns() - self._origin_ns) * TICKS_PER_SECOND // _NS_PER_SECOND
+
+    def subscribe(self, owner: QObject, period: int, callback: Callable[[int], None]) -> None:
+        """
+        Call callback(tick) every ``period`` ticks, replacing any earlier subscription of owner
+
+        The subscription ends automatically when owner is destroyed.
+        """
+        key = id(owner)
+        if key not in self._watched:
+            self._watched.add(key)
+            owner.destroyed.connect(lambda *_: self._forget(key))
+        period = max(1, int(period))
+        self._subscriptions[key] = _Subscription(period, callback, self.tick() // period)
+        self._reschedule()
+
+    def unsubscribe(self, owner: QObject) -> None:
+        self._remove(id(owner))
+
+    def is_subscribed(self, owner: QObject) -> bool:
+        return id(owner) in self._subscriptions
+
+    def period(self, owner: QObject) -> Optional[int]:
+        subscription = self._subscriptions.get(id(owner))
+        return subscription.period if subscription else None
+
+    @property
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def _forget(self, key: int) -> None:
+        self._watched.discard(key)
+        self._remove(key)
+
+    def _remove(self, key: int) -> None:
+        if self._subscriptions.pop(key, None) is not None:
+            try:
+                self._reschedule()
+            except RuntimeError:
+                # Widgets destroyed at application exit may outlive the clock's timer
+                pass
+
+    def _on_timeout(self) -> None:
+        tick = self.tick()
+        due: List[_Subscription] = []
+        for subscription in self._subscriptions.values():
+            step = tick // subscription.period
+            if step != subscription.step:
+                subscription.step = step
+                due.append(subscription)
+        # Callbacks may (un)subscribe, so they run after the scan
+        for subscription in due:
+            subscription.callback(tick)
+        self._reschedule()
+
+    def _reschedule(self) -> None:
+        if not self._subscriptions:
+            self._timer.stop()
+            return
+        next_tick = min((s.step + 1) * s.period for s in self._subscriptions.values())
+        # First nanosecond of next_tick, so waking up never lands a tick early
+        due_ns = self._origin_ns + -(-next_tick * _NS_PER_SECOND // TICKS_PER_SECOND)
+        delay_ns = due_ns - time.monotonic_ns()
+        self._timer.start(max(0, -(-delay_ns // 1_000_000)))
+
+
+_shared_clock: Optional[TickClock] = None
+
+
+def shared_clock() -> TickClock:
+    """Process-wide clock shared by every preview"""
+    global _shared_clock
+    if _shared_clock is None:
+        _shared_clock = TickClock()
+    return _shared_clock
@@ -0,0 +1,41 @@
+"""
+Headless empty/duplicate frame report over a folder of NPC configs
+
+Hashes the frames of every config's sheet (using its gfxwidth/gfxheight)
+and lists empty frames, identical frames and near duplicates.
+"""
+
+from typing import Callable, List, Optional
+
+from ..analysis.frame_hash import FrameHashes, compute_frame_hashes
+from ..rendering.frame_atlas import frame_geometry
+from .frame_report import find_configs, load_config_image, run_checks
+
+
+class FrameHashCheck:
+    """Frame hash index of one NPC's sheet"""
+
+    def __init__(self, config_path: str, image_path: str, hashes: Optional[FrameHashes], error: str = ""):
+        self.config_path = config_path
+        self.image_path = image_path
+        self.hashes = hashes
+        self.error = error
+
+    @property
+    def has_findings(self) -> bool:
+        h = self.hashes
+        return h is not None and bool(h.empty_frames or h.duplicate_groups() or h.near_duplicates()
+                                      or h.leftover_rows)
+
+
+def check_config(config_path: str) -> FrameHashCheck:
+    data, image_path, image, error = load_config_image(config_path)
+    if image is None:
+        return FrameHashCheck(config_path, image_path, None, error)
+    fw, fh, _, _ = frame_geometry(data.standard_params)
+    return FrameHashCheck(config_path, image_path, compute_frame_hashes(image, fw, fh))
+
+
+def check_folder(root: str, progress: Optional[Callable[[int, int, FrameHashCheck], None]] = None) -> List[FrameHashCheck]:
+    """check_config for every config with a sprite below root"""
+    return run_checks(find_configs(root), check_config, progress)
@@ -0,0 +1,110 @@
+"""
+Headless frame geometry check over a folder of NPC configs
+
+Loads every npc-*.txt (any .txt with a sprite next to it), detects the frame
+layout of its sheet and compares it with gfxwidth/gfxheight/frames/framestyle
+in the config, so broken configs can be found without opening each one.
+"""
+
+import os
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from PyQt6.QtGui import QImage
+
+from ..npc_data import NPCData
+from ..analysis.frame_detect import FrameGeometry, detect_frame_geometry
+from ..analysis.sheet_profile import SheetProfile
+from ..utils.image_utils import find_sprite_files, load_sprite_image
+
+logger = logging.getLogger(__name__)
+
+FRAME_KEYS = ('gfxwidth', 'gfxheight', 'frames', 'framestyle')
+
+
+class FrameCheck:
+    """Detected vs. configured frame layout of one NPC"""
+
+    def __init__(self, config_path: str, image_path: str, current: dict,
+                 detected: Optional[FrameGeometry], error: str = ""):
+        self.config_path = config_path
+        self.image_path = image_path
+        self.current = current
+        self.detected = detected
+        self.error = error
+
+    @property
+    def differs(self) -> bool:
+        return self.detected is not None and self.detected.differs_from(self.current)
+
+    def current_text(self) -> str:
+        p = self.current
+        return (f"{p.get('gfxwidth') or '-'}x{p.get('gfxheight') or '-'}, "
+                f"{p.get('frames') or 1} frame(s), style {p.get('framestyle') or 0}")
+
+
+def find_configs(root: str) -> List[str]:
+    """Every .txt below root that has a sprite next to it"""
+    configs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if name.lower().endswith('.txt') and find_sprite_files(path)[0]:
+                configs.append(path)
+    return configs
+
+
+def load_config_image(config_path: str) -> Tuple[Optional[NPCData], str, Optional[QImage], str]:
+    """
+    Config plus its decoded sprite sheet
+
+    Returns:
+        (data, image_path, image, error); data/image are None on errors
+    """
+    data = NPCData()
+    if not data.load(config_path):
+        return None, "", None, "Could not read config"
+    image_path, mask_path = find_sprite_files(config_path)
+    if not image_path:
+        return data, "", None, "No sprite found"
+    image = load_sprite_image(image_path, mask_path)
+    if image.isNull():
+        return data, image_path, None, "Could not read sprite"
+    return data, image_path, image, ""
+
+
+def load_config_sprite(config_path: str) -> Tuple[Optional[NPCData], str, Optional[SheetProfile], str]:
+    """
+    Config plus the alpha profile of its sprite
+
+    Returns:
+        (data, image_path, profile, error); data/profile are None on errors
+    """
+    data, image_path, image, error = load_config_image(config_path)
+    return data, image_path, SheetProfile.from_image(image) if image is not None else None, error
+
+
+def check_config(config_path: str) -> FrameCheck:
+    """Detect the frame layout of one config's sprite"""
+    data, image_path, profile, error = load_config_sprite(config_path)
+    current = {k: data.standard_params.get(k) for k in FRAME_KEYS} if data else {}
+    detected = detect_frame_geometry(profile, current) if profile else None
+    return FrameCheck(config_path, image_path, current, detected, error)
+
+
+def check_folder(root: str, progress: Optional[Callable[[int, int, FrameCheck], None]] = None) -> List[FrameCheck]:
+    """check_config for every config with a sprite below root"""
+    return run_checks(find_configs(root), check_config, progress)
+
+
+def run_checks(configs: List[str], check: Callable, progress: Optional[Callable] = None) -> list:
+    """Run a per-config check over configs, logging errors and reporting progress"""
+    results = []
+    for i, path in enumerate(configs, 1):
+        result = check(path)
+        if result.error:
+            logger.warning(f"{path}: {result.error}")
+        results.append(result)
+        if progress:
+            progress(i, len(configs), result)
+    return results
@@ -0,0 +1,44 @@
+"""
+Headless hitbox fit report over a folder of NPC configs
+
+Runs the alpha-based hitbox/offset fit for every config with a sprite and
+lists the proposed width/height/gfxoffsetx/gfxoffsety next to the values in
+the config.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..analysis.hitbox_fit import FIT_KEYS, HitboxFit, fit_hitbox
+from .frame_report import find_configs, load_config_sprite, run_checks
+
+
+class HitboxCheck:
+    """Proposed vs. configured hitbox of one NPC"""
+
+    def __init__(self, config_path: str, image_path: str, current: dict,
+                 fit: Optional[HitboxFit], error: str = ""):
+        self.config_path = config_path
+        self.image_path = image_path
+        self.current = current
+        self.fit = fit
+        self.error = error
+
+    @property
+    def differences(self) -> Dict[str, Tuple[Optional[int], int]]:
+        return self.fit.differences(self.current) if self.fit else {}
+
+
+def check_config(config_path: str) -> HitboxCheck:
+    """Fit the hitbox of one config's sprite"""
+    data, image_path, profile, error = load_config_sprite(config_path)
+    current = dict(data.standard_params) if data else {}
+    fit = fit_hitbox(profile, current) if profile else None
+    if profile is not None and fit is None:
+        error = "Sprite has no opaque pixels"
+    return HitboxCheck(config_path, image_path,
+                       {k: current.get(k) for k in FIT_KEYS}, fit, error)
+
+
+def check_folder(root: str, progress: Optional[Callable[[int, int, HitboxCheck], None]] = None) -> List[HitboxCheck]:
+    """check_config for every config with a sprite below root"""
+    return run_checks(find_configs(root), check_config, progress)
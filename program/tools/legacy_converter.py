@@ -0,0 +1,190 @@
+"""
+Batch conversion of legacy GIF/BMP + mask sprites to PNG
+
+Walks a directory tree, finds front/mask pairs (npc-6.gif + npc-6m.gif),
+composites them in parallel with a process pool and writes npc-6.png beside
+them, so the editor never has to run load_legacy_sprite for them again.
+Re-runs are incremental: pairs whose PNG is newer than both sources are skipped.
+Written PNGs carry a Software text chunk; a PNG without it (a hand-made SMBX2
+sprite next to leftover GIFs) is never overwritten unless forced.
+"""
+
+import os
+import time
+import shutil
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEGACY_EXTENSIONS = ('.gif', '.bmp')
+ORIGINALS_DIR = "legacy-originals"
+PNG_SOFTWARE_KEY = "Software"
+CONVERTER_TAG = "SMBX NPC Editor legacy converter"
+
+
+class LegacyPair:
+    """A legacy front image, its mask and the PNG it converts to"""
+
+    def __init__(self, front_path: str, mask_path: str):
+        self.front_path = front_path
+        self.mask_path = mask_path
+        self.png_path = os.path.splitext(front_path)[0] + ".png"
+
+    def is_up_to_date(self) -> bool:
+        """True if the PNG exists and is newer than both sources"""
+        try:
+            png_mtime = os.stat(self.png_path).st_mtime_ns
+            return png_mtime >= max(os.stat(self.front_path).st_mtime_ns,
+                                    os.stat(self.mask_path).st_mtime_ns)
+        except OSError:
+            return False
+
+    def png_is_foreign(self) -> bool:
+        """True if the PNG exists but was not written by the converter"""
+        if not os.path.exists(self.png_path):
+            return False
+        from PyQt6.QtGui import QImageReader
+        return QImageReader(self.png_path).text(PNG_SOFTWARE_KEY) != CONVERTER_TAG
+
+
+class ConversionReport:
+    """Totals and throughput of a batch conversion run"""
+
+    def __init__(self):
+        self.converted = 0
+        self.skipped = 0
+        self.kept: List[str] = []
+        self.failed: List[Tuple[str, str]] = []
+        self.pixels = 0
+        self.seconds = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.converted / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def megapixels_per_second(self) -> float:
+        return self.pixels / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"Converted {self.converted}, skipped {self.skipped} (up to date), "
+                f"kept {len(self.kept)} (not ours), failed {len(self.failed)} in {self.seconds:.2f}s "
+                f"({self.files_per_second:.1f} files/s, {self.megapixels_per_second:.1f} MP/s)")
+
+
+def find_legacy_pairs(root: str) -> List[LegacyPair]:
+    """
+    Find every front/mask pair under root
+
+    A file X.gif is a front image when Xm.gif exists next to it; the mask
+    itself is never reported as a front image.
+    """
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Never descend into folders we moved originals into
+        dirnames[:] = [d for d in dirnames if d != ORIGINALS_DIR]
+        lower_names = {name.lower(): name for name in filenames}
+        for name in sorted(filenames):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in LEGACY_EXTENSIONS:
+                continue
+            mask_name = lower_names.get((stem + "m" + ext).lower())
+            if mask_name:
+                pairs.append(LegacyPair(os.path.join(dirpath, name), os.path.join(dirpath, mask_name)))
+    return pairs
+
+
+def convert_pair(front_path: str, mask_path: str, png_path: str) -> Tuple[int, Optional[str]]:
+    """
+    Composite one pair and write the PNG (process pool worker)
+
+    Returns:
+        (pixels converted, error message or None)
+    """
+    from PyQt6.QtGui import QImage
+    from ..utils.image_utils import composite_legacy
+
+    front = QImage(front_path)
+    mask = QImage(mask_path)
+    if front.isNull():
+        return 0, f"Could not read {front_path}"
+    if mask.isNull():
+        return 0, f"Could not read {mask_path}"
+
+    # The pool already uses every core, keep each worker single threaded
+    image = composite_legacy(front, mask, workers=1)
+    image.setText(PNG_SOFTWARE_KEY, CONVERTER_TAG)
+    tmp_path = png_path + ".tmp"
+    if not image.save(tmp_path, "PNG"):
+        return 0, f"Could not write {png_path}"
+    os.replace(tmp_path, png_path)
+    return image.width() * image.height(), None
+
+
+def _move_original(path: str) -> None:
+    target_dir = os.path.join(os.path.dirname(path), ORIGINALS_DIR)
+    os.makedirs(target_dir, exist_ok=True)
+    shutil.move(path, os.path.join(target_dir, os.path.basename(path)))
+
+
+def convert_tree(root: str, jobs: Optional[int] = None, force: bool = False,
+                 move_originals: bool = False,
+                 progress: Optional[Callable[[int, int, LegacyPair], None]] = None) -> ConversionReport:
+    """
+    Convert every legacy pair under root to PNG
+
+    Args:
+        root: Folder to scan recursively
+        jobs: Worker processes (default: one per core)
+        force: Convert even if the PNG is up to date or was not written by the converter
+        move_originals: Move converted GIF/BMP pairs into a legacy-originals folder
+        progress: Called as progress(done, total, pair) after every conversion
+    """
+    report = ConversionReport()
+    start = time.perf_counter()
+
+    pairs = find_legacy_pairs(root)
+    todo = []
+    for pair in pairs:
+        if force:
+            todo.append(pair)
+        elif pair.is_up_to_date():
+            report.skipped += 1
+        elif pair.png_is_foreign():
+            logger.info(f"Keeping {pair.png_path}, it was not written by the converter")
+            report.kept.append(pair.png_path)
+        else:
+            todo.append(pair)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(convert_pair, p.front_path, p.mask_path, p.png_path): p for p in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                pair = futures[future]
+                try:
+                    pixels, error = future.result()
+                except Exception as e:
+                    pixels, error = 0, str(e)
+
+                if error:
+                    logger.warning(error)
+                    report.failed.append((pair.front_path, error))
+                else:
+                    report.converted += 1
+                    report.pixels += pixels
+                    if move_originals:
+                        try:
+                            _move_original(pair.front_path)
+                            _move_original(pair.mask_path)
+                        except OSError as e:
+                            # The PNG is written; only this pair's cleanup failed
+                            error = f"Converted, but could not move the original: {e}"
+                            logger.warning(error)
+                            report.failed.append((pair.front_path, error))
+                if progress:
+                    progress(done, len(todo), pair)
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,140 @@
+"""
+Batch export of PNG sprites to legacy GIF + mask pairs
+
+The inverse of legacy_converter: every npc-6.png under a folder is split into
+npc-6.gif (colours on black, 256-colour palette) and npc-6m.gif (black/white
+mask) for targets that still only read the legacy format. Exports run on a
+process pool and re-runs skip sprites whose GIFs are newer than the PNG.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from .legacy_converter import ORIGINALS_DIR, ConversionReport
+
+logger = logging.getLogger(__name__)
+
+
+class ExportReport(ConversionReport):
+    """Totals and throughput of a legacy export run"""
+
+    def summary(self) -> str:
+        return (f"Exported {self.converted}, skipped {self.skipped} (up to date), "
+                f"failed {len(self.failed)} in {self.seconds:.2f}s "
+                f"({self.files_per_second:.1f} files/s, {self.megapixels_per_second:.1f} MP/s)")
+
+
+class LegacyExport:
+    """A PNG sprite and the legacy front/mask files it exports to"""
+
+    def __init__(self, png_path: str, out_dir: Optional[str] = None):
+        self.png_path = png_path
+        stem = os.path.splitext(os.path.basename(png_path))[0]
+        folder = out_dir or os.path.dirname(png_path)
+        self.front_path = os.path.join(folder, stem + ".gif")
+        self.mask_path = os.path.join(folder, stem + "m.gif")
+
+    def is_up_to_date(self) -> bool:
+        """True if both GIFs exist and are newer than the PNG"""
+        try:
+            png_mtime = os.stat(self.png_path).st_mtime_ns
+            return min(os.stat(self.front_path).st_mtime_ns,
+                       os.stat(self.mask_path).st_mtime_ns) >= png_mtime
+        except OSError:
+            return False
+
+
+def find_png_sprites(root: str, out_root: Optional[str] = None) -> List[LegacyExport]:
+    """
+    Find every PNG under root
+
+    With out_root set, exports mirror the folder structure below out_root
+    instead of being written beside the PNGs.
+    """
+    exports = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ORIGINALS_DIR]
+        out_dir = None
+        if out_root:
+            out_dir = os.path.join(out_root, os.path.relpath(dirpath, root))
+        for name in sorted(filenames):
+            if name.lower().endswith('.png'):
+                exports.append(LegacyExport(os.path.join(dirpath, name), out_dir))
+    return exports
+
+
+def export_png(png_path: str, front_path: str, mask_path: str, max_colors: int,
+               alpha_threshold: int) -> Tuple[int, Optional[str]]:
+    """
+    Split one PNG into a legacy GIF + mask pair (process pool worker)
+
+    Returns:
+        (pixels exported, error message or None)
+    """
+    from PyQt6.QtGui import QImage
+    from ..utils.image_utils import save_legacy_sprite
+
+    image = QImage(png_path)
+    if image.isNull():
+        return 0, f"Could not read {png_path}"
+    if image.width() > 0xFFFF or image.height() > 0xFFFF:
+        return 0, f"{png_path} is too large for GIF"
+
+    os.makedirs(os.path.dirname(front_path) or ".", exist_ok=True)
+    try:
+        save_legacy_sprite(image, front_path, mask_path, max_colors, alpha_threshold)
+    except OSError as e:
+        return 0, str(e)
+    return image.width() * image.height(), None
+
+
+def export_tree(root: str, out_root: Optional[str] = None, jobs: Optional[int] = None,
+                force: bool = False, max_colors: int = 256, alpha_threshold: int = 128,
+                progress: Optional[Callable[[int, int, LegacyExport], None]] = None) -> ExportReport:
+    """
+    Export every PNG under root to a legacy GIF + mask pair
+
+    Args:
+        root: Folder to scan recursively
+        out_root: Write into this folder (mirroring the tree) instead of beside the PNGs
+        jobs: Worker processes (default: one per core)
+        force: Export even if the GIFs are already up to date
+        max_colors: Palette size of the front GIF (2..256)
+        alpha_threshold: Pixels with at least this alpha become opaque
+        progress: Called as progress(done, total, export) after every sprite
+    """
+    report = ExportReport()
+    start = time.perf_counter()
+
+    todo = []
+    for export in find_png_sprites(root, out_root):
+        if not force and export.is_up_to_date():
+            report.skipped += 1
+        else:
+            todo.append(export)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(export_png, e.png_path, e.front_path, e.mask_path,
+                                   max_colors, alpha_threshold): e for e in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                export = futures[future]
+                try:
+                    pixels, error = future.result()
+                except Exception as e:
+                    pixels, error = 0, str(e)
+
+                if error:
+                    logger.warning(error)
+                    report.failed.append((export.png_path, error))
+                else:
+                    report.converted += 1
+                    report.pixels += pixels
+                if progress:
+                    progress(done, len(todo), export)
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,225 @@
+"""
+Animated preview export of NPC configs
+
+Renders the whole animation cycle of an NPC with the headless renderer and
+streams it into an animated GIF, an APNG or a PNG strip (frames stacked top
+to bottom). Every frame is encoded as soon as it is rendered, so memory
+stays at one frame no matter how long the cycle is. Batch runs render many
+configs on a process pool for CI and wiki pages.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QImage
+
+from ..rendering.frame_atlas import DIR_LEFT, DIR_RIGHT, frame_geometry
+from ..rendering.npc_renderer import frame_time_ms, render_frame, scene_bounds
+from ..utils.gif_writer import DISPOSE_BACKGROUND, DISPOSE_NONE, GifWriter
+from ..utils.image_utils import argb32_view
+from ..utils.png_writer import ApngWriter, PngStripWriter
+from .frame_report import find_configs, load_config_image
+from .legacy_converter import ConversionReport
+
+try:
+    import numpy as np
+    from ..utils.palette import quantize
+except ImportError:  # NumPy is optional, GIF frames then use Qt's palette conversion
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'gif': ".gif", 'apng': ".png", 'strip': ".png"}
+# Alpha below which a GIF pixel becomes transparent
+GIF_ALPHA_THRESHOLD = 128
+
+
+def animation_cycle(params, directions: Sequence[int] = (DIR_LEFT,)) -> List[Tuple[int, int]]:
+    """(direction, frame) of every frame in one cycle through all given directions"""
+    _, _, frames, _ = frame_geometry(params)
+    return [(direction, frame) for direction in directions for frame in range(frames)]
+
+
+class _GifSink:
+    """Quantizes each frame to its own palette and appends it to a GifWriter"""
+
+    def __init__(self, path: str, width: int, height: int, transparent: bool):
+        self._gif = GifWriter(path, width, height, loop=0)
+        self._transparent = transparent
+
+    def add_frame(self, image: QImage, delay_ms: int) -> None:
+        indices, palette, transparent_index = self._index(image)
+        self._gif.add_frame(indices, palette, delay_ms, transparent_index,
+                            DISPOSE_BACKGROUND if self._transparent else DISPOSE_NONE)
+
+    def _index(self, image: QImage):
+        image = image.convertToFormat(QImage.Format.Format_ARGB32)
+        if np is None:
+            indexed = image.convertToFormat(QImage.Format.Format_Indexed8, Qt.ImageConversionFlag.ThresholdDither)
+            table = indexed.colorTable()
+            transparent = next((i for i, c in enumerate(table) if (c >> 24) < GIF_ALPHA_THRESHOLD), None)
+            ptr = indexed.constBits()
+            ptr.setsize(indexed.sizeInBytes())
+            raw, stride = bytes(ptr), indexed.bytesPerLine()
+            indices = b"".join(raw[y * stride:y * stride + indexed.width()] for y in range(indexed.height()))
+            return indices, [c & 0x00FFFFFF for c in table] or [0], transparent
+
+        argb, image = argb32_view(image)
+        if not self._transparent:
+            indices, palette = quantize(argb)
+            return indices.tobytes(), palette, None
+        # Slot 0 is transparent, opaque pixels share the other 255
+        opaque = (argb >> 24) >= GIF_ALPHA_THRESHOLD
+        indices, palette = quantize(argb, 255, mask=opaque)
+        indices = np.where(opaque, indices + 1, 0).astype(np.uint8)
+        return indices.tobytes(), [0] + palette, 0
+
+    def close(self) -> None:
+        self._gif.close()
+
+
+def export_animation(sheet, params, path: str, fmt: str = 'gif', zoom: int = 1,
+                     directions: Sequence[int] = (DIR_LEFT,), background: Optional[QColor] = None,
+                     boxes: bool = False, light: bool = False) -> Tuple[int, int]:
+    """
+    Render one animation cycle straight into a file
+
+    Args:
+        sheet: Sprite sheet (QImage, or QPixmap with a GUI application)
+        params: NPC standard parameters
+        path: Output file
+        fmt: 'gif', 'apng' or 'strip'
+        zoom: Integer scale factor
+        directions: Directions played one after another
+        background: Fill colour, transparent when None
+        boxes, light: Draw the hitbox/graphics boxes and the light
+
+    Returns:
+        (frames written, pixels rendered)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown preview format '{fmt}', expected one of {', '.join(FORMATS)}")
+    cycle = animation_cycle(params, directions)
+    # One canvas for the whole cycle, so the NPC does not jump between frames
+    bounds = scene_bounds(params, directions, boxes, light)
+    width, height = bounds.width() * zoom, bounds.height() * zoom
+
+    if fmt == 'gif':
+        if width > 0xFFFF or height > 0xFFFF:
+            raise ValueError("Preview is too large for GIF")
+        sink = _GifSink(path, width, height, background is None)
+    elif fmt == 'apng':
+        sink = ApngWriter(path, width, height, len(cycle))
+    else:
+        sink = PngStripWriter(path, width, height, len(cycle))
+
+    try:
+        for tick, (direction, frame) in enumerate(cycle):
+            image = render_frame(sheet, params, frame, direction, zoom, bounds, background, boxes, light, tick)
+            # Differences of the cumulative clock times, so the writers never drift from the 65 Hz clock
+            sink.add_frame(image, frame_time_ms(params, tick + 1) - frame_time_ms(params, tick))
+    finally:
+        sink.close()
+    return len(cycle), width * height * len(cycle)
+
+
+class RenderReport(ConversionReport):
+    """Totals and throughput of a preview export run"""
+
+    def summary(self) -> str:
+        return (f"Rendered {self.converted}, failed {len(self.failed)} in {self.seconds:.2f}s "
+                f"({self.files_per_second:.1f} previews/s, {self.megapixels_per_second:.1f} MP/s)")
+
+
+class PreviewExport:
+    """An NPC config and the preview file it renders to"""
+
+    def __init__(self, config_path: str, fmt: str, out_dir: Optional[str] = None):
+        self.config_path = config_path
+        stem = os.path.splitext(os.path.basename(config_path))[0]
+        folder = out_dir or os.path.dirname(config_path)
+        suffix = "-strip" if fmt == 'strip' else "-preview"
+        self.out_path = os.path.join(folder, stem + suffix + FORMATS[fmt])
+
+
+def find_preview_exports(root: str, fmt: str, out_root: Optional[str] = None) -> List[PreviewExport]:
+    """Every config with a sprite below root; with out_root the folder tree is mirrored there"""
+    exports = []
+    for config in find_configs(root):
+        out_dir = None
+        if out_root:
+            out_dir = os.path.join(out_root, os.path.relpath(os.path.dirname(config), root))
+        exports.append(PreviewExport(config, fmt, out_dir))
+    return exports
+
+
+def export_config(config_path: str, out_path: str, fmt: str, zoom: int, directions: Sequence[int],
+                  background: Optional[str], boxes: bool, light: bool) -> Tuple[int, Optional[str]]:
+    """
+    Render the preview of one config (process pool worker)
+
+    Returns:
+        (pixels rendered, error message or None)
+    """
+    data, _, image, error = load_config_image(config_path)
+    if image is None:
+        return 0, f"{config_path}: {error}"
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    try:
+        _, pixels = export_animation(image, data.standard_params, tmp_path, fmt, zoom, directions,
+                                     QColor(background) if background else None, boxes, light)
+    except (OSError, ValueError) as e:
+        return 0, f"{config_path}: {e}"
+    os.replace(tmp_path, out_path)
+    return pixels, None
+
+
+def export_tree(root: str, fmt: str = 'gif', out_root: Optional[str] = None, zoom: int = 1,
+                directions: Sequence[int] = (DIR_LEFT, DIR_RIGHT), background: Optional[str] = None,
+                boxes: bool = False, light: bool = False, jobs: Optional[int] = None,
+                progress: Optional[Callable[[int, int, PreviewExport], None]] = None) -> RenderReport:
+    """
+    Export an animated preview of every config under root
+
+    Args:
+        root: Folder to scan recursively
+        fmt: 'gif', 'apng' or 'strip'
+        out_root: Write into this folder (mirroring the tree) instead of beside the configs
+        zoom: Integer scale factor
+        directions: Directions played one after another
+        background: Fill colour name (#rrggbb), transparent when None
+        boxes, light: Draw the hitbox/graphics boxes and the light
+        jobs: Worker processes (default: one per core)
+        progress: Called as progress(done, total, export) after every config
+    """
+    report = RenderReport()
+    start = time.perf_counter()
+    todo = find_preview_exports(root, fmt, out_root)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(export_config, e.config_path, e.out_path, fmt, zoom, tuple(directions),
+                                   background, boxes, light): e for e in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                export = futures[future]
+                try:
+                    pixels, error = future.result()
+                except Exception as e:
+                    pixels, error = 0, str(e)
+
+                if error:
+                    logger.warning(error)
+                    report.failed.append((export.config_path, error))
+                else:
+                    report.converted += 1
+                    report.pixels += pixels
+                if progress:
+                    progress(done, len(todo), export)
+
+    report.seconds = time.perf_counter() - start
+    return report
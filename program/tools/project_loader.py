@@ -0,0 +1,184 @@
+"""
+Parallel loading of every config in an episode folder
+
+Episodes hold thousands of npc-*.txt files plus block, background and
+effect configs. find_project_configs discovers them with a single scandir
+walk, and load_project parses them on a process pool in chunks of files, so
+pickling and scheduling overhead is paid per chunk rather than per file and
+throughput grows with the number of cores. The result is a Project: every
+loaded config (as compact NPCData records) plus the files that failed.
+"""
+
+import os
+import re
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..npc_data import NPCData
+from .legacy_converter import ORIGINALS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Config kinds SMBX reads from an episode, by file name prefix
+CONFIG_KINDS = ('npc', 'block', 'background', 'effect')
+_CONFIG_NAME = re.compile(r"^(npc|block|background|effect)-(\d+)\.txt$", re.IGNORECASE)
+# Files parsed per pool task
+CHUNK_SIZE = 64
+
+
+class ProjectConfig:
+    """One loaded config of a project"""
+
+    __slots__ = ('path', 'kind', 'id', 'data')
+
+    def __init__(self, path: str, kind: str, id: int, data: NPCData):
+        self.path = path
+        self.kind = kind
+        self.id = id
+        self.data = data
+
+
+class Project:
+    """Loaded configs of an episode folder, with per-file errors"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.configs: List[ProjectConfig] = []
+        self.failed: List[Tuple[str, str]] = []
+        self.seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def __iter__(self) -> Iterator[ProjectConfig]:
+        return iter(self.configs)
+
+    def by_kind(self, kind: str) -> List[ProjectConfig]:
+        return [c for c in self.configs if c.kind == kind]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of loaded configs per kind"""
+        counts = dict.fromkeys(CONFIG_KINDS, 0)
+        for config in self.configs:
+            counts[config.kind] += 1
+        return counts
+
+    @property
+    def files_per_second(self) -> float:
+        total = len(self.configs) + len(self.failed)
+        return total / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        kinds = ", ".join(f"{n} {kind}" for kind, n in self.counts().items() if n)
+        return (f"Loaded {len(self.configs)} configs ({kinds or 'none'}), failed {len(self.failed)} "
+                f"in {self.seconds:.2f}s ({self.files_per_second:.0f} files/s)")
+
+
+def config_kind(name: str) -> Optional[Tuple[str, int]]:
+    """(kind, id) of a config file name such as npc-12.txt, None for other files"""
+    match = _CONFIG_NAME.match(name)
+    if not match:
+        return None
+    return match.group(1).lower(), int(match.group(2))
+
+
+def find_project_configs(root: str) -> List[Tuple[str, str, int]]:
+    """
+    (path, kind, id) of every config below root, sorted by path
+
+    A single scandir pass; hidden folders and moved legacy originals are skipped.
+    """
+    found = []
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.') and entry.name != ORIGINALS_DIR:
+                            stack.append(entry.path)
+                        continue
+                    kind = config_kind(entry.name)
+                    if kind and entry.is_file():
+                        found.append((entry.path, kind[0], kind[1]))
+        except OSError as e:
+            logger.warning("Cannot scan %s: %s", folder, e)
+    found.sort()
+    return found
+
+
+def load_chunk(paths: List[str]) -> List[Tuple[str, Optional[NPCData], Optional[str]]]:
+    """
+    Parse a chunk of configs (process pool worker)
+
+    Returns:
+        (path, data or None, error message or None) per file
+    """
+    results = []
+    for path in paths:
+        data = NPCData()
+        try:
+            ok = data.load(path)
+        except Exception as e:
+            ok, error = False, str(e)
+        else:
+            error = None if ok else "Could not read config"
+        results.append((path, data if ok else None, error))
+    return results
+
+
+def load_project(root: str, jobs: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                 progress: Optional[Callable[[int, int], None]] = None, mp_context=None) -> Project:
+    """
+    Load every config below root
+
+    Args:
+        root: Episode folder, scanned recursively
+        jobs: Worker processes (default: one per core); 1 loads in this process
+        chunk_size: Files per pool task
+        progress: Called as progress(done, total) after every chunk
+        mp_context: multiprocessing context of the pool (default: the platform's)
+    """
+    project = Project(root)
+    start = time.perf_counter()
+    found = find_project_configs(root)
+    kinds = {path: (kind, id) for path, kind, id in found}
+    paths = [path for path, _, _ in found]
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), max(1, chunk_size))]
+
+    def collect(results):
+        for path, data, error in results:
+            if error:
+                logger.warning("%s: %s", path, error)
+                project.failed.append((path, error))
+            else:
+                project.configs.append(ProjectConfig(path, *kinds[path], data))
+
+    done = 0
+    if jobs == 1 or len(chunks) <= 1:
+        # Not worth starting a pool
+        for chunk in chunks:
+            collect(load_chunk(chunk))
+            done += len(chunk)
+            if progress:
+                progress(done, len(paths))
+    elif chunks:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as pool:
+            futures = {pool.submit(load_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    collect(future.result())
+                except Exception as e:
+                    collect((path, None, str(e)) for path in chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, len(paths))
+
+    project.configs.sort(key=lambda c: c.path)
+    project.failed.sort()
+    project.seconds = time.perf_counter() - start
+    return project
@@ -0,0 +1,318 @@
+"""
+Columnar view of every config in a project, with CSV export and import
+
+A ProjectTable holds one NumPy column per standard parameter (in SCHEMA
+order) plus a boolean mask per column that is True where a config sets
+the parameter, so comparing speed or health across hundreds of NPCs is a
+vectorized expression instead of a loop over NPCData objects. Custom
+parameters are not typed and stay per row.
+
+CSV layout: the first column is the config path relative to the project
+root, then every standard parameter, then one column per custom
+parameter found in the project. An empty cell is an unset parameter.
+Values are written in config syntax (true/false, shortest round-trip
+floats), so a table that is exported and read back compares equal.
+
+Re-import compares the CSV with the loaded project column by column and
+only rewrites configs whose rows differ; within a changed config only the
+differing cells are applied, so comments and untouched values survive.
+Columns left out of the CSV are not compared at all, so deleting a column
+in the spreadsheet keeps those parameters as they are.
+"""
+
+import csv
+import os
+import time
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from ..npc_data import NPCData
+from ..npc_schema import SCHEMA
+from .project_loader import Project
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the table is unavailable without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PATH_COLUMN = "path"
+
+_DTYPES = {bool: 'bool', int: 'int64', "enum": 'int64', float: 'float64'}
+
+
+def table_available() -> bool:
+    return np is not None
+
+
+def _plain(value: Any) -> Any:
+    """Python value of a column cell (NumPy scalars become bool/int/float)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _empty_column(key: str, rows: int):
+    dtype = _DTYPES.get(SCHEMA[key].type, 'object')
+    if dtype == 'object':
+        return np.full(rows, None, dtype=object)
+    return np.zeros(rows, dtype=dtype)
+
+
+class TableImportReport:
+    """Outcome of writing an edited table back to its configs"""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.written: List[str] = []
+        self.unchanged = 0
+        self.failed: List[Tuple[str, str]] = []
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        return (f"{'Would write' if self.dry_run else 'Wrote'} {len(self.written)}, unchanged {self.unchanged}, "
+                f"failed {len(self.failed)} in {self.seconds:.2f}s")
+
+
+class ProjectTable:
+    """
+    Standard parameters of many configs as NumPy columns
+
+    Attributes:
+        root: Folder the row paths are relative to
+        paths: Relative config path of every row
+        columns: Key -> value array (bool, int64, float64 or object)
+        masks: Key -> bool array, True where the row sets the key
+        custom: Custom parameters of every row
+        present: Standard keys and custom names the table has columns for;
+            None when it covers every parameter (a table built from a project)
+    """
+
+    def __init__(self, root: str, paths: List[str], columns: Dict[str, Any], masks: Dict[str, Any],
+                 custom: List[Dict[str, str]], present: Optional[FrozenSet[str]] = None):
+        if np is None:
+            raise RuntimeError("The project table needs NumPy")
+        self.root = root
+        self.paths = paths
+        self.columns = columns
+        self.masks = masks
+        self.custom = custom
+        self.present = present
+
+    def has_column(self, name: str) -> bool:
+        return self.present is None or name in self.present
+
+    @classmethod
+    def empty(cls, root: str, paths: List[str]) -> "ProjectTable":
+        if np is None:
+            raise RuntimeError("The project table needs NumPy")
+        rows = len(paths)
+        return cls(root, list(paths),
+                   {key: _empty_column(key, rows) for key in SCHEMA.keys},
+                   {key: np.zeros(rows, dtype=bool) for key in SCHEMA.keys},
+                   [{} for _ in range(rows)])
+
+    @classmethod
+    def from_project(cls, project: Project) -> "ProjectTable":
+        """Table of every loaded config of a project"""
+        table = cls.empty(project.root, [os.path.relpath(c.path, project.root) for c in project])
+        columns, masks = table.columns, table.masks
+        for row, config in enumerate(project):
+            for key, value in config.data.record.items():
+                columns[key][row] = value
+                masks[key][row] = True
+            table.custom[row] = dict(config.data.custom_params)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def values(self, key: str):
+        """Masked array of one parameter; unset rows are masked out"""
+        return np.ma.masked_array(self.columns[key], mask=~self.masks[key])
+
+    def custom_keys(self) -> List[str]:
+        """Custom parameter names of all rows, in first-seen order"""
+        return list(dict.fromkeys(key for params in self.custom for key in params))
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Set standard and custom parameters of one row"""
+        params = {key: _plain(self.columns[key][index]) for key in SCHEMA.keys if self.masks[key][index]}
+        params.update(self.custom[index])
+        return params
+
+    def write_csv(self, path: str) -> None:
+        """Write the table; see the module docstring for the layout"""
+        custom_keys = self.custom_keys()
+        cells = [self.paths]
+        for key in SCHEMA.keys:
+            fmt = SCHEMA[key].format
+            column, mask = self.columns[key].tolist(), self.masks[key].tolist()
+            cells.append([fmt(v) if m else "" for v, m in zip(column, mask)])
+        for key in custom_keys:
+            cells.append([params.get(key, "") for params in self.custom])
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([PATH_COLUMN, *SCHEMA.keys, *custom_keys])
+            writer.writerows(zip(*cells))
+
+    @classmethod
+    def read_csv(cls, path: str, root: str) -> Tuple["ProjectTable", List[Tuple[str, str]]]:
+        """
+        Read a table written by write_csv (and possibly edited in a spreadsheet)
+
+        Header names are matched case-insensitively against the schema; any
+        other column is a custom parameter. Columns may be missing (see
+        present) or reordered, rows may be dropped.
+
+        Returns:
+            (table, (path, error) of every row with a cell that does not parse);
+            bad rows are left out of the table
+
+        Raises:
+            ValueError: If the file has no path column
+        """
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+        if not rows or not rows[0] or rows[0][0].strip().lower() != PATH_COLUMN:
+            raise ValueError(f"{path}: the first column must be '{PATH_COLUMN}'")
+        header = [name.strip() for name in rows[0]]
+        body = [r for r in rows[1:] if any(cell.strip() for cell in r)]
+        width = len(header)
+        # Spreadsheets drop trailing empty cells
+        body = [r + [""] * (width - len(r)) if len(r) < width else r[:width] for r in body]
+
+        table = cls.empty(root, [os.path.normpath(r[0].strip()) for r in body])
+        cells = list(zip(*body)) if body else [()] * width
+        bad: Dict[int, str] = {}
+        present = set()
+        for position in range(1, width):
+            name = header[position]
+            if not name:
+                continue
+            key = SCHEMA.key_map.get(name.lower())
+            present.add(key or name)
+            column = cells[position]
+            if key is None:
+                for row, cell in enumerate(column):
+                    if cell != "":
+                        table.custom[row][name] = cell
+                continue
+            parse, values, mask = SCHEMA[key].parse, table.columns[key], table.masks[key]
+            for row, cell in enumerate(column):
+                cell = cell.strip()
+                if not cell:
+                    continue
+                try:
+                    values[row] = parse(cell)
+                except (ValueError, TypeError, OverflowError):
+                    bad.setdefault(row, f"Invalid value for {key}: '{cell}'")
+                    continue
+                mask[row] = True
+
+        table.present = frozenset(present)
+        errors = [(table.paths[row], message) for row, message in sorted(bad.items())]
+        if bad:
+            table = table.take([row for row in range(len(table)) if row not in bad])
+        return table, errors
+
+    def take(self, rows: List[int]) -> "ProjectTable":
+        """Table of the given rows"""
+        index = np.asarray(rows, dtype=np.intp)
+        return ProjectTable(self.root, [self.paths[i] for i in rows],
+                            {k: v[index] for k, v in self.columns.items()},
+                            {k: m[index] for k, m in self.masks.items()},
+                            [self.custom[i] for i in rows], self.present)
+
+    def differing_cells(self, other: "ProjectTable", rows, other_rows) -> Dict[str, Any]:
+        """
+        Key -> bool array, True where self[rows] and other[other_rows] disagree
+
+        Unset cells and empty text compare equal, since the CSV cannot tell them
+        apart. Keys other has no column for are left out.
+        """
+        diff = {}
+        for key in SCHEMA.keys:
+            if not other.has_column(key):
+                continue
+            a, b = self.columns[key][rows], other.columns[key][other_rows]
+            ma, mb = self.masks[key][rows], other.masks[key][other_rows]
+            if a.dtype == object:
+                ma = ma & (a != "")
+                mb = mb & (b != "")
+                same = a == b
+            elif a.dtype.kind == 'f':
+                same = (a == b) | (np.isnan(a) & np.isnan(b))
+            else:
+                same = a == b
+            diff[key] = (ma != mb) | (ma & mb & ~same)
+        return diff
+
+
+def _custom_changes(old: Dict[str, str], new: Dict[str, str],
+                    present: Optional[FrozenSet[str]]) -> Dict[str, Optional[str]]:
+    """Custom parameters to set (None: remove), treating empty values as unset"""
+    changes = {}
+    keys = old.keys() | new.keys()
+    if present is not None:
+        # A custom parameter without a column in the CSV stays as it is
+        keys &= present
+    for key in keys:
+        before, after = old.get(key, ""), new.get(key, "")
+        if before != after:
+            changes[key] = after if after != "" else None
+    return changes
+
+
+def apply_table(project: Project, table: ProjectTable, dry_run: bool = False) -> TableImportReport:
+    """
+    Write the rows of table that differ from project back to their configs
+
+    Rows are matched by relative path; rows without a loaded config fail.
+    The NPCData of changed configs is updated in place; a dry run only lists
+    them in written and leaves the project untouched.
+    """
+    report = TableImportReport(dry_run)
+    start = time.perf_counter()
+    current = ProjectTable.from_project(project)
+    by_path = {os.path.normcase(p): i for i, p in enumerate(current.paths)}
+
+    rows, other_rows = [], []
+    for row, path in enumerate(table.paths):
+        index = by_path.get(os.path.normcase(path))
+        if index is None:
+            report.failed.append((path, "No such config in the project"))
+            continue
+        rows.append(index)
+        other_rows.append(row)
+    rows_array = np.asarray(rows, dtype=np.intp)
+    other_array = np.asarray(other_rows, dtype=np.intp)
+    diff = current.differing_cells(table, rows_array, other_array)
+    changed = np.zeros(len(rows), dtype=bool)
+    for cells in diff.values():
+        changed |= cells
+
+    configs = project.configs
+    for n, (index, row) in enumerate(zip(rows, other_rows)):
+        custom = _custom_changes(current.custom[index], table.custom[row], table.present)
+        if not changed[n] and not custom:
+            report.unchanged += 1
+            continue
+        path = configs[index].path
+        if dry_run:
+            report.written.append(path)
+            continue
+        data: NPCData = configs[index].data
+        for key, cells in diff.items():
+            if cells[n]:
+                data.set_standard(key, _plain(table.columns[key][row]) if table.masks[key][row] else None)
+        for key, value in custom.items():
+            if value is None:
+                data.custom_params.pop(key, None)
+            else:
+                data.set_custom(key, value)
+        if data.save():
+            report.written.append(path)
+        else:
+            report.failed.append((path, "Could not write config"))
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,248 @@
+"""
+Project-wide duplicate sprite index
+
+Hashes every sprite sheet under a folder (PNGs as they are, GIF/BMP fronts
+composited with their masks) in a process pool and groups identical and
+near-identical sheets, together with the configs that use them. Hashes are
+stored in an index file per scanned root, keyed by the sources' mtimes and
+sizes, so re-scans only hash sprites that changed. Index files live in the
+editor's cache folder (see app_cache_dir), never in the user's episode.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.image_utils import find_sprite_files
+from ..utils.sprite_cache import app_cache_dir
+from .legacy_converter import ORIGINALS_DIR
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = "sprite-index"
+INDEX_VERSION = 1
+SPRITE_EXTENSIONS = ('.png', '.gif', '.bmp')
+# Hamming distance (of 64 bits) up to which two equally sized sheets count as near-identical
+NEAR_IDENTICAL_DISTANCE = 4
+
+
+class SpriteEntry:
+    """One sprite sheet and its hashes"""
+
+    def __init__(self, image_path: str, mask_path: str = ""):
+        self.image_path = image_path
+        self.mask_path = mask_path
+        self.width = 0
+        self.height = 0
+        self.exact = ""
+        self.perceptual = 0
+
+    @property
+    def config_path(self) -> str:
+        """The config using this sheet (npc-6.png -> npc-6.txt), empty if there is none"""
+        path = os.path.splitext(self.image_path)[0] + ".txt"
+        return path if os.path.exists(path) else ""
+
+    @property
+    def file_size(self) -> int:
+        return sum(os.path.getsize(p) for p in (self.image_path, self.mask_path) if p)
+
+    def stamp(self) -> List[int]:
+        """mtime/size of the sources, changes whenever the sheet may have changed"""
+        stamp = []
+        for path in (self.image_path, self.mask_path):
+            if path:
+                st = os.stat(path)
+                stamp += [st.st_mtime_ns, st.st_size]
+        return stamp
+
+
+class SpriteIndex:
+    """Hashed sheets of a folder tree plus scan statistics"""
+
+    def __init__(self, entries: List[SpriteEntry]):
+        self.entries = entries
+        self.hashed = 0
+        self.reused = 0
+        self.failed: List[Tuple[str, str]] = []
+        self.seconds = 0.0
+
+    def duplicate_groups(self) -> List[List[SpriteEntry]]:
+        """Groups of sheets with identical pixels, largest files first"""
+        groups: Dict[str, List[SpriteEntry]] = {}
+        for entry in self.entries:
+            groups.setdefault(entry.exact, []).append(entry)
+        found = [sorted(group, key=lambda e: e.image_path) for group in groups.values() if len(group) > 1]
+        return sorted(found, key=lambda g: -sum(e.file_size for e in g))
+
+    def near_duplicates(self, max_distance: int = NEAR_IDENTICAL_DISTANCE) -> List[Tuple[SpriteEntry, SpriteEntry, int]]:
+        """(entry, entry, distance) for equally sized sheets that look alike but differ in pixels"""
+        from ..analysis.frame_hash import hamming_distances, np
+
+        by_size: Dict[Tuple[int, int], List[SpriteEntry]] = {}
+        for entry in self.entries:
+            by_size.setdefault((entry.width, entry.height), []).append(entry)
+
+        pairs = []
+        for group in by_size.values():
+            if len(group) < 2:
+                continue
+            hashes = np.array([e.perceptual for e in group], dtype=np.uint64)
+            dist = hamming_distances(hashes, hashes)
+            for a, b in zip(*np.nonzero(np.triu(dist <= max_distance, k=1))):
+                if group[a].exact != group[b].exact:
+                    pairs.append((group[a], group[b], int(dist[a, b])))
+        return sorted(pairs, key=lambda p: p[2])
+
+    def wasted_bytes(self) -> int:
+        """File size of every identical copy beyond the first of its group"""
+        return sum(sum(e.file_size for e in group[1:]) for group in self.duplicate_groups())
+
+    def summary(self) -> str:
+        return (f"Indexed {len(self.entries)} sheets: hashed {self.hashed}, reused {self.reused}, "
+                f"failed {len(self.failed)} in {self.seconds:.2f}s")
+
+
+def find_sprites(root: str) -> List[SpriteEntry]:
+    """
+    Every sprite sheet under root
+
+    Follows find_sprite_files: a PNG wins over GIF/BMP files of the same
+    name, and masks (npc-6m.gif next to npc-6.gif) are not sheets of their own.
+    """
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ORIGINALS_DIR]
+        lower_names = {name.lower() for name in filenames}
+        stems = set()
+        for name in filenames:
+            stem, ext = os.path.splitext(name)
+            ext = ext.lower()
+            if ext not in SPRITE_EXTENSIONS:
+                continue
+            if ext != '.png' and stem.lower().endswith('m') and (stem[:-1] + ext).lower() in lower_names:
+                continue
+            stems.add(stem)
+        for stem in sorted(stems):
+            image_path, mask_path = find_sprite_files(os.path.join(dirpath, stem + ".txt"))
+            if image_path:
+                entries.append(SpriteEntry(image_path, mask_path))
+    return entries
+
+
+def hash_sprite(image_path: str, mask_path: str) -> Tuple[int, int, str, int, Optional[str]]:
+    """
+    Decode one sheet and hash it (process pool worker)
+
+    Returns:
+        (width, height, exact, perceptual, error message or None)
+    """
+    from ..analysis.frame_hash import image_hashes
+    from ..utils.image_utils import load_sprite_image
+
+    image = load_sprite_image(image_path, mask_path)
+    if image.isNull():
+        return 0, 0, "", 0, f"Could not read {image_path}"
+    exact, perceptual = image_hashes(image)
+    return image.width(), image.height(), exact, perceptual, None
+
+
+def index_path_for(root: str) -> str:
+    """Index file of a scanned folder, inside the editor's cache folder"""
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(root)).encode('utf-8')).hexdigest()
+    return os.path.join(app_cache_dir(), INDEX_DIR, digest + ".json")
+
+
+def _load_index(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == INDEX_VERSION:
+            return data.get('sprites', {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save_index(path: str, root: str, entries: List[SpriteEntry]) -> None:
+    sprites = {}
+    for entry in entries:
+        try:
+            stamp = entry.stamp()
+        except OSError:
+            continue
+        sprites[os.path.relpath(entry.image_path, root)] = {
+            'mask': os.path.relpath(entry.mask_path, root) if entry.mask_path else "",
+            'stamp': stamp, 'width': entry.width, 'height': entry.height,
+            'exact': entry.exact, 'perceptual': f"{entry.perceptual:016x}"}
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'sprites': sprites}, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write sprite index {path}: {e}")
+
+
+def build_index(root: str, jobs: Optional[int] = None, rescan: bool = False,
+                progress: Optional[Callable[[int, int, SpriteEntry], None]] = None,
+                index_path: Optional[str] = None) -> SpriteIndex:
+    """
+    Hash every sheet under root, reusing stored hashes of unchanged files
+
+    Args:
+        root: Folder to scan recursively
+        jobs: Worker processes (default: one per core)
+        rescan: Ignore the stored index and hash everything again
+        progress: Called as progress(done, total, entry) after every hashed sheet
+        index_path: Where to keep the hashes (default: index_path_for(root))
+    """
+    start = time.perf_counter()
+    index_path = index_path or index_path_for(root)
+    stored = {} if rescan else _load_index(index_path)
+
+    entries = find_sprites(root)
+    todo = []
+    for entry in entries:
+        cached = stored.get(os.path.relpath(entry.image_path, root))
+        mask = os.path.relpath(entry.mask_path, root) if entry.mask_path else ""
+        try:
+            current = entry.stamp()
+        except OSError:
+            current = None
+        if cached and cached.get('mask') == mask and cached.get('stamp') == current:
+            entry.width, entry.height = cached['width'], cached['height']
+            entry.exact, entry.perceptual = cached['exact'], int(cached['perceptual'], 16)
+        else:
+            todo.append(entry)
+
+    index = SpriteIndex([])
+    index.reused = len(entries) - len(todo)
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(hash_sprite, e.image_path, e.mask_path): e for e in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                entry = futures[future]
+                try:
+                    width, height, exact, perceptual, error = future.result()
+                except Exception as e:
+                    error = str(e)
+                if error:
+                    logger.warning(error)
+                    index.failed.append((entry.image_path, error))
+                else:
+                    entry.width, entry.height = width, height
+                    entry.exact, entry.perceptual = exact, perceptual
+                    index.hashed += 1
+                if progress:
+                    progress(done, len(todo), entry)
+
+    index.entries = [e for e in entries if e.exact]
+    _save_index(index_path, root, index.entries)
+    index.seconds = time.perf_counter() - start
+    return index
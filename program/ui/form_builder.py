@@ -6,10 +6,11 @@ from typing import Dict, Any, Optional, List
 from .widgets import (TriStateBoolWidget, ValidatedSpinBox, 
                               ValidatedDoubleSpinBox, CollapsibleBox, ClickableLabel,
                               ColorPickerWidget)
+from ..npc_schema import CompiledSchema, ParamSpec
 
 class FormBuilder:
     """
-    Constructs the property editor UI based on NPC_DEFS schema.
+    Constructs the property editor UI from the compiled parameter schema.
     Returns:
         tuple: (layout_widget, ui_sections_dict, category_keys_dict, all_widgets_dict, checkbox_map)
     """
@@ -18,56 +19,49 @@ class FormBuilder:
         self.all_widgets = {}
         self.param_checkboxes = {}
 
-    def build_standard_ui(self, npc_defs: Dict[str, Any], layout: QVBoxLayout):
+    def build_standard_ui(self, schema: CompiledSchema, layout: QVBoxLayout):
         ui_sections = {}
         category_keys = {}
         
-        # 1. Sort Categories
-        categories = sorted(list(set(d['category'] for d in npc_defs.values())))
-        priority = ["Animation", "Collision", "Interaction", "Behaviour"]
-        categories.sort(key=lambda x: priority.index(x) if x in priority else 99)
-        
-        # 2. Create Sections
-        for cat in categories:
+        # 1. Create Sections, in the same order parameters are saved
+        for cat in schema.categories:
             section = CollapsibleBox(cat)
             layout.addWidget(section)
             ui_sections[cat] = section
-            category_keys[cat] = []
+            category_keys[cat] = list(schema.category_keys[cat])
             if cat == "Animation": section.expand()
             
-        # 3. Populate Sections - all parameters are added individually now
-        for key, definition in npc_defs.items():
-            cat = definition['category']
-            section = ui_sections[cat]
-            category_keys[cat].append(key)
-            self._add_param_widget(section, key, definition)
+            # 2. Populate Sections - all parameters are added individually now
+            for key in schema.category_keys[cat]:
+                self._add_param_widget(section, schema[key])
                 
         return ui_sections, category_keys, self.all_widgets, self.param_checkboxes
 
-    def _add_param_widget(self, section, key, definition):
-        dtype = definition.get('type')
+    def _add_param_widget(self, section, spec: ParamSpec):
+        key = spec.key
+        dtype = spec.type
         widget = None
         
         if dtype == bool:
             widget = TriStateBoolWidget()
         elif dtype == int:
             widget = ValidatedSpinBox()
-            widget.setRange(definition.get('min', -9999), definition.get('max', 9999))
+            widget.setRange(*spec.widget_range())
         elif dtype == float:
             widget = ValidatedDoubleSpinBox()
-            widget.setRange(definition.get('min', -9999.0), definition.get('max', 9999.0))
-            widget.setSingleStep(definition.get('step', 0.1))
+            widget.setRange(*spec.widget_range())
+            widget.setSingleStep(spec.step if spec.step is not None else 0.1)
         elif dtype == str:
             widget = QLineEdit()
         elif dtype == "enum":
             widget = QComboBox()
-            for k, v in definition.get('choices', {}).items(): widget.addItem(v, k)
+            for k, v in spec.choices.items(): widget.addItem(v, k)
         elif dtype == "color":
             widget = ColorPickerWidget()
         
         if widget:
             widget.setProperty("param_key", key)
-            widget.setToolTip(definition.get('tips', key))
+            widget.setToolTip(spec.tips or key)
             
             container = QWidget()
             container_layout = QHBoxLayout(container)
@@ -82,8 +76,7 @@ class FormBuilder:
             container_layout.addWidget(widget, 1)
             
             # Create clickable label
-            label_text = definition.get('label', key)
-            label = ClickableLabel(label_text, key)
+            label = ClickableLabel(spec.label, key)
             if self.parent:
                 label.clicked.connect(lambda k=key: self.parent.update_description(k))
             
@@ -0,0 +1,117 @@
+"""
+Frame analysis panel: lists empty, duplicated and near-duplicate frames
+
+Hashing reads every frame (every band of a LazySheet), so it runs on a
+QThreadPool worker and the result comes back through a queued signal.
+"""
+
+import logging
+from typing import Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+from ..analysis.frame_hash import FrameHashes, cached_frame_hashes, frame_hashes
+
+logger = logging.getLogger(__name__)
+
+
+class _HashSignals(QObject):
+    finished = pyqtSignal(object)  # The finished FrameHashTask
+
+
+class FrameHashTask(QRunnable):
+    """Worker that hashes the frames of one sheet (a QImage or LazySheet) off the GUI thread"""
+
+    def __init__(self, request_id: int, sheet, frame_width: int, frame_height: int, cache_key: int):
+        super().__init__()
+        self.request_id = request_id
+        self.sheet = sheet
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.cache_key = cache_key
+        self.hashes: Optional[FrameHashes] = None
+        self.signals = _HashSignals()
+
+    def run(self):
+        try:
+            self.hashes = frame_hashes(self.sheet, self.frame_width, self.frame_height, self.cache_key)
+        except Exception as e:
+            logger.error("Failed to hash sprite frames", exc_info=e)
+        self.signals.finished.emit(self)
+
+
+class FrameAnalysisPanel(QWidget):
+    """Shows the findings of a FrameHashes index for the current sheet"""
+
+    def __init__(self, parent: Optional[QWidget] = None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._request_id = 0
+        # PyQt must keep the Python side of queued tasks alive until they finish
+        self._tasks: Set[FrameHashTask] = set()
+        self.summary = QLabel("No sprite loaded")
+        self.summary.setWordWrap(True)
+        self.findings = QListWidget()
+        self.findings.setMinimumHeight(80)
+        self.findings.setMaximumHeight(160)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.addWidget(self.summary)
+        lay.addWidget(self.findings)
+
+    def request(self, sheet, frame_width: int, frame_height: int) -> None:
+        """
+        Show the findings for a sheet (QPixmap or LazySheet)
+
+        Cached hashes are shown straight away; otherwise the frames are hashed
+        on the pool and only the latest request's result is shown.
+        """
+        self._request_id += 1
+        if sheet is None:
+            self.show_hashes(None)
+            return
+        hashes = cached_frame_hashes(sheet, frame_width, frame_height)
+        if hashes is not None:
+            self.show_hashes(hashes)
+            return
+        self.findings.clear()
+        self.summary.setText("Analysing frames...")
+        # QPixmap is GUI-thread only; the worker gets a QImage cached under the pixmap's key
+        image = sheet.toImage() if isinstance(sheet, QPixmap) else sheet
+        task = FrameHashTask(self._request_id, image, frame_width, frame_height, sheet.cacheKey())
+        task.signals.finished.connect(self._on_hashed)
+        self._tasks.add(task)
+        self.pool.start(task)
+
+    def _on_hashed(self, task: FrameHashTask) -> None:
+        self._tasks.discard(task)
+        if task.request_id == self._request_id:
+            self.show_hashes(task.hashes, "Frame analysis needs NumPy")
+
+    def show_hashes(self, hashes: Optional[FrameHashes], message: str = "") -> None:
+        """Fill the list from a hash index (or show message when there is none)"""
+        self.findings.clear()
+        if hashes is None:
+            self.summary.setText(message or "No sprite loaded")
+            return
+
+        def add(text, rows):
+            item = QListWidgetItem(text)
+            item.setToolTip("Sheet rows (0-based): " + ", ".join(str(r) for r in rows))
+            self.findings.addItem(item)
+
+        for row in hashes.empty_frames:
+            add(f"Frame {row} is empty", [row])
+        for rows in hashes.duplicate_groups():
+            add("Frames " + ", ".join(str(r) for r in rows) + " are identical", rows)
+        for a, b, distance in hashes.near_duplicates():
+            add(f"Frames {a} and {b} look alike (distance {distance}/64)", [a, b])
+        if hashes.leftover_rows:
+            add(f"{hashes.leftover_rows} sheet rows below the last full frame are never shown", [])
+
+        issues = self.findings.count()
+        self.summary.setText(f"{hashes.count} frames of {hashes.frame_width}x{hashes.frame_height}: "
+                             + (f"{issues} finding(s)" if issues else "no empty or duplicate frames"))
@@ -0,0 +1,63 @@
+"""
+Project panel: lists the configs of a loaded episode folder
+"""
+
+import os
+from typing import Optional
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+from ..tools.project_loader import Project
+
+
+class ProjectPanel(QWidget):
+    """Filterable list of a Project's configs; activating one requests it to be opened"""
+    configActivated = pyqtSignal(str)  # Config path
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.summary = QLabel("No project loaded")
+        self.summary.setWordWrap(True)
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText("Filter...")
+        self.filter.textChanged.connect(self.apply_filter)
+        self.configs = QListWidget()
+        self.configs.itemActivated.connect(
+            lambda item: self.configActivated.emit(item.data(Qt.ItemDataRole.UserRole)))
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.addWidget(self.summary)
+        lay.addWidget(self.filter)
+        lay.addWidget(self.configs)
+
+    def show_progress(self, done: int, total: int) -> None:
+        self.summary.setText(f"Loading configs... {done}/{total}")
+
+    def show_project(self, project: Optional[Project]) -> None:
+        """Fill the list from a loaded project"""
+        self.configs.clear()
+        if project is None:
+            self.summary.setText("No project loaded")
+            return
+        # Bulk insert without a repaint per row
+        self.configs.setUpdatesEnabled(False)
+        for config in project:
+            item = QListWidgetItem(os.path.relpath(config.path, project.root))
+            item.setData(Qt.ItemDataRole.UserRole, config.path)
+            self.configs.addItem(item)
+        for path, error in project.failed:
+            item = QListWidgetItem(f"{os.path.relpath(path, project.root)} (failed)")
+            item.setToolTip(error)
+            item.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.configs.addItem(item)
+        self.configs.setUpdatesEnabled(True)
+        self.summary.setText(project.summary())
+        self.apply_filter(self.filter.text())
+
+    def apply_filter(self, text: str) -> None:
+        text = text.lower()
+        for row in range(self.configs.count()):
+            item = self.configs.item(row)
+            item.setHidden(bool(text) and text not in item.text().lower())
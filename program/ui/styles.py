@@ -19,6 +19,9 @@ class AppColors:
     LIGHT_FILL = QColor(50, 150, 255, 40)
     LIGHT_BORDER = QColor(50, 150, 255)
 
+    # Minimap
+    MINIMAP_HIGHLIGHT = QColor(255, 220, 0)
+
 class AppStyles:
     HEADER_FRAME = """
         .QFrame { background-color: #444; border-radius: 3px; }
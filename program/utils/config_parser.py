@@ -0,0 +1,124 @@
+"""
+Single-read tokenizer for SMBX NPC config files
+
+A config is read as bytes exactly once. The encoding is detected from that
+buffer (BOM, strict UTF-8, otherwise the Windows code page SMBX itself
+writes), and the decoded text is split into line records in one
+pass built on C-level string splitting. NPCData.load, the batch tools and
+the file watcher all go through read_config, so every consumer sees the
+same tokens.
+
+Line grammar (matching what the editor always accepted):
+    [key] = [value] [# comment]     everything before the first '#' holds the pair,
+                                    key ends at the first '=', both are stripped
+    [# comment]                     comment-only line
+    anything else                   kept as text, ignored by NPCData
+"""
+
+import codecs
+import re
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple
+
+# Bytes cp1252 leaves undefined; a buffer containing them can only be Latin-1
+_CP1252_UNDEFINED = re.compile(rb"[\x81\x8d\x8f\x90\x9d]")
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'),
+         (codecs.BOM_UTF16_LE, 'utf-16'),
+         (codecs.BOM_UTF16_BE, 'utf-16'))
+
+class ConfigEntry(NamedTuple):
+    """
+    One non-empty line of a config
+
+    key/value are None on lines without '='; comment is '' or starts with '#'.
+    span is the (start, end) offset of the line in the decoded text, without
+    its newline.
+    """
+    key: Optional[str]
+    value: Optional[str]
+    comment: str
+    text: str
+    line: int
+    span: Tuple[int, int]
+
+
+class ConfigFile(NamedTuple):
+    """Decoded text, detected encoding and line records of one config"""
+    path: str
+    encoding: str
+    text: str
+    entries: List[ConfigEntry]
+
+    def header_comments(self) -> List[str]:
+        """Comment-only lines before the first key, with their newlines"""
+        header = []
+        for entry in self.entries:
+            if entry.key is not None:
+                break
+            if not entry.text and entry.comment:
+                start, end = entry.span
+                header.append(self.text[start:end + 1])
+        return header
+
+
+# ConfigEntry from a plain tuple, skipping the generated __new__ on the hot path
+_new_entry = partial(tuple.__new__, ConfigEntry)
+
+
+def decode_config(raw: bytes) -> Tuple[str, str]:
+    """
+    Decode a config buffer, detecting its encoding from the bytes
+
+    Returns:
+        (text with '\\n' newlines, encoding name)
+    """
+    if raw.isascii():
+        text, encoding = raw.decode('ascii'), 'ascii'
+    else:
+        for bom, name in _BOMS:
+            if raw.startswith(bom):
+                text, encoding = raw.decode(name), name
+                break
+        else:
+            try:
+                text, encoding = raw.decode('utf-8'), 'utf-8'
+            except UnicodeDecodeError:
+                # Legacy configs come from Windows; Latin-1 decodes anything else
+                encoding = 'latin-1' if _CP1252_UNDEFINED.search(raw) else 'cp1252'
+                text = raw.decode(encoding)
+    if '\r' in text:
+        # Same newlines as text-mode reading
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text, encoding
+
+
+def tokenize_config(text: str) -> List[ConfigEntry]:
+    """Line records of decoded config text, empty lines skipped"""
+    entries = []
+    append = entries.append
+    new_entry = _new_entry
+    start = 0
+    # str.partition does the splitting in C; this loop only routes its results
+    for line, raw in enumerate(text.split('\n'), 1):
+        end = start + len(raw)
+        content, hash_mark, comment = raw.partition('#')
+        key, equals, value = content.partition('=')
+        if equals:
+            append(new_entry((key.strip(), value.strip(), hash_mark + comment, "", line, (start, end))))
+        elif hash_mark or not content.isspace() and content:
+            append(new_entry((None, None, hash_mark + comment, content.strip(), line, (start, end))))
+        start = end + 1
+    return entries
+
+
+def read_config(path: str) -> ConfigFile:
+    """
+    Read, decode and tokenize a config file with a single read
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    text, encoding = decode_config(raw)
+    return ConfigFile(path, encoding, text, tokenize_config(text))
@@ -0,0 +1,205 @@
+"""
+Minimal GIF89a encoder for SMBX NPC Editor
+
+Qt can read GIFs but has no GIF writer plugin, so legacy exports encode the
+file themselves. Frames are indexed (one byte per pixel, row-major) and are
+LZW compressed and written as soon as they are added, so an animation never
+has to be held in memory as a whole.
+"""
+
+import struct
+from typing import BinaryIO, Optional, Sequence, Union
+
+# Disposal methods of the graphic control extension
+DISPOSE_NONE = 1
+DISPOSE_BACKGROUND = 2
+
+
+def _table_bits(colors: int) -> int:
+    """Exponent of the smallest GIF colour table holding ``colors`` entries (1..8)"""
+    bits = 1
+    while (1 << bits) < colors:
+        bits += 1
+    return bits
+
+
+def _color_table(palette: Sequence[int], bits: int) -> bytes:
+    """Packs 0xRRGGBB entries into a colour table padded to 2**bits entries"""
+    table = bytearray()
+    for rgb in palette:
+        table += bytes(((rgb >> 16) & 0xFF, (rgb >> 8) & 0xFF, rgb & 0xFF))
+    table += bytes(3 * ((1 << bits) - len(palette)))
+    return bytes(table)
+
+
+def lzw_compress(indices: bytes, min_code_size: int) -> bytes:
+    """Variable-width LZW as used by GIF, returns the packed code stream"""
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    out = bytearray()
+    bit_buf = 0
+    bit_count = 0
+
+    code_size = min_code_size + 1
+    next_code = end_code + 1
+    table = {}
+
+    # Start with a clear code so decoders begin from a known table
+    bit_buf |= clear_code << bit_count
+    bit_count += code_size
+
+    if not indices:
+        prefix = None
+    else:
+        prefix = indices[0]
+        for value in indices[1:]:
+            key = (prefix << 8) | value
+            code = table.get(key)
+            if code is not None:
+                prefix = code
+                continue
+
+            bit_buf |= prefix << bit_count
+            bit_count += code_size
+            while bit_count >= 8:
+                out.append(bit_buf & 0xFF)
+                bit_buf >>= 8
+                bit_count -= 8
+
+            if next_code < 4096:
+                table[key] = next_code
+                next_code += 1
+                if next_code > (1 << code_size) and code_size < 12:
+                    code_size += 1
+            else:
+                # Table full: reset it and keep going
+                bit_buf |= clear_code << bit_count
+                bit_count += code_size
+                table.clear()
+                code_size = min_code_size + 1
+                next_code = end_code + 1
+            prefix = value
+
+    if prefix is not None:
+        bit_buf |= prefix << bit_count
+        bit_count += code_size
+        # The decoder grows its code size one entry later than we do
+        if next_code < 4096 and next_code + 1 > (1 << code_size) and code_size < 12:
+            code_size += 1
+    bit_buf |= end_code << bit_count
+    bit_count += code_size
+
+    while bit_count > 0:
+        out.append(bit_buf & 0xFF)
+        bit_buf >>= 8
+        bit_count -= 8
+    return bytes(out)
+
+
+class GifWriter:
+    """
+    Streaming GIF writer
+
+    Usage:
+        with GifWriter(path, w, h, palette) as gif:
+            gif.add_frame(indices)
+
+    Args:
+        target: File path or binary stream
+        width, height: Logical screen size
+        palette: Global colour table as 0xRRGGBB ints (up to 256)
+        loop: Netscape loop count for animations (0 = forever, None = no loop block)
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], width: int, height: int,
+                 palette: Optional[Sequence[int]] = None, loop: Optional[int] = None):
+        self._owns_stream = isinstance(target, str)
+        self._stream = open(target, 'wb') if self._owns_stream else target
+        self.width = width
+        self.height = height
+        self.frames = 0
+        # Milliseconds of animation written so far
+        self.elapsed_ms = 0.0
+
+        header = bytearray(b"GIF89a")
+        if palette:
+            bits = _table_bits(len(palette))
+            header += struct.pack("<HHBBB", width, height, 0xF0 | (bits - 1), 0, 0)
+            header += _color_table(palette, bits)
+        else:
+            header += struct.pack("<HHBBB", width, height, 0x70, 0, 0)
+        if loop is not None:
+            header += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00"
+        self._stream.write(header)
+        self._palette_size = len(palette) if palette else 0
+
+    def add_frame(self, indices: bytes, palette: Optional[Sequence[int]] = None,
+                  delay_ms: int = 0, transparent_index: Optional[int] = None,
+                  disposal: int = DISPOSE_NONE, x: int = 0, y: int = 0,
+                  width: Optional[int] = None, height: Optional[int] = None) -> None:
+        """
+        Encode and write one frame
+
+        Args:
+            indices: width * height palette indices, row-major
+            palette: Local colour table (uses the global one when omitted)
+            delay_ms: Frame duration. GIF stores 1/100 s, so each frame gets the
+                difference of the rounded start and end times; per-frame
+                rounding errors do not add up over the animation
+            transparent_index: Palette index treated as transparent
+        """
+        width = self.width if width is None else width
+        height = self.height if height is None else height
+        if len(indices) != width * height:
+            raise ValueError(f"Expected {width * height} indices, got {len(indices)}")
+
+        start = self.elapsed_ms
+        self.elapsed_ms += max(0, delay_ms)
+        delay_cs = round(self.elapsed_ms / 10) - round(start / 10)
+
+        block = bytearray()
+        if delay_ms or transparent_index is not None or self.frames:
+            flags = (disposal << 2) | (1 if transparent_index is not None else 0)
+            block += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, flags,
+                                 delay_cs, transparent_index or 0, 0)
+
+        if palette:
+            bits = _table_bits(len(palette))
+            block += struct.pack("<BHHHHB", 0x2C, x, y, width, height, 0x80 | (bits - 1))
+            block += _color_table(palette, bits)
+        else:
+            if not self._palette_size:
+                raise ValueError("Frame needs a palette when the GIF has no global colour table")
+            bits = _table_bits(self._palette_size)
+            block += struct.pack("<BHHHHB", 0x2C, x, y, width, height, 0)
+
+        min_code_size = max(2, bits)
+        data = lzw_compress(indices, min_code_size)
+        block.append(min_code_size)
+        for i in range(0, len(data), 255):
+            chunk = data[i:i + 255]
+            block.append(len(chunk))
+            block += chunk
+        block.append(0)
+        self._stream.write(block)
+        self.frames += 1
+
+    def close(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.write(b"\x3B")
+        if self._owns_stream:
+            self._stream.close()
+        self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_gif(path: str, width: int, height: int, indices: bytes, palette: Sequence[int]) -> None:
+    """Write a single-frame GIF"""
+    with GifWriter(path, width, height, palette) as gif:
+        gif.add_frame(indices)
@@ -1,18 +1,163 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QImage, QPixmap, QColor
 
+from .gif_writer import write_gif
+from .palette import quantize
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure-Python path still works
+    np = None
+
+# Rows composited per work item; bounds the 32-bit temporaries to one band per worker
+DEFAULT_BAND_ROWS = 256
+
+# Legacy sprites have no partial transparency, pixels at or above this alpha stay opaque
+DEFAULT_ALPHA_THRESHOLD = 128
+
+
+def find_sprite_files(config_path: str) -> Tuple[str, str]:
+    """
+    Sprite sheet belonging to an NPC config (npc-6.txt -> npc-6.png)
+
+    A PNG wins over legacy GIF/BMP files; for those the mask (npc-6m.gif)
+    is returned as well when it exists.
+
+    Returns:
+        (image_path, mask_path), empty strings where nothing was found
+    """
+    base = os.path.splitext(config_path)[0]
+    png_path = base + ".png"
+    if os.path.exists(png_path):
+        return png_path, ""
+    for ext in ['.gif', '.bmp']:
+        img_path = base + ext
+        if os.path.exists(img_path):
+            # Without a mask the image is loaded as is
+            mask_path = base + "m" + ext
+            return img_path, mask_path if os.path.exists(mask_path) else ""
+    return "", ""
+
+
+def load_sprite_image(image_path: str, mask_path: str = "") -> QImage:
+    """Decoded sheet as ARGB32, composited with its mask for legacy sprites"""
+    if mask_path:
+        return composite_legacy(QImage(image_path), QImage(mask_path))
+    return QImage(image_path).convertToFormat(QImage.Format.Format_ARGB32)
+
+
 def load_legacy_sprite(img_path: str, mask_path: str) -> QPixmap:
     """
     Combines a source image and mask using the Moondust/PGE logic.
     Simulates legacy BitBlt SRCAND / SRCPAINT rendering.
     """
-    # Load images and ensure they are in a manipulatable 32-bit format
-    front = QImage(img_path).convertToFormat(QImage.Format.Format_ARGB32)
-    mask = QImage(mask_path).convertToFormat(QImage.Format.Format_ARGB32)
-    
+    return QPixmap.fromImage(composite_legacy(QImage(img_path), QImage(mask_path)))
+
+
+def composite_legacy(front: QImage, mask: QImage, band_rows: int = DEFAULT_BAND_ROWS,
+                     workers: Optional[int] = None) -> QImage:
+    """
+    Composites a legacy front image with its mask and returns an ARGB32 image.
+    Uses the NumPy engine when available, otherwise the per-pixel fallback.
+
+    The NumPy engine works in horizontal bands of ``band_rows`` rows spread over
+    ``workers`` threads (default: one per core) and writes straight into a single
+    preallocated output, so only one band per worker is ever converted to 32-bit.
+    """
+    if np is None or front.isNull():
+        # Ensure both are in a manipulatable 32-bit format
+        front = front.convertToFormat(QImage.Format.Format_ARGB32)
+        mask = mask.convertToFormat(QImage.Format.Format_ARGB32)
+        _composite_python(front, mask)
+        return front
+
+    img_w, img_h = front.width(), front.height()
+    out = QImage(img_w, img_h, QImage.Format.Format_ARGB32)
+    out_view, _ = argb32_view(out, writable=True)
+
+    band_rows = max(1, int(band_rows))
+    bands = range(0, img_h, band_rows)
+    workers = workers or os.cpu_count() or 1
+
+    def run_band(y):
+        rows = min(band_rows, img_h - y)
+        _composite_band(front, mask, y, rows, out_view[y:y + rows])
+
+    if workers <= 1 or len(bands) <= 1:
+        for y in bands:
+            run_band(y)
+    else:
+        # NumPy and Qt release the GIL, so bands really run in parallel
+        with ThreadPoolExecutor(max_workers=min(workers, len(bands))) as pool:
+            list(pool.map(run_band, bands))
+    return out
+
+
+def argb32_view(image: QImage, writable: bool = False):
+    """
+    (height, width) uint32 ARGB view over the pixels of an image, and the image it reads
+
+    Images in other formats than ARGB32/RGB32 are converted first. The view
+    points into the returned image's buffer, so callers must keep that image
+    alive for as long as they use the view.
+
+    Raises:
+        ValueError: For a writable view of an image that would need converting,
+            since writes to the converted copy would be lost
+    """
+    if image.format() not in (QImage.Format.Format_ARGB32, QImage.Format.Format_RGB32):
+        if writable:
+            raise ValueError("Writable views need an ARGB32 or RGB32 image")
+        image = image.convertToFormat(QImage.Format.Format_ARGB32)
+    ptr = image.bits() if writable else image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    # Scanlines are padded to bytesPerLine, so reshape on the stride and crop
+    stride = image.bytesPerLine() // 4
+    buf = np.frombuffer(ptr, dtype=np.uint32).reshape(image.height(), stride)
+    return buf[:, :image.width()], image
+
+
+def _composite_band(front: QImage, mask: QImage, y: int, rows: int, out) -> None:
+    """Vectorized SRCAND / SRCPAINT emulation for rows y..y+rows, written into out"""
+    img_w = front.width()
+    f, band = argb32_view(front.copy(0, y, img_w, rows))
+
+    # Mask pixels outside the mask bounds count as white (0xFFFFFF)
+    m = np.full((rows, img_w), 0x00FFFFFF, dtype=np.uint32)
+    ov_w = min(img_w, mask.width())
+    ov_h = min(rows, mask.height() - y)
+    if ov_w > 0 and ov_h > 0:
+        mask_view, mask_band = argb32_view(mask.copy(0, y, ov_w, ov_h))
+        m[:ov_h, :ov_w] = mask_view
+
+    # (Mask & White BG) | Front, done on the packed RGB channels at once
+    rgb = (m | f) & 0x00FFFFFF
+
+    m_r = (m >> 16) & 0xFF
+    m_g = (m >> 8) & 0xFF
+    m_b = m & 0xFF
+    f_sum = ((f >> 16) & 0xFF) + ((f >> 8) & 0xFF) + (f & 0xFF)
+
+    alpha = 255 - (m_r + m_g + m_b) // 3
+    # Moondust Threshold: Almost white mask becomes fully transparent
+    alpha[(m_r > 240) & (m_g > 240) & (m_b > 240)] = 0
+    # Enhance Alpha based on Source brightness, alpha never drops below 0 here
+    alpha += f_sum // 3
+    np.minimum(alpha, 255, out=alpha)
+
+    out[...] = rgb | (alpha << 24)
+
+
+def _composite_python(front: QImage, mask: QImage) -> None:
+    """Per-pixel fallback used when NumPy is not installed, writes into front in place"""
     img_w, img_h = front.width(), front.height()
     mask_w, mask_h = mask.width(), mask.height()
 
-    # SMBX typically assumes a white background during the blit simulation 
+    # SMBX typically assumes a white background during the blit simulation
     bg_r, bg_g, bg_b = 255, 255, 255
 
     # Process per pixel
@@ -42,7 +187,7 @@ def load_legacy_sprite(img_path: str, mask_path: str) -> QPixmap:
             if m_r > 240 and m_g > 240 and m_b > 240:
                 new_alpha = 0
 
-            # 5. Enhance Alpha based on Source brightness 
+            # 5. Enhance Alpha based on Source brightness
             f_avg = (f_r + f_g + f_b) // 3
             new_alpha += f_avg
 
@@ -55,4 +200,84 @@ def load_legacy_sprite(img_path: str, mask_path: str) -> QPixmap:
             # 6. Apply back to front image
             front.setPixelColor(x, y, QColor(res_r, res_g, res_b, new_alpha))
 
-    return QPixmap.fromImage(front)
+
+def save_legacy_sprite(image: QImage, img_path: str, mask_path: str, max_colors: int = 256,
+                       alpha_threshold: int = DEFAULT_ALPHA_THRESHOLD) -> None:
+    """
+    Inverse of load_legacy_sprite: splits an image with alpha into a front
+    image on black and a black/white mask, then writes both files.
+
+    GIF targets are quantized to a ``max_colors`` palette with black kept as
+    entry 0; other formats are written in full colour by Qt. Compositing the
+    result again reproduces the image with alpha thresholded at
+    ``alpha_threshold`` and colours within the quantization error.
+    """
+    front, mask = split_legacy(image, alpha_threshold)
+    _save_legacy_part(front, img_path, max_colors)
+    _save_legacy_part(mask, mask_path, 2)
+
+
+def split_legacy(image: QImage, alpha_threshold: int = DEFAULT_ALPHA_THRESHOLD):
+    """
+    Splits an image into the (front, mask) pair the legacy blit expects
+
+    Returns:
+        Two RGB32 images: the colours on black, and a mask that is black where
+        the sprite is opaque and white elsewhere
+    """
+    if np is None:
+        return _split_python(image, alpha_threshold)
+
+    argb, source = argb32_view(image)
+    opaque = (argb >> 24) >= alpha_threshold
+    front = QImage(image.width(), image.height(), QImage.Format.Format_RGB32)
+    argb32_view(front, writable=True)[0][...] = np.where(opaque, argb | 0xFF000000, 0xFF000000)
+    mask = QImage(image.width(), image.height(), QImage.Format.Format_RGB32)
+    argb32_view(mask, writable=True)[0][...] = np.where(opaque, 0xFF000000, 0xFFFFFFFF)
+    return front, mask
+
+
+def _save_legacy_part(image: QImage, path: str, max_colors: int) -> None:
+    """Writes one half of a legacy pair; Qt has no GIF writer, so GIFs are encoded here"""
+    if not path.lower().endswith('.gif'):
+        if not image.save(path):
+            raise OSError(f"Could not write {path}")
+        return
+
+    if np is None:
+        indexed = image.convertToFormat(QImage.Format.Format_Indexed8, Qt.ImageConversionFlag.ThresholdDither)
+        indices = _indexed_bytes(indexed)
+        palette = [c & 0x00FFFFFF for c in indexed.colorTable()]
+    else:
+        # Black is the background of the front image and the opaque colour of the mask
+        argb, image = argb32_view(image)
+        indices, palette = quantize(argb, max_colors, reserved=(0x000000,))
+        indices = indices.tobytes()
+    write_gif(path, image.width(), image.height(), indices, palette)
+
+
+def _split_python(image: QImage, alpha_threshold: int):
+    """Per-pixel fallback of split_legacy used when NumPy is not installed"""
+    width, height = image.width(), image.height()
+    front = QImage(width, height, QImage.Format.Format_RGB32)
+    mask = QImage(width, height, QImage.Format.Format_RGB32)
+    black, white = QColor(0, 0, 0), QColor(255, 255, 255)
+    for y in range(height):
+        for x in range(width):
+            pixel = image.pixelColor(x, y)
+            if pixel.alpha() >= alpha_threshold:
+                front.setPixelColor(x, y, QColor(pixel.red(), pixel.green(), pixel.blue()))
+                mask.setPixelColor(x, y, black)
+            else:
+                front.setPixelColor(x, y, black)
+                mask.setPixelColor(x, y, white)
+    return front, mask
+
+
+def _indexed_bytes(image: QImage) -> bytes:
+    """Row-major palette indices of an Indexed8 image, without scanline padding"""
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    raw = bytes(ptr)
+    stride, width = image.bytesPerLine(), image.width()
+    return b"".join(raw[y * stride:y * stride + width] for y in range(image.height()))
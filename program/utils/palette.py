@@ -0,0 +1,135 @@
+"""
+Vectorized palette quantization (median cut) for legacy GIF export
+
+Works on the distinct colours of an image rather than on its pixels: the
+colours are counted once with np.unique, boxes are split at their weighted
+median along the widest channel, and every pixel is mapped to its box
+through the unique inverse, so no per-pixel Python loop is involved.
+Photographic sheets with many distinct colours are cut on a 15-bit histogram.
+"""
+
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, callers fall back to Qt's quantizer
+    np = None
+
+# Above this many distinct colours the cut runs on a 5-bit-per-channel histogram
+HISTOGRAM_BINS = 1 << 15
+
+
+def _channels(colors):
+    """(N,) packed 0xRRGGBB -> (N, 3) int32 channels"""
+    return np.stack(((colors >> 16) & 0xFF, (colors >> 8) & 0xFF, colors & 0xFF), axis=1).astype(np.int32)
+
+
+def median_cut(colors, weights, max_colors: int):
+    """
+    Reduce distinct colours to at most ``max_colors`` representatives
+
+    Args:
+        colors: (N,) uint32 distinct 0xRRGGBB values
+        weights: (N,) pixel counts of each colour
+        max_colors: Palette size
+
+    Returns:
+        (palette, labels): (K,) uint32 colours and the (N,) palette index of every input colour
+    """
+    if len(colors) <= max_colors:
+        return colors.astype(np.uint32), np.arange(len(colors))
+
+    weights = weights.astype(np.int64)
+    if len(colors) > HISTOGRAM_BINS:
+        # Cut on a 5-bit-per-channel histogram; the palette still averages the exact colours
+        binned = ((colors >> 9) & 0x7C00) | ((colors >> 6) & 0x03E0) | ((colors >> 3) & 0x001F)
+        bins, bin_of_color = np.unique(binned, return_inverse=True)
+        bin_weights = np.bincount(bin_of_color, weights=weights).astype(np.int64)
+        bin_colors = ((bins & 0x7C00) << 9) | ((bins & 0x03E0) << 6) | ((bins & 0x001F) << 3)
+        labels = _cut(_channels(bin_colors), bin_weights, max_colors)[bin_of_color.reshape(-1)]
+    else:
+        labels = _cut(_channels(colors), weights, max_colors)
+    return _box_means(colors, weights, labels), labels
+
+
+def _cut(rgb, weights, max_colors: int):
+    """Median cut over (N, 3) channels, returns the box index of every entry"""
+    def describe(members):
+        span = rgb[members].max(axis=0) - rgb[members].min(axis=0)
+        channel = int(span.argmax())
+        return int(span[channel]), channel
+
+    boxes = [np.arange(len(rgb))]
+    info = [describe(boxes[0])]
+    while len(boxes) < max_colors:
+        # Split the box with the widest channel range
+        candidates = [i for i, box in enumerate(boxes) if len(box) > 1 and info[i][0] > 0]
+        if not candidates:
+            break
+        target = max(candidates, key=lambda i: (info[i][0], len(boxes[i])))
+        members = boxes[target]
+        members = members[np.argsort(rgb[members, info[target][1]], kind='stable')]
+        cumulative = np.cumsum(weights[members])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        cut = min(max(cut, 1), len(members) - 1)
+
+        boxes[target] = members[:cut]
+        info[target] = describe(members[:cut])
+        boxes.append(members[cut:])
+        info.append(describe(members[cut:]))
+
+    labels = np.empty(len(rgb), dtype=np.int64)
+    for i, members in enumerate(boxes):
+        labels[members] = i
+    return labels
+
+
+def _box_means(colors, weights, labels):
+    """Pixel-weighted mean colour of every label"""
+    rgb = _channels(colors)
+    total = np.bincount(labels, weights=weights)
+    means = [np.bincount(labels, weights=rgb[:, c] * weights) // total for c in range(3)]
+    r, g, b = (m.astype(np.uint32) for m in means)
+    return (r << 16) | (g << 8) | b
+
+
+def quantize(rgb, max_colors: int = 256, reserved: Sequence[int] = (), mask=None) -> Tuple["np.ndarray", List[int]]:
+    """
+    Map an image to a palette of at most ``max_colors`` entries
+
+    Args:
+        rgb: (H, W) uint32 image, only the low 24 bits are used
+        max_colors: Total palette size including the reserved entries
+        reserved: Colours that take the first palette slots verbatim
+        mask: Optional (H, W) bool; pixels outside it get index 0
+
+    Returns:
+        (indices, palette): (H, W) uint8 palette indices and the 0xRRGGBB palette
+    """
+    rgb = rgb & 0x00FFFFFF
+    selected = rgb if mask is None else rgb[mask]
+    indices = np.zeros(rgb.shape, dtype=np.uint8)
+    palette = [int(c) for c in reserved]
+    if selected.size == 0:
+        return indices, palette or [0]
+
+    colors, inverse, counts = np.unique(selected, return_inverse=True, return_counts=True)
+    # Colours that are already reserved map straight to their slot
+    reserved_arr = np.array(palette, dtype=np.uint32)
+    is_reserved = np.isin(colors, reserved_arr)
+    lookup = np.empty(len(colors), dtype=np.int64)
+    for slot, color in enumerate(palette):
+        lookup[colors == color] = slot
+
+    free = ~is_reserved
+    if free.any():
+        cut_palette, labels = median_cut(colors[free], counts[free], max_colors - len(palette))
+        lookup[free] = labels + len(palette)
+        palette += [int(c) for c in cut_palette]
+
+    mapped = lookup[inverse.reshape(-1)].astype(np.uint8)
+    if mask is None:
+        indices[...] = mapped.reshape(rgb.shape)
+    else:
+        indices[mask] = mapped
+    return indices, palette
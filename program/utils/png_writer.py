@@ -0,0 +1,180 @@
+"""
+Streaming PNG and APNG encoders for SMBX NPC Editor
+
+Qt writes single PNGs but neither animated PNGs nor images that arrive piece
+by piece. Both writers here take one QImage frame at a time, deflate its rows
+right away and write the compressed data out, so an animation or a strip of
+frames never has to be held in memory as a whole.
+"""
+
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Union
+
+from PyQt6.QtGui import QImage
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Compressed bytes collected before an IDAT chunk is written
+CHUNK_SIZE = 1 << 16
+
+# fcTL dispose/blend operations
+APNG_DISPOSE_NONE = 0
+APNG_DISPOSE_BACKGROUND = 1
+APNG_BLEND_SOURCE = 0
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _ihdr(width: int, height: int) -> bytes:
+    # 8-bit RGBA, deflate, adaptive filtering, no interlace
+    return _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+
+def rgba_scanlines(image: QImage, width: int, height: int) -> bytes:
+    """
+    Filter-type-0 RGBA scanlines of an image, cropped or padded to width x height
+
+    Pixels outside the image are transparent.
+    """
+    image = image.convertToFormat(QImage.Format.Format_RGBA8888)
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    raw = bytes(ptr)
+    stride = image.bytesPerLine()
+    used = min(width, image.width()) * 4
+    pad = bytes(width * 4 - used)
+    empty = b"\x00" + bytes(width * 4)
+    rows = []
+    for y in range(height):
+        if y < image.height():
+            rows.append(b"\x00" + raw[y * stride:y * stride + used] + pad)
+        else:
+            rows.append(empty)
+    return b"".join(rows)
+
+
+class _PngStream(ABC):
+    """Shared file handling of the writers; subclasses write their image data in _end"""
+
+    def __init__(self, target: Union[str, BinaryIO], width: int, height: int):
+        self._owns_stream = isinstance(target, str)
+        self._stream = open(target, 'wb') if self._owns_stream else target
+        self.width = width
+        self.height = height
+        self.frames = 0
+        self._stream.write(PNG_SIGNATURE + _ihdr(width, height))
+
+    @abstractmethod
+    def _end(self) -> None:
+        """Write whatever image data is still pending before IEND"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._stream is None:
+            return
+        try:
+            self._end()
+        finally:
+            self._stream.write(_chunk(b"IEND", b""))
+            if self._owns_stream:
+                self._stream.close()
+            self._stream = None
+
+
+class PngStripWriter(_PngStream):
+    """
+    Frames stacked top to bottom into one PNG, the way SMBX sheets are laid out
+
+    Args:
+        target: File path or binary stream
+        width, height: Size of one frame
+        frames: Number of frames the strip will hold; missing ones stay transparent
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], width: int, height: int, frames: int):
+        self.frame_height = height
+        self.capacity = frames
+        super().__init__(target, width, height * frames)
+        self._compressor = zlib.compressobj(9)
+        self._pending = bytearray()
+
+    def add_frame(self, image: QImage, delay_ms: int = 0) -> None:
+        """Append one frame (delay_ms is accepted for writer compatibility and ignored)"""
+        if self.frames >= self.capacity:
+            raise ValueError(f"Strip only holds {self.capacity} frames")
+        self._feed(rgba_scanlines(image, self.width, self.frame_height))
+        self.frames += 1
+
+    def _feed(self, data: bytes) -> None:
+        self._pending += self._compressor.compress(data)
+        if len(self._pending) >= CHUNK_SIZE:
+            self._stream.write(_chunk(b"IDAT", bytes(self._pending)))
+            self._pending.clear()
+
+    def _end(self) -> None:
+        empty = b"\x00" + bytes(self.width * 4)
+        for _ in range((self.capacity - self.frames) * self.frame_height):
+            self._feed(empty)
+        self._pending += self._compressor.flush()
+        self._stream.write(_chunk(b"IDAT", bytes(self._pending)))
+
+
+class ApngWriter(_PngStream):
+    """
+    Streaming animated PNG writer
+
+    Usage:
+        with ApngWriter(path, w, h, frames) as apng:
+            apng.add_frame(image, delay_ms)
+
+    Args:
+        target: File path or binary stream
+        width, height: Canvas size
+        frames: Number of frames (APNG stores it before the first frame)
+        loop: Number of plays, 0 = forever
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], width: int, height: int, frames: int,
+                 loop: int = 0):
+        super().__init__(target, width, height)
+        self.capacity = frames
+        self._sequence = 0
+        self._stream.write(_chunk(b"acTL", struct.pack(">II", frames, loop)))
+
+    def add_frame(self, image: QImage, delay_ms: int = 0,
+                  dispose: int = APNG_DISPOSE_BACKGROUND) -> None:
+        """Encode and write one full-canvas frame"""
+        if self.frames >= self.capacity:
+            raise ValueError(f"Animation was declared with {self.capacity} frames")
+        # The delay is stored as a fraction, milliseconds are exact
+        self._stream.write(_chunk(b"fcTL", struct.pack(
+            ">IIIIIHHBB", self._next_sequence(), self.width, self.height, 0, 0,
+            max(0, int(delay_ms)), 1000, dispose, APNG_BLEND_SOURCE)))
+
+        data = zlib.compress(rgba_scanlines(image, self.width, self.height), 9)
+        for i in range(0, len(data), CHUNK_SIZE):
+            part = data[i:i + CHUNK_SIZE]
+            if self.frames == 0:
+                # The first frame doubles as the still image for non-APNG readers
+                self._stream.write(_chunk(b"IDAT", part))
+            else:
+                self._stream.write(_chunk(b"fdAT", struct.pack(">I", self._next_sequence()) + part))
+        self.frames += 1
+
+    def _next_sequence(self) -> int:
+        sequence = self._sequence
+        self._sequence += 1
+        return sequence
+
+    def _end(self) -> None:
+        if self.frames != self.capacity:
+            # acTL is already written, a short animation would be an invalid file
+            raise ValueError(f"Animation was declared with {self.capacity} frames, got {self.frames}")
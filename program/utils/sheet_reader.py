@@ -0,0 +1,250 @@
+"""
+Region-of-interest access to huge sprite sheets
+
+Sheets above LAZY_THRESHOLD_PIXELS are not turned into one big QPixmap.
+Instead they are split once into horizontal bands that are stored as small
+PNG tiles next to the sprite cache's disk tier. A LazySheet then decodes only
+the bands covering the frames being shown, plus a prefetch window, and keeps
+them in a band LRU under a fixed memory cap.
+
+Qt's PNG/GIF handlers do not support QImageIOHandler.ClipRect natively (the
+reader would decode the full image and crop it), so band tiles are used for
+every format.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from itertools import count
+from typing import Optional
+
+from PyQt6.QtCore import Qt, QRect, QRunnable, QSize, QThreadPool
+from PyQt6.QtGui import QImage, QImageReader, QPainter, QPixmap
+
+from ..analysis.sheet_profile import SheetProfile, np
+
+logger = logging.getLogger(__name__)
+
+LAZY_THRESHOLD_PIXELS = 8 * 1024 * 1024
+BAND_HEIGHT = 256
+PREFETCH_BANDS = 2
+MEMORY_CAP_BYTES = 48 * 1024 * 1024
+THUMBNAIL_SIDE = 600
+# Bumped when tile sets gain files, so older sets are rebuilt instead of used
+TILE_FORMAT = 2
+# Tile sets kept on disk; every sheet version gets its own set
+MAX_TILE_SETS = 8
+
+_sheet_ids = count(1)
+
+
+def image_size(path: str) -> QSize:
+    """Dimensions from the image header, without decoding pixels"""
+    return QImageReader(path).size()
+
+
+def needs_lazy_loading(path: str) -> bool:
+    size = image_size(path)
+    return size.isValid() and size.width() * size.height() > LAZY_THRESHOLD_PIXELS
+
+
+def tile_dir_for(cache_dir: str, key) -> str:
+    digest = hashlib.sha1(repr((TILE_FORMAT, key)).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, "tiles", digest)
+
+
+def has_tiles(tile_dir: str) -> bool:
+    return os.path.exists(os.path.join(tile_dir, "sheet.json"))
+
+
+def prune_tiles(cache_dir: str, keep: int = MAX_TILE_SETS, exclude: str = "") -> int:
+    """
+    Delete all but the ``keep`` most recently used tile sets under cache_dir
+
+    A set's last use is the mtime of its sheet.json, which LazySheet touches
+    when it opens the set. Returns the number of sets deleted.
+    """
+    root = os.path.join(cache_dir, "tiles")
+    sets = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False) and entry.path != exclude:
+                    try:
+                        # Incomplete sets (still being written, or abandoned) go by the folder
+                        used = os.stat(os.path.join(entry.path, "sheet.json")).st_mtime_ns
+                    except OSError:
+                        used = entry.stat().st_mtime_ns
+                    sets.append((used, entry.path))
+    except OSError:
+        return 0
+    sets.sort(reverse=True)
+    # The excluded set counts towards keep
+    stale = sets[max(0, keep - 1 if exclude else keep):]
+    for _, path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+        logger.debug("Removed tile set %s", path)
+    return len(stale)
+
+
+def write_tiles(image: QImage, tile_dir: str, band_height: int = BAND_HEIGHT) -> None:
+    """
+    Split a decoded sheet into band PNGs plus a thumbnail and its SheetProfile
+
+    Runs once per sheet version (usually on a worker thread); afterwards the
+    full sheet never has to be decoded or scanned again.
+    """
+    os.makedirs(tile_dir, exist_ok=True)
+    # Profiled band by band while the bands are at hand anyway
+    profile = SheetProfile.empty(image.width(), image.height()) if np is not None else None
+    bands = (image.height() + band_height - 1) // band_height
+    for i in range(bands):
+        top = i * band_height
+        band = image.copy(0, top, image.width(), min(band_height, image.height() - top))
+        band.save(os.path.join(tile_dir, f"band-{i}.png"), "PNG")
+        if profile is not None:
+            profile.scan(band, top)
+    if profile is not None:
+        profile.save(tile_dir)
+
+    thumb = image.scaled(THUMBNAIL_SIDE, THUMBNAIL_SIDE, Qt.AspectRatioMode.KeepAspectRatio)
+    thumb.save(os.path.join(tile_dir, "thumb.png"), "PNG")
+
+    # Written last: its presence marks the tile set as complete
+    meta = {'width': image.width(), 'height': image.height(), 'band_height': band_height}
+    with open(os.path.join(tile_dir, "sheet.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, sheet: "LazySheet", band: int):
+        super().__init__()
+        self.sheet = sheet
+        self.band = band
+
+    def run(self):
+        self.sheet._band(self.band)
+
+
+class LazySheet:
+    """
+    Sprite sheet backed by band tiles on disk
+
+    Provides the subset of the QPixmap API the preview uses (width, height,
+    isNull, cacheKey, copy, scaled), so it can stand in for a full pixmap.
+    """
+
+    def __init__(self, tile_dir: str, memory_cap: int = MEMORY_CAP_BYTES,
+                 prefetch_bands: int = PREFETCH_BANDS):
+        meta_path = os.path.join(tile_dir, "sheet.json")
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        try:
+            # Marks the set as recently used for prune_tiles
+            os.utime(meta_path)
+        except OSError:
+            pass
+        self.tile_dir = tile_dir
+        self._width = int(meta['width'])
+        self._height = int(meta['height'])
+        self.band_height = int(meta['band_height'])
+        self.band_count = (self._height + self.band_height - 1) // self.band_height
+        self.memory_cap = memory_cap
+        self.prefetch_bands = prefetch_bands
+        self._cache_key = -next(_sheet_ids)  # Negative ids never collide with QPixmap keys
+        self._bands: "OrderedDict[int, QImage]" = OrderedDict()
+        self._band_bytes = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thumbnail: Optional[QImage] = None
+        self.decoded_bands = 0
+
+    # --- QPixmap-like API ---
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def size(self) -> QSize:
+        return QSize(self._width, self._height)
+
+    def isNull(self) -> bool:
+        return self._width <= 0 or self._height <= 0
+
+    def cacheKey(self) -> int:
+        return self._cache_key
+
+    def depth(self) -> int:
+        return 32
+
+    def copy(self, rect: QRect) -> QPixmap:
+        """Pixels of rect, decoding only the bands it touches (padded with transparency)"""
+        out = QImage(rect.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        out.fill(Qt.GlobalColor.transparent)
+        top = max(0, rect.top())
+        bottom = min(self._height - 1, rect.bottom())
+        if top <= bottom:
+            painter = QPainter(out)
+            first, last = top // self.band_height, bottom // self.band_height
+            for i in range(first, last + 1):
+                band = self._band(i)
+                if band is not None:
+                    painter.drawImage(-rect.left(), i * self.band_height - rect.top(), band)
+            painter.end()
+            self._prefetch(last + 1)
+        return QPixmap.fromImage(out)
+
+    def scaled(self, w: int, h: int, mode=Qt.AspectRatioMode.IgnoreAspectRatio) -> QPixmap:
+        """Scaled overview, served from the stored thumbnail"""
+        if self._thumbnail is None:
+            self._thumbnail = QImage(os.path.join(self.tile_dir, "thumb.png"))
+        target = self.size().scaled(w, h, mode)
+        return QPixmap.fromImage(self._thumbnail.scaled(target))
+
+    def band(self, index: int) -> Optional[QImage]:
+        """Decoded band ``index`` (rows index * band_height onwards), through the band cache"""
+        return self._band(index)
+
+    # --- Band cache ---
+
+    def _band(self, index: int) -> Optional[QImage]:
+        with self._lock:
+            band = self._bands.get(index)
+            if band is not None:
+                self._bands.move_to_end(index)
+                return band
+
+        band = QImage(os.path.join(self.tile_dir, f"band-{index}.png"))
+        with self._lock:
+            self._pending.discard(index)
+            if band.isNull():
+                logger.warning(f"Missing sheet tile {index} in {self.tile_dir}")
+                return None
+            if index not in self._bands:
+                self.decoded_bands += 1
+                self._bands[index] = band
+                self._band_bytes += band.sizeInBytes()
+                while self._band_bytes > self.memory_cap and len(self._bands) > 1:
+                    _, old = self._bands.popitem(last=False)
+                    self._band_bytes -= old.sizeInBytes()
+            return self._bands[index]
+
+    def _prefetch(self, first: int) -> None:
+        """Decode the next bands on the thread pool so playback never waits on them"""
+        pool = QThreadPool.globalInstance()
+        for i in range(first, min(self.band_count, first + self.prefetch_bands)):
+            with self._lock:
+                if i in self._bands or i in self._pending:
+                    continue
+                self._pending.add(i)
+            pool.start(_PrefetchTask(self, i))
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._band_bytes
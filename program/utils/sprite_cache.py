@@ -0,0 +1,283 @@
+"""
+Content-addressed sprite cache for SMBX NPC Editor
+
+Sprites are keyed by (image path, mask path, mtime, size) so an unchanged
+file is never decoded twice. Decoded pixmaps live in an in-memory LRU with a
+byte budget, and composited legacy GIF/BMP + mask pairs are also written to a
+persistent PNG tier so later sessions skip load_legacy_sprite entirely. The
+PNG tier has its own byte budget; the least recently used files go first.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtCore import QStandardPaths
+from PyQt6.QtGui import QImage, QPixmap
+
+from .image_utils import composite_legacy
+
+logger = logging.getLogger(__name__)
+
+SpriteKey = Tuple[str, str, int, int, int, int]
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_BUDGET_BYTES = 512 * 1024 * 1024
+APP_CACHE_NAME = "smbx-npc-editor"
+
+
+def sprite_key(image_path: str, mask_path: str = "") -> Optional[SpriteKey]:
+    """
+    Build the cache key for an image (and optional mask)
+
+    Returns:
+        (image_path, mask_path, mtime_ns, size, mask_mtime_ns, mask_size),
+        or None if the image cannot be stat'ed
+    """
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return None
+
+    mask_mtime, mask_size = 0, 0
+    if mask_path:
+        try:
+            mst = os.stat(mask_path)
+            mask_mtime, mask_size = mst.st_mtime_ns, mst.st_size
+        except OSError:
+            return None
+
+    return (os.path.abspath(image_path), os.path.abspath(mask_path) if mask_path else "",
+            st.st_mtime_ns, st.st_size, mask_mtime, mask_size)
+
+
+def app_cache_dir() -> str:
+    """
+    Per-user cache folder of the editor (sprite tiers, sprite indexes)
+
+    Always a folder of our own inside the generic cache location, so the GUI
+    and the batch CLI (which sets no application name) share it and pruning
+    never touches other programs' files.
+    """
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+    return os.path.join(base or tempfile.gettempdir(), APP_CACHE_NAME)
+
+
+def _pixmap_cost(pixmap: QPixmap) -> int:
+    """Approximate memory footprint of a pixmap in bytes"""
+    depth = pixmap.depth() or 32
+    return pixmap.width() * pixmap.height() * max(1, depth // 8)
+
+
+class SpriteCache:
+    """
+    Two-tier sprite cache
+
+    The memory tier is an LRU of QPixmaps bounded by ``budget_bytes`` and must
+    only be used from the GUI thread. The disk tier stores composited legacy
+    sprites as PNG files and is safe to use from worker threads.
+
+    Attributes:
+        hits: Memory tier hits
+        misses: Memory tier misses
+        evictions: Pixmaps dropped to stay within the byte budget
+        disk_hits: Legacy sprites served from the PNG tier
+        disk_writes: Legacy sprites written to the PNG tier
+        disk_evictions: PNG tier files deleted to stay within disk_budget_bytes
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 disk_dir: Optional[str] = None, use_disk: bool = True,
+                 disk_budget_bytes: int = DEFAULT_DISK_BUDGET_BYTES):
+        self._entries: "OrderedDict[SpriteKey, QPixmap]" = OrderedDict()
+        self._costs: Dict[SpriteKey, int] = {}
+        self._bytes = 0
+        self._budget = max(0, int(budget_bytes))
+        self._disk_dir = disk_dir
+        self.use_disk = use_disk
+        self.disk_budget_bytes = max(0, int(disk_budget_bytes))
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+
+    # --- Memory tier ---
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget
+
+    @budget_bytes.setter
+    def budget_bytes(self, value: int) -> None:
+        self._budget = max(0, int(value))
+        self._evict()
+
+    @property
+    def used_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Optional[SpriteKey]) -> Optional[QPixmap]:
+        """Return the cached pixmap for key (marking it recently used), or None"""
+        pixmap = self._entries.get(key) if key else None
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def put(self, key: Optional[SpriteKey], pixmap: QPixmap) -> None:
+        """Insert a pixmap, evicting least recently used entries over budget"""
+        if not key or pixmap is None or pixmap.isNull():
+            return
+        cost = _pixmap_cost(pixmap)
+        if cost > self._budget:
+            # Never cache something that would flush everything else
+            return
+        if key in self._entries:
+            self._bytes -= self._costs[key]
+        self._entries[key] = pixmap
+        self._entries.move_to_end(key)
+        self._costs[key] = cost
+        self._bytes += cost
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self._budget and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._costs.pop(key)
+            self.evictions += 1
+            logger.debug("Evicted sprite %s", key[0])
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is kept)"""
+        self._entries.clear()
+        self._costs.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for tuning the byte budget"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_hits': self.disk_hits,
+            'disk_writes': self.disk_writes,
+            'disk_evictions': self.disk_evictions,
+            'entries': len(self._entries),
+            'used_bytes': self._bytes,
+            'budget_bytes': self._budget,
+        }
+
+    # --- Disk tier ---
+
+    @property
+    def disk_dir(self) -> str:
+        if not self._disk_dir:
+            self._disk_dir = os.path.join(app_cache_dir(), "sprites")
+        return self._disk_dir
+
+    def _disk_path(self, key: SpriteKey) -> str:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, digest + ".png")
+
+    def load_disk_image(self, key: Optional[SpriteKey]) -> Optional[QImage]:
+        """Read a composited sprite from the PNG tier, or None if absent"""
+        if not key or not self.use_disk:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        image = QImage(path)
+        if image.isNull():
+            return None
+        self.disk_hits += 1
+        try:
+            # The mtime doubles as last use for trim_disk
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def store_disk_image(self, key: Optional[SpriteKey], image: QImage) -> None:
+        """Write a composited sprite to the PNG tier (atomic replace)"""
+        if not key or not self.use_disk or image.isNull():
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            if image.save(tmp_path, "PNG"):
+                os.replace(tmp_path, path)
+                self.disk_writes += 1
+        except OSError as e:
+            logger.warning(f"Could not write sprite cache entry {path}: {e}")
+        self.trim_disk(keep=path)
+
+    def trim_disk(self, keep: str = "") -> None:
+        """Delete the least recently used PNG tier files above disk_budget_bytes"""
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        st = entry.stat()
+                        files.append((st.st_mtime_ns, st.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_budget_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                # Another worker may have trimmed it already
+                continue
+            total -= size
+            self.disk_evictions += 1
+
+    # --- Decoding ---
+
+    def decode_image(self, key: Optional[SpriteKey], image_path: str, mask_path: str = "") -> QImage:
+        """
+        Decode a sprite to a QImage, consulting the PNG tier for legacy pairs
+
+        Touches only the disk tier, so it may run on a worker thread.
+        """
+        if not mask_path:
+            return QImage(image_path)
+
+        image = self.load_disk_image(key)
+        if image is None:
+            image = composite_legacy(QImage(image_path), QImage(mask_path))
+            self.store_disk_image(key, image)
+        return image
+
+    def load(self, image_path: str, mask_path: str = "") -> QPixmap:
+        """Return the sprite as a pixmap, decoding it only on a cache miss"""
+        key = sprite_key(image_path, mask_path)
+        pixmap = self.get(key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(self.decode_image(key, image_path, mask_path))
+            self.put(key, pixmap)
+        return pixmap
+
+
+_shared_cache: Optional[SpriteCache] = None
+
+
+def shared_cache() -> SpriteCache:
+    """Process-wide cache shared by every preview"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SpriteCache()
+    return _shared_cache
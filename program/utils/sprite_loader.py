@@ -0,0 +1,151 @@
+"""
+Asynchronous sprite decoding for SMBX NPC Editor
+
+Decoding (and legacy mask compositing) runs on a QThreadPool worker that only
+touches QImage. The finished image is handed back to the GUI thread through a
+queued signal, where it is converted to a QPixmap and stored in the cache.
+
+Sheets too large to keep as one pixmap are split into band tiles by the
+worker instead and handed back as a LazySheet (see sheet_reader).
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from .image_utils import composite_legacy
+from .sheet_reader import LazySheet, has_tiles, needs_lazy_loading, prune_tiles, tile_dir_for, write_tiles
+from .sprite_cache import SpriteCache, SpriteKey, sprite_key
+
+logger = logging.getLogger(__name__)
+
+# LazySheets kept for reuse; each holds its own band cache
+MAX_LAZY_SHEETS = 4
+
+
+class _DecodeSignals(QObject):
+    finished = pyqtSignal(object)  # The finished SpriteDecodeTask
+
+
+class SpriteDecodeTask(QRunnable):
+    """
+    Worker that decodes one sprite off the GUI thread
+
+    With ``tile_dir`` set, the decoded sheet is written out as band tiles
+    instead of being returned as a single image.
+    """
+
+    def __init__(self, request_id: int, cache: SpriteCache, key: Optional[SpriteKey],
+                 image_path: str, mask_path: str = "", tile_dir: Optional[str] = None):
+        super().__init__()
+        self.request_id = request_id
+        self.cache = cache
+        self.key = key
+        self.image_path = image_path
+        self.mask_path = mask_path
+        self.tile_dir = tile_dir
+        self.image = QImage()
+        self.signals = _DecodeSignals()
+
+    def run(self):
+        try:
+            if self.tile_dir:
+                if self.mask_path:
+                    image = composite_legacy(QImage(self.image_path), QImage(self.mask_path))
+                else:
+                    image = QImage(self.image_path)
+                if not image.isNull():
+                    write_tiles(image, self.tile_dir)
+                    prune_tiles(self.cache.disk_dir, exclude=self.tile_dir)
+            else:
+                self.image = self.cache.decode_image(self.key, self.image_path, self.mask_path)
+        except Exception as e:
+            logger.error(f"Failed to decode sprite: {self.image_path}", exc_info=e)
+            self.image = QImage()
+        self.signals.finished.emit(self)
+
+
+class SpriteLoader(QObject):
+    """
+    Hands out sprites, decoding cache misses on a thread pool
+
+    Every request gets an increasing id; only the result of the latest request
+    is delivered through ``spriteLoaded``, so results for a file the user has
+    already left are discarded. The delivered object is a QPixmap, or a
+    LazySheet for sheets above the lazy-loading threshold. The same LazySheet
+    is handed out for the same sprite version, so caches keyed on its
+    cacheKey (atlas, minimap, profile) keep hitting.
+    """
+    spriteLoaded = pyqtSignal(object)
+
+    def __init__(self, cache: SpriteCache, pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pool = pool or QThreadPool.globalInstance()
+        self._request_id = 0
+        # PyQt must keep the Python side of queued tasks alive until they finish
+        self._tasks: Set[SpriteDecodeTask] = set()
+        self._sheets: "OrderedDict[SpriteKey, LazySheet]" = OrderedDict()
+
+    @property
+    def is_pending(self) -> bool:
+        return any(t.request_id == self._request_id for t in self._tasks)
+
+    def request(self, image_path: str, mask_path: str = ""):
+        """
+        Request a sprite
+
+        Returns:
+            The pixmap (or LazySheet) straight away when no decoding is needed,
+            otherwise None and ``spriteLoaded`` fires once the worker is done
+        """
+        self._request_id += 1
+        key = sprite_key(image_path, mask_path)
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        tile_dir = None
+        if key and needs_lazy_loading(image_path):
+            tile_dir = tile_dir_for(self.cache.disk_dir, key)
+            if has_tiles(tile_dir):
+                return self._lazy_sheet(key, tile_dir)
+
+        task = SpriteDecodeTask(self._request_id, self.cache, key, image_path, mask_path, tile_dir)
+        task.signals.finished.connect(self._on_task_finished)
+        self._tasks.add(task)
+        self.pool.start(task)
+        return None
+
+    def _lazy_sheet(self, key: SpriteKey, tile_dir: str) -> LazySheet:
+        """The LazySheet of a sprite version, opened once"""
+        sheet = self._sheets.get(key)
+        if sheet is not None:
+            self._sheets.move_to_end(key)
+            return sheet
+        sheet = self._sheets[key] = LazySheet(tile_dir)
+        while len(self._sheets) > MAX_LAZY_SHEETS:
+            self._sheets.popitem(last=False)
+        return sheet
+
+    def cancel(self) -> None:
+        """Invalidate any request in flight"""
+        self._request_id += 1
+
+    def _on_task_finished(self, task):
+        self._tasks.discard(task)
+        if task.request_id != self._request_id:
+            logger.debug("Discarding stale sprite decode (request %d)", task.request_id)
+            return
+
+        if task.tile_dir:
+            sheet = self._lazy_sheet(task.key, task.tile_dir) if has_tiles(task.tile_dir) else QPixmap()
+            self.spriteLoaded.emit(sheet)
+            return
+
+        pixmap = QPixmap.fromImage(task.image)
+        self.cache.put(task.key, pixmap)
+        self.spriteLoaded.emit(pixmap)
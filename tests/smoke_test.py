@@ -20,6 +20,267 @@ try:
     
     from program.utils.image_utils import load_legacy_sprite
     print("- Image utils imported")
+
+    from PyQt6.QtGui import QImage
+    from program.utils import image_utils
+    legacy_dir = os.path.join(os.path.dirname(__file__), '..', 'example-material', 'old-smbx-format')
+    front = QImage(os.path.join(legacy_dir, 'npc-6.gif'))
+    mask = QImage(os.path.join(legacy_dir, 'npc-6m.gif'))
+    fast = image_utils.composite_legacy(front, mask)
+    slow = front.convertToFormat(QImage.Format.Format_ARGB32)
+    image_utils._composite_python(slow, mask.convertToFormat(QImage.Format.Format_ARGB32))
+    assert fast == slow, "Vectorized compositing differs from per-pixel fallback"
+    print("- Legacy compositing matches fallback")
+
+    import tempfile
+    from program.utils.sprite_cache import SpriteCache
+    cache = SpriteCache(disk_dir=tempfile.mkdtemp())
+    cache.load(os.path.join(legacy_dir, 'npc-6.gif'), os.path.join(legacy_dir, 'npc-6m.gif'))
+    cache.load(os.path.join(legacy_dir, 'npc-6.gif'), os.path.join(legacy_dir, 'npc-6m.gif'))
+    assert cache.hits == 1 and cache.misses == 1 and cache.disk_writes == 1
+    print("- SpriteCache hit/miss counted")
+
+    small_disk = SpriteCache(disk_dir=tempfile.mkdtemp(), disk_budget_bytes=1)
+    for n in range(3):
+        small_disk.store_disk_image(('a', '', n, 0, 0, 0), fast)
+    assert len(os.listdir(small_disk.disk_dir)) == 1 and small_disk.disk_evictions == 2
+    from program.utils.sprite_cache import APP_CACHE_NAME
+    assert os.path.basename(os.path.dirname(SpriteCache().disk_dir)) == APP_CACHE_NAME
+    print("- SpriteCache disk tier stays within its byte budget and app folder")
+
+    from PyQt6.QtGui import QPixmap
+    from program.rendering.frame_atlas import FrameAtlas, DIR_RIGHT
+    atlas = FrameAtlas()
+    sheet = QPixmap.fromImage(fast)
+    params = {'gfxwidth': 32, 'gfxheight': 64, 'frames': 2, 'framestyle': 0}
+    right = atlas.frame(sheet, params, DIR_RIGHT, 1)
+    assert right.size() == sheet.copy(0, 64, 32, 64).size()
+    assert atlas.frame(sheet, params, DIR_RIGHT, 1) is right
+    print("- FrameAtlas slices and caches frames")
+
+    scaled = atlas.scaled_frame(sheet, params, DIR_RIGHT, 1, zoom=2.5, dpr=2.0)
+    assert (scaled.width(), scaled.height()) == (160, 320) and scaled.devicePixelRatio() == 2.0
+    assert atlas.scaled_frame(sheet, params, DIR_RIGHT, 3, zoom=2.5, dpr=2.0) is scaled
+    print("- FrameAtlas pre-scales frames per zoom")
+
+    from PyQt6.QtCore import QRect
+    from program.utils.sheet_reader import LazySheet, write_tiles
+    tile_dir = tempfile.mkdtemp()
+    write_tiles(fast, tile_dir, band_height=48)
+    lazy = LazySheet(tile_dir)
+    assert lazy.copy(QRect(0, 64, 32, 64)).toImage() == sheet.copy(0, 64, 32, 64).toImage()
+    print("- LazySheet decodes frame regions from band tiles")
+
+    from program.utils.sheet_reader import prune_tiles, tile_dir_for
+    from program.utils.sprite_loader import SpriteLoader
+    loader = SpriteLoader(SpriteCache(disk_dir=tempfile.mkdtemp()))
+    for n in range(4):
+        write_tiles(fast, tile_dir_for(loader.cache.disk_dir, ('npc', '', n, 0, 0, 0)), band_height=48)
+    key = ('npc', '', 3, 0, 0, 0)
+    assert loader._lazy_sheet(key, tile_dir_for(loader.cache.disk_dir, key)) is loader._lazy_sheet(
+        key, tile_dir_for(loader.cache.disk_dir, key))
+    assert prune_tiles(loader.cache.disk_dir, keep=2) == 2
+    assert len(os.listdir(os.path.join(loader.cache.disk_dir, "tiles"))) == 2
+    print("- SpriteLoader reuses LazySheets and prunes old tile sets")
+
+    from program.tools.legacy_converter import find_legacy_pairs
+    assert any(p.front_path.endswith('npc-6.gif') and p.mask_path.endswith('npc-6m.gif')
+               for p in find_legacy_pairs(legacy_dir))
+    print("- Legacy converter finds front/mask pairs")
+
+    import shutil
+    from program.tools.legacy_converter import convert_tree
+    convert_dir = tempfile.mkdtemp()
+    for name in ('npc-6.gif', 'npc-6m.gif'):
+        shutil.copy(os.path.join(legacy_dir, name), convert_dir)
+    hand_made = os.path.join(convert_dir, 'npc-6.png')
+    QImage(8, 8, QImage.Format.Format_ARGB32).save(hand_made)
+    os.utime(hand_made, ns=(0, 0))
+    report = convert_tree(convert_dir, jobs=1)
+    assert report.kept == [hand_made] and report.converted == 0 and QImage(hand_made).width() == 8
+    os.remove(hand_made)
+    assert convert_tree(convert_dir, jobs=1).converted == 1
+    os.utime(hand_made, ns=(0, 0))
+    assert convert_tree(convert_dir, jobs=1).converted == 1
+    print("- Legacy converter keeps PNGs it did not write")
+
+    from program.utils.image_utils import save_legacy_sprite
+    export_dir = tempfile.mkdtemp()
+    save_legacy_sprite(fast, os.path.join(export_dir, 'npc-6.gif'), os.path.join(export_dir, 'npc-6m.gif'))
+    again = image_utils.composite_legacy(QImage(os.path.join(export_dir, 'npc-6.gif')),
+                                         QImage(os.path.join(export_dir, 'npc-6m.gif')))
+    assert again.size() == fast.size() and all(
+        (again.pixel(x, y) >> 24 == 255) == (fast.pixel(x, y) >> 24 >= 128)
+        for y in range(0, fast.height(), 7) for x in range(0, fast.width(), 3))
+    print("- Legacy export round-trips through the compositor")
+
+    from program.utils.image_utils import split_legacy
+    for fmt in (QImage.Format.Format_RGB32, QImage.Format.Format_Indexed8):
+        converted = fast.convertToFormat(fmt)
+        front_a, mask_a = split_legacy(converted)
+        front_b, mask_b = split_legacy(converted.convertToFormat(QImage.Format.Format_ARGB32))
+        assert front_a == front_b and mask_a == mask_b
+    print("- Legacy split reads RGB32 and Indexed8 input")
+
+    from program.analysis.sheet_profile import SheetProfile
+    from program.analysis.frame_detect import detect_frame_geometry
+    detected = detect_frame_geometry(SheetProfile.from_image(fast))
+    assert detected.as_params() == {'gfxwidth': 32, 'gfxheight': 64, 'frames': 2, 'framestyle': 1}
+    print("- Frame geometry detected from the sheet")
+
+    from program.analysis.hitbox_fit import fit_hitbox
+    fit = fit_hitbox(SheetProfile.from_image(fast), detected.as_params())
+    assert fit.width == 32 and fit.gfxoffsetx == 0 and fit.union[3] == 63
+    print("- Hitbox fitted to the frames' alpha")
+
+    # write_tiles stores the profile, so lazy sheets never scan bands on the GUI thread
+    from PyQt6.QtCore import QThreadPool
+    QThreadPool.globalInstance().waitForDone()
+    decoded_before = lazy.decoded_bands
+    stored = SheetProfile.from_sheet(lazy)
+    assert stored is not None and (stored.rows == SheetProfile.from_image(fast).rows).all()
+    assert lazy.decoded_bands == decoded_before
+    print("- Sheet profile stored with the band tiles")
+
+    from program.analysis.frame_hash import frame_hashes
+    hashes = frame_hashes(fast, 32, 64)
+    assert hashes.count == 4 and not hashes.empty_frames and hashes.leftover_rows == 0
+    print("- Sprite frames hashed")
+
+    from program.ui.frame_panel import FrameAnalysisPanel
+    panel = FrameAnalysisPanel()
+    panel.request(lazy, 32, 32)
+    assert panel.summary.text() == "Analysing frames..."
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+    assert panel.summary.text().startswith("8 frames of 32x32"), panel.summary.text()
+    print("- Frame analysis panel hashes on the thread pool")
+
+    from program.tools.sprite_index import find_sprites
+    sprites = find_sprites(legacy_dir)
+    assert [os.path.basename(e.mask_path) for e in sprites if e.image_path.endswith('npc-6.gif')] == ['npc-6m.gif']
+    assert not any(e.image_path.endswith('npc-6m.gif') for e in sprites)
+    print("- Sprite index skips masks")
+
+    from program.tools.sprite_index import build_index
+    index_file = os.path.join(tempfile.mkdtemp(), "index.json")
+    index = build_index(legacy_dir, jobs=1, index_path=index_file)
+    assert os.path.isfile(index_file) and not any(n.endswith('.json') for n in os.listdir(legacy_dir))
+    assert index.hashed == len(index.entries) and build_index(legacy_dir, jobs=1, index_path=index_file).hashed == 0
+    from program.tools.sprite_index import index_path_for
+    from program.utils.sprite_cache import app_cache_dir
+    assert index_path_for(legacy_dir).startswith(os.path.join(app_cache_dir(), "sprite-index") + os.sep)
+    assert os.path.basename(app_cache_dir()) == APP_CACHE_NAME
+    print("- Sprite index kept outside the scanned folder")
+
+    from PyQt6.QtCore import QSize
+    from program.rendering.npc_renderer import render_frame
+    from program.tools.preview_export import export_animation
+    fast_params = {'gfxwidth': 32, 'gfxheight': 64, 'frames': 2, 'framestyle': 1}
+    assert render_frame(fast, fast_params, frame=1, direction=1, zoom=2).size() == QSize(64, 128)
+    strip_path = os.path.join(export_dir, 'npc-6-strip.png')
+    assert export_animation(fast, fast_params, strip_path, 'strip', directions=(0, 1))[0] == 4
+    argb = QImage.Format.Format_ARGB32
+    assert (QImage(strip_path).convertToFormat(argb).copy(0, 192, 32, 64)
+            == render_frame(fast, fast_params, frame=1, direction=1).convertToFormat(argb))
+    print("- Headless renderer exports a preview strip")
+
+    import io, struct
+    from program.utils.gif_writer import GifWriter
+    stream = io.BytesIO()
+    with GifWriter(stream, 1, 1, [0, 0xFFFFFF], loop=0) as gif:
+        for _ in range(200):
+            gif.add_frame(b"\x00", delay_ms=123)
+    data = stream.getvalue()
+    delays = [struct.unpack_from("<H", data, i + 4)[0] for i in range(len(data)) if data.startswith(b"\x21\xF9\x04", i)]
+    assert len(delays) == 200 and sum(delays) == 2460 and set(delays) == {12, 13}
+    print("- GIF frame delays add up to the animation length")
+
+    from program.rendering.light import LightLayer, light_brightness, light_colors
+    assert light_colors("0xFFAA00") is light_colors("0xFFAA00")
+    assert light_colors("0xFFAA00")[1].rgb() & 0xFFFFFF == 0xFFAA00
+    flicker = {'lightbrightness': 1.0, 'lightflicker': True}
+    assert len({light_brightness(flicker, tick) for tick in range(24)}) > 1
+    light_layer = LightLayer()
+    texture = light_layer.texture(20, light_colors("0xFFAA00")[1], 1.0, 2)
+    assert texture.width() == 80 and light_layer.texture(20, light_colors("0xFFAA00")[1], 1.0, 2) is texture
+    assert light_layer.texture(300, light_colors("0xFFAA00")[1], 1.0, 16, 2).width() <= 512
+    print("- Light colours and falloff textures cached")
+
+    from PyQt6.QtCore import QObject
+    from program.rendering.tick_clock import TickClock
+    clock, subscriber = TickClock(), QObject()
+    clock.subscribe(subscriber, 8, lambda tick: None)
+    connections = subscriber.receivers(subscriber.destroyed)
+    assert clock.is_running and clock.period(subscriber) == 8
+    clock.unsubscribe(subscriber)
+    assert not clock.is_running
+    for _ in range(3):
+        clock.subscribe(subscriber, 8, lambda tick: None)
+        clock.unsubscribe(subscriber)
+    assert subscriber.receivers(subscriber.destroyed) == connections
+    subscriber.deleteLater()
+    print("- Tick clock stops without subscribers")
+
+    from program.rendering.sandbox import NPCSandbox
+    sandbox = NPCSandbox(300)
+    sandbox.step({'width': 32, 'height': 32, 'cliffturn': True}, 200)
+    assert sandbox.on_ground.all() and sandbox.tick == 200
+    print("- Physics sandbox lands every instance")
+
+    from program.utils.config_parser import decode_config, tokenize_config
+    text, encoding = decode_config(b"# header\r\nframes = 2 # walk\r\nname=caf\xe9\r\n")
+    assert encoding == 'cp1252'
+    entries = tokenize_config(text)
+    assert [(e.key, e.value, e.comment, e.line) for e in entries] == [
+        (None, None, "# header", 1), ("frames", "2", "# walk", 2), ("name", "caf\u00e9", "", 3)]
+    print("- Config tokenizer detects the encoding")
+
+    from program.npc_schema import SCHEMA
+    assert SCHEMA.categories[0] == "Animation" and SCHEMA.keys[0] == "frames"
+    assert SCHEMA["framestyle"].parse("2.0") == 2 and SCHEMA["nohurt"].format(True) == "true"
+    print("- Compiled schema orders and parses parameters")
+
+    import pickle
+    from program.npc_record import NPCRecord
+    record = NPCRecord()
+    record.params['gfxwidth'], record.params['frames'], record.params['nohurt'] = 48, 2, False
+    record.params['frames'] = None
+    assert record.params.get('frames') is None and record.params['nohurt'] is False
+    assert list(pickle.loads(pickle.dumps(record)).items()) == [('gfxwidth', 48), ('nohurt', False)]
+    print("- Compact NPC records store only set parameters")
+
+    from program.tools.project_loader import config_kind, load_project
+    assert config_kind("NPC-12.txt") == ("npc", 12) and config_kind("npc-12.ini") is None
+    project = load_project(os.path.join(os.path.dirname(__file__), "..", "example-material"), jobs=1)
+    assert len(project) > 0 and all(c.data is not None for c in project)
+    print(f"- Project loader read {len(project)} example configs")
+
+    import tempfile
+    from program.tools.project_table import ProjectTable, apply_table
+    table = ProjectTable.from_project(project)
+    with tempfile.TemporaryDirectory() as tmp:
+        table.write_csv(os.path.join(tmp, "table.csv"))
+        back, errors = ProjectTable.read_csv(os.path.join(tmp, "table.csv"), project.root)
+    assert not errors and not apply_table(project, back, dry_run=True).written
+    with tempfile.TemporaryDirectory() as tmp:
+        # A table reduced to one column must not unset the parameters it left out
+        with open(os.path.join(tmp, "table.csv"), 'w', newline='') as f:
+            f.write("path,gfxwidth\n" + "".join(f"{p},{w}\n" for p, w in zip(table.paths, table.columns['gfxwidth'])))
+        back, errors = ProjectTable.read_csv(os.path.join(tmp, "table.csv"), project.root)
+    assert not errors and not apply_table(project, back, dry_run=True).written
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "table.csv"), 'w', newline='') as f:
+            f.write(f"path,nohurt\n{table.paths[0]},TRUE \n{table.paths[1]},yes\n")
+        strict, errors = ProjectTable.read_csv(os.path.join(tmp, "table.csv"), project.root)
+    assert strict.paths == [table.paths[0]] and strict.columns['nohurt'][0] == True
+    assert [path for path, _ in errors] == [table.paths[1]]
+    before = project.configs[0].data.record.get_slot(SCHEMA.index['gfxwidth'])
+    back.columns['gfxwidth'][0], back.masks['gfxwidth'][0] = 12345, True
+    dry = apply_table(project, back, dry_run=True)
+    assert dry.written == [project.configs[0].path] and dry.summary().startswith("Would write 1")
+    assert project.configs[0].data.record.get_slot(SCHEMA.index['gfxwidth']) == before
+    print("- Project table round-trips through CSV")
     
     from program.ui.form_builder import FormBuilder
     fb = FormBuilder()